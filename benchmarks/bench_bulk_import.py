@@ -0,0 +1,98 @@
+"""Measures bulk delivery request import: validation alone, with geocoding, and with the database writes.
+
+Usage:
+    python benchmarks/bench_bulk_import.py --rows 100000 --invalid 0.02
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.bulk_import import import_requests  # noqa: E402
+from duckdal.delivery_requests import DeliveryRequestWriter  # noqa: E402
+from duckdal.geocoder import Geocoder  # noqa: E402
+
+COLUMNS = [
+    "sender_name", "sender_address", "sender_contact", "recipient_name", "recipient_address",
+    "recipient_contact", "package_description", "package_weight", "pickup_date", "pickup_time", "station_id",
+]
+STREETS = ["인천 연수구 송도동", "인천 남동구 구월동", "서울 강남구 역삼동", "서울 마포구 서교동", "인천 부평구 부평동"]
+# One field broken per invalid row, the way manifests usually go wrong
+BREAKAGES = [
+    ("sender_name", ""),
+    ("recipient_contact", "010-1234-5678-99999"),
+    ("package_weight", "0.05"),
+    ("package_weight", "무게"),
+    ("pickup_date", "2020-01-01"),
+    ("pickup_date", "2026/13/01"),
+    ("pickup_time", "25:00"),
+    ("station_id", "ST-UNKNOWN"),
+]
+
+
+def synthetic_manifest(rows, invalid, today, station_ids, rng):
+    """Returns a CSV manifest with rows requests, about invalid of them broken in one field."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(COLUMNS)
+    for i in range(rows):
+        row = {
+            "sender_name": "쿠팡 송도 물류센터",
+            "sender_address": "인천 연수구 송도동 1",
+            "sender_contact": "032-123-4567",
+            "recipient_name": f"고객{i}",
+            "recipient_address": f"{rng.choice(STREETS)} {rng.randint(1, 999)}",
+            "recipient_contact": f"010-{rng.randint(0, 9999):04d}-{rng.randint(0, 9999):04d}",
+            "package_description": "생활용품",
+            "package_weight": f"{rng.uniform(0.1, 5):.1f}",
+            "pickup_date": (today + timedelta(days=rng.randint(0, 14))).isoformat(),
+            "pickup_time": f"{rng.randint(8, 19):02d}:{rng.choice([0, 30]):02d}",
+            "station_id": rng.choice(["", *station_ids]),
+        }
+        if rng.random() < invalid:
+            column, value = rng.choice(BREAKAGES)
+            row[column] = value
+        writer.writerow([row[column] for column in COLUMNS])
+    return out.getvalue().encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="requests in the manifest")
+    parser.add_argument("--invalid", type=float, default=0.02, help="share of rows with an error")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    today = date.today()
+    station_ids = {"ST-1", "ST-2", "ST-3"}
+    manifest = synthetic_manifest(args.rows, args.invalid, today, station_ids, rng)
+    print(f"manifest: {args.rows:,} rows, {len(manifest) / 2**20:.1f} MiB")
+
+    with tempfile.TemporaryDirectory(prefix="bench-bulk-import-") as data_dir:
+        geocoder = Geocoder(os.path.join(data_dir, "gazetteer.db"))
+        writer = DeliveryRequestWriter(os.path.join(data_dir, "delivery_requests.db"))
+        runs = [
+            ("validate", {}),
+            ("validate + geocode", {"geocoder": geocoder}),
+            ("validate + geocode + write", {"geocoder": geocoder, "writer": writer}),
+        ]
+        for label, kwargs in runs:
+            geocoder.clear_cache()
+            started = time.perf_counter()
+            result = import_requests(io.BytesIO(manifest), "manifest.csv", "bench", "ST-1", station_ids, today=today, **kwargs)
+            elapsed = time.perf_counter() - started
+            print(f"{label:<28} {elapsed:>7.2f} s  {result.rows / elapsed:>10,.0f} rows/s")
+        writer.close()
+
+    print(f"accepted {result.accepted:,}, rejected {result.rejected:,} ({result.error_count:,} errors, {len(result.errors):,} listed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Times bulk ETA computation and multi-stop route planning.
+
+Usage:
+    python benchmarks/bench_eta.py --orders 100000 --stations 10
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.eta import EtaEngine, plan_routes  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--stations", type=int, default=10)
+    parser.add_argument("--routes", type=int, default=1_000, help="number of multi-stop routes to plan")
+    parser.add_argument("--stops", type=int, default=8, help="stops per route")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    station_lats = rng.uniform(37.35, 37.65, args.stations)
+    station_lons = rng.uniform(126.60, 127.10, args.stations)
+    served_by = rng.integers(0, args.stations, args.orders)
+    dest_lats = rng.uniform(37.35, 37.65, args.orders)
+    dest_lons = rng.uniform(126.60, 127.10, args.orders)
+
+    engine = EtaEngine()
+    departure = datetime(2024, 11, 20, 9, 0)
+    for label in ("cold cache", "warm cache"):
+        started = time.perf_counter()
+        engine.estimate_arrivals(departure, station_lats[served_by], station_lons[served_by], dest_lats, dest_lons)
+        elapsed = time.perf_counter() - started
+        print(f"ETAs, {label}: {args.orders:,} orders in {elapsed * 1000:.1f} ms ({args.orders / elapsed:,.0f} orders/s)")
+
+    groups = [
+        (rng.uniform(37.35, 37.65, args.stops), rng.uniform(126.60, 127.10, args.stops))
+        for _ in range(args.routes)
+    ]
+    started = time.perf_counter()
+    plan_routes(station_lats[0], station_lons[0], groups)
+    elapsed = time.perf_counter() - started
+    print(f"routes: {args.routes:,} x {args.stops} stops in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
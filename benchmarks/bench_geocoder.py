@@ -0,0 +1,92 @@
+"""Measures gazetteer loading and batch vs. one-by-one geocoding on a synthetic gazetteer.
+
+Usage:
+    python benchmarks/bench_geocoder.py --rows 500000 --addresses 10000
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.geocoder import Geocoder, normalize_address  # noqa: E402
+
+DISTRICTS = [("인천광역시", "연수구"), ("인천광역시", "남동구"), ("인천광역시", "부평구"), ("서울특별시", "강남구"), ("서울특별시", "마포구")]
+SYLLABLES = "가나다라마바사아자차카타파하송도연수구월부평강남역삼서교"
+
+
+def synthetic_gazetteer(path, rows, rng):
+    """Writes rows building addresses spread over a few thousand streets; returns the (sido, sigungu, street, number) rows."""
+    streets = sorted({"".join(rng.choices(SYLLABLES, k=3)) + rng.choice(["로", "길", "대로"]) for _ in range(rows // 100 + 1)})
+    entries = []
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["sido", "sigungu", "name", "number", "lat", "lon"])
+        for sido, sigungu in DISTRICTS:
+            writer.writerow([sido, sigungu, "", "", 37.45, 126.7])
+        for street in streets:
+            sido, sigungu = rng.choice(DISTRICTS)
+            writer.writerow([sido, sigungu, street, "", 37.45, 126.7])
+        for _ in range(rows):
+            sido, sigungu = rng.choice(DISTRICTS)
+            entry = (sido, sigungu, rng.choice(streets), str(rng.randint(1, 999)))
+            entries.append(entry)
+            writer.writerow([*entry, round(rng.uniform(37.3, 37.7), 6), round(rng.uniform(126.5, 127.2), 6)])
+    return entries
+
+
+def spelling_variant(entry, rng):
+    """Writes an address the way a person might type it."""
+    sido, sigungu, street, number = entry
+    sido = rng.choice([sido, sido[:2], ""])
+    detail = rng.choice(["", ", 101동 1203호", " (송도동)"])
+    return f"{sido} {sigungu} {street} {number}{detail}".strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000, help="building addresses in the gazetteer")
+    parser.add_argument("--addresses", type=int, default=10_000, help="addresses per geocoding call")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory(prefix="bench-geocoder-") as data_dir:
+        csv_path = os.path.join(data_dir, "gazetteer.csv")
+        entries = synthetic_gazetteer(csv_path, args.rows, rng)
+        geocoder = Geocoder(os.path.join(data_dir, "gazetteer.db"), csv_path=None)
+        started = time.perf_counter()
+        loaded = geocoder.load_csv(csv_path)
+        print(f"load:            {loaded / (time.perf_counter() - started):>12,.0f} rows/s")
+
+        addresses = [spelling_variant(rng.choice(entries), rng) for _ in range(args.addresses)]
+
+        # The picks are almost all distinct, so the LRU barely helps the one-by-one run
+        normalize_address.cache_clear()
+        started = time.perf_counter()
+        singles = [geocoder.geocode(address) for address in addresses]
+        single_elapsed = time.perf_counter() - started
+
+        normalize_address.cache_clear()
+        geocoder.clear_cache()
+        started = time.perf_counter()
+        results = geocoder.geocode_many(addresses)
+        batch_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        geocoder.geocode_many(addresses)
+        cached_elapsed = time.perf_counter() - started
+
+    assert results == singles
+    found = sum(result is not None for result in results)
+    print(f"one by one:      {args.addresses / single_elapsed:>12,.0f} addresses/s")
+    print(f"batch:           {args.addresses / batch_elapsed:>12,.0f} addresses/s")
+    print(f"batch, cached:   {args.addresses / cached_elapsed:>12,.0f} addresses/s")
+    print(f"resolved {found:,} of {args.addresses:,} ({found / args.addresses:.1%})")
+
+
+if __name__ == "__main__":
+    main()
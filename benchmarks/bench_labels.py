@@ -0,0 +1,58 @@
+"""Measures QR label sheet rendering in this process and with 1 to N worker processes.
+
+Reports labels per second overall and per worker, for PDF and PNG sheets.
+Pools are started and warmed up before they are timed, as the app's
+process-wide pool is after its first job.
+
+Usage:
+    python benchmarks/bench_labels.py --labels 2000 --workers 1 2 4
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.labels import Label, render_label_sheets  # noqa: E402
+
+
+def synthetic_labels(count):
+    return [
+        Label(f"REQ-{index:012X}", [f"2026-10-17 {8 + index % 12:02d}:30  DR-001-{index % 4 + 1}", f"ST-001  {index % 50 / 10 + 0.1:.1f} kg"])
+        for index in range(count)
+    ]
+
+
+def timed_render(labels, fmt, executor):
+    started = time.perf_counter()
+    sheets = render_label_sheets(labels, fmt, executor=executor)
+    return time.perf_counter() - started, len(sheets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--labels", type=int, default=2_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, os.cpu_count()}))
+    args = parser.parse_args()
+
+    labels = synthetic_labels(args.labels)
+    print(f"{args.labels:,} labels on {os.cpu_count()} CPUs")
+    for fmt in ("pdf", "png"):
+        # One thread renders in this process without pickling, the single-core baseline
+        with ThreadPoolExecutor(1) as executor:
+            elapsed, size = timed_render(labels, fmt, executor)
+        print(f"{fmt} in process        {args.labels / elapsed:>9,.0f} labels/s  ({size / 2**20:.1f} MiB)")
+        for workers in args.workers:
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                # Starts every worker and loads its imports
+                timed_render(labels[:14 * workers * 4], fmt, executor)
+                elapsed, _ = timed_render(labels, fmt, executor)
+            rate = args.labels / elapsed
+            print(f"{fmt} {workers:>2} workers        {rate:>9,.0f} labels/s  {rate / workers:>9,.0f} labels/s per worker")
+
+
+if __name__ == "__main__":
+    main()
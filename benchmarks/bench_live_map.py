@@ -0,0 +1,73 @@
+"""Measures live map payload size and refresh cost with and without culling, clustering and deltas.
+
+Usage:
+    python benchmarks/bench_live_map.py --drones 5000 --moving 0.2
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.live_map import PositionBuffer, PositionMirror, visible_clusters  # noqa: E402
+
+
+def deck_bytes(lats, lons, counts=None):
+    """Size of the pydeck JSON spec that st.pydeck_chart sends for one scatterplot layer."""
+    import pandas as pd
+    import pydeck as pdk
+
+    data = pd.DataFrame({"lat": lats, "lon": lons})
+    if counts is not None:
+        data["count"] = counts
+    deck = pdk.Deck(layers=[pdk.Layer("ScatterplotLayer", data, get_position=["lon", "lat"])])
+    return len(deck.to_json().encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drones", type=int, default=5_000)
+    parser.add_argument("--moving", type=float, default=0.2, help="share of drones that move between refreshes")
+    parser.add_argument("--refreshes", type=int, default=50)
+    parser.add_argument("--zoom", type=float, default=12)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ids = [f"DR-{i:06d}" for i in range(args.drones)]
+    lats = rng.uniform(37.20, 37.80, args.drones)
+    lons = rng.uniform(126.50, 127.30, args.drones)
+    center_lat, center_lon = 37.45, 126.70
+
+    buffer = PositionBuffer()
+    buffer.update(ids, lats, lons)
+    mirror = PositionMirror()
+    mirror.sync(buffer)
+
+    clusters = visible_clusters(lats, lons, center_lat, center_lon, args.zoom)
+    print(f"payload, every drone: {args.drones:,} points, {deck_bytes(lats, lons) / 1024:,.1f} KiB")
+    print(
+        f"payload, culled + clustered at zoom {args.zoom:g}: {len(clusters['count']):,} points, "
+        f"{deck_bytes(clusters['lat'], clusters['lon'], clusters['count']) / 1024:,.1f} KiB"
+    )
+
+    applied = 0
+    started = time.perf_counter()
+    for _ in range(args.refreshes):
+        moving = rng.random(args.drones) < args.moving
+        lats[moving] += rng.normal(0, 1e-3, moving.sum())
+        lons[moving] += rng.normal(0, 1e-3, moving.sum())
+        buffer.update(ids, lats, lons)
+        applied += mirror.sync(buffer)
+        visible_clusters(*mirror.positions(), center_lat, center_lon, args.zoom)
+    elapsed = time.perf_counter() - started
+    print(
+        f"refresh: {elapsed / args.refreshes * 1000:.2f} ms each, "
+        f"{applied / args.refreshes:,.0f} changed rows applied instead of {args.drones:,}"
+    )
+
+
+if __name__ == "__main__":
+    main()
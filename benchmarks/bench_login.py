@@ -0,0 +1,81 @@
+"""Load-tests the login flow: concurrent sessions logging in and landing on the tracking page.
+
+Each session is a Streamlit AppTest that opens the login page, submits the
+demo credentials and follows the redirect. AppTest is not thread-safe, so
+sessions run in --concurrency worker processes. To compare with another revision,
+check it out next to this one and point --app-dir at it:
+
+    git worktree add ../duckdal-before <revision>
+    python benchmarks/bench_login.py --app-dir ../duckdal-before
+    python benchmarks/bench_login.py
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def start_worker(app_dir, data_dir):
+    sys.path.insert(0, app_dir)
+    os.chdir(app_dir)
+    # The tracking log next to the orders database has one writer process, so each worker gets its own
+    os.environ["DUCKDAL_ORDERS_DB"] = os.path.join(data_dir, f"orders-{os.getpid()}.db")
+    os.environ.setdefault("DUCKDAL_REQUESTS_DB", os.path.join(data_dir, "delivery_requests.db"))
+    os.environ.setdefault("DUCKDAL_USERS_DB", os.path.join(data_dir, "users.db"))
+    # Warm up imports and the demo orders outside the measurement
+    login_once()
+
+
+def login_once(_=None):
+    from streamlit.testing.v1 import AppTest
+
+    # Scripts run as __main__; keep this module there so the pool can still find login_once.
+    main_module = sys.modules["__main__"]
+    at = AppTest.from_file("streamlit_app.py", default_timeout=60)
+    at.run()
+    at.text_input[0].input("test")
+    at.text_input[1].input("test")
+    started = time.perf_counter()
+    next(button for button in at.button if button.label == "Log in").click().run()
+    # The password is checked off the script thread; rerun the way the page's poll would
+    while not at.exception and not at.error and not at.session_state.filtered_state.get("logged_in"):
+        time.sleep(0.01)
+        at.run()
+    elapsed = time.perf_counter() - started
+    sys.modules["__main__"] = main_module
+    if at.exception or not at.session_state["logged_in"]:
+        raise RuntimeError(f"login failed: {[e.value for e in at.exception]}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app-dir", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    app_dir = os.path.abspath(args.app_dir)
+    with tempfile.TemporaryDirectory(prefix="bench-login-") as data_dir:
+        # One worker first, so the demo user is created once rather than raced for
+        with ProcessPoolExecutor(1, initializer=start_worker, initargs=(app_dir, data_dir)) as pool:
+            pool.submit(time.sleep, 0).result()
+        with ProcessPoolExecutor(args.concurrency, initializer=start_worker, initargs=(app_dir, data_dir)) as pool:
+            # Start every worker before the clock does
+            list(pool.map(time.sleep, [0.5] * args.concurrency))
+            started = time.perf_counter()
+            latencies = list(pool.map(login_once, range(args.sessions)))
+            elapsed = time.perf_counter() - started
+
+    print(f"{args.sessions} logins, {args.concurrency} at a time: {args.sessions / elapsed:.1f} logins/s")
+    print(
+        f"click to tracking page: median {statistics.median(latencies) * 1000:.0f} ms, "
+        f"max {max(latencies) * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
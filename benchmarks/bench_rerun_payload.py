@@ -0,0 +1,127 @@
+"""Measures the websocket bytes the server sends for each rerun of every page.
+
+Starts the app with `streamlit run`, opens a session the way the browser
+does and asks for the same page several times, counting the ForwardMsg
+bytes from each rerun request to its script_finished message. The first
+run fills the browser's message cache; later runs show the steady state.
+The tracking page is opened with a session cookie for the demo user. To
+compare with another revision, point --app-dir at a checkout of it:
+
+    git worktree add ../duckdal-before <revision>
+    python benchmarks/bench_rerun_payload.py --app-dir ../duckdal-before
+    python benchmarks/bench_rerun_payload.py
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+PAGES = [("login", "streamlit_app", False), ("tracking", "page1", True), ("request", "page2", True)]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(app_dir, data_dir, port):
+    env = dict(
+        os.environ,
+        DUCKDAL_ORDERS_DB=os.path.join(data_dir, "orders.db"),
+        DUCKDAL_REQUESTS_DB=os.path.join(data_dir, "delivery_requests.db"),
+        DUCKDAL_USERS_DB=os.path.join(data_dir, "users.db"),
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", "streamlit_app.py",
+            "--server.headless", "true", "--server.port", str(port),
+            "--server.enableWebsocketCompression", "false",
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=app_dir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("streamlit did not start")
+
+
+def demo_cookie(app_dir, data_dir):
+    """Session cookie for the demo user, signed by the store the server will open."""
+    sys.path.insert(0, app_dir)
+    from duckdal.users import DEMO_USERNAME, SESSION_COOKIE, UserStore
+
+    token = UserStore(os.path.join(data_dir, "users.db")).issue_token(DEMO_USERNAME)
+    return f"{SESSION_COOKIE}={token}"
+
+
+async def measure_page(port, page_name, cookie, reruns):
+    """Returns the bytes sent for each of `reruns` reruns of one page in a fresh session."""
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from tornado.httpclient import HTTPRequest
+    from tornado.websocket import websocket_connect
+
+    headers = {"Sec-WebSocket-Protocol": "streamlit"}
+    if cookie:
+        headers["Cookie"] = cookie
+    connection = await websocket_connect(HTTPRequest(f"ws://127.0.0.1:{port}/_stcore/stream", headers=headers))
+    sizes = []
+    for _ in range(reruns):
+        back_msg = BackMsg()
+        back_msg.rerun_script.page_name = page_name
+        await connection.write_message(back_msg.SerializeToString(), binary=True)
+        sent = 0
+        while True:
+            payload = await asyncio.wait_for(connection.read_message(), 60)
+            if payload is None:
+                raise RuntimeError("server closed the session")
+            sent += len(payload)
+            msg = ForwardMsg()
+            msg.ParseFromString(payload)
+            if msg.WhichOneof("type") == "script_finished":
+                break
+        sizes.append(sent)
+    connection.close()
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app-dir", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args()
+
+    app_dir = os.path.abspath(args.app_dir)
+    with tempfile.TemporaryDirectory(prefix="bench-payload-") as data_dir:
+        cookie = demo_cookie(app_dir, data_dir)
+        port = free_port()
+        server = start_server(app_dir, data_dir, port)
+        try:
+            for label, page_name, needs_login in PAGES:
+                sizes = asyncio.run(measure_page(port, page_name, cookie if needs_login else None, args.reruns))
+                steady = sizes[1:] or sizes
+                print(
+                    f"{label:<9} first run {sizes[0] / 1024:7.1f} KiB   "
+                    f"rerun {sum(steady) / len(steady) / 1024:7.1f} KiB"
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Measures pickup scheduling rounds with a large backlog: the first round, idle rounds and a slot change.
+
+Usage:
+    python benchmarks/bench_scheduler.py --requests 20000 --stations 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.scheduler import PickupScheduler, slot_for  # noqa: E402
+from duckdal.stations import get_station_registry  # noqa: E402
+
+
+def timed_round(scheduler, now):
+    """Runs one round the way SchedulerService does; returns (seconds, assignments)."""
+    started = time.perf_counter()
+    scheduler.release_before(slot_for(now) - timedelta(minutes=scheduler.slot_minutes))
+    assignments, _ = scheduler.schedule(now)
+    return time.perf_counter() - started, len(assignments)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--stations", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    stations = get_station_registry().stations[:args.stations]
+    scheduler = PickupScheduler(stations)
+    rng = random.Random(0)
+    now = datetime(2024, 3, 18, 9, 0)
+    for number in range(args.requests):
+        scheduler.add_request({
+            "id": f"REQ-{number:012d}",
+            "pickup_at": now + timedelta(minutes=rng.randrange(120)),
+            "package_weight": rng.choice([0.5, 1.5, 3.0, 7.0]),
+            "station_id": rng.choice([None, rng.choice(stations).id]),
+        })
+
+    seconds, assigned = timed_round(scheduler, now)
+    print(f"first round:    {seconds:8.3f} s, {assigned:,} assigned, {len(scheduler):,} waiting")
+    idle = [timed_round(scheduler, now)[0] for _ in range(args.rounds)]
+    print(f"idle round:     {max(idle) * 1e3:8.3f} ms (slowest of {args.rounds})")
+    seconds, assigned = timed_round(scheduler, now + timedelta(minutes=scheduler.slot_minutes))
+    print(f"next slot:      {seconds:8.3f} s, {assigned:,} assigned, {len(scheduler):,} waiting")
+
+
+if __name__ == "__main__":
+    main()
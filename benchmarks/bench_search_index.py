@@ -0,0 +1,79 @@
+"""Measures the order search index: build time, memory, exact and prefix lookups, and incremental adds.
+
+Usage:
+    python benchmarks/bench_search_index.py --orders 2000000 --users 50000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.order_store import SEARCH_INDEX_BATCH  # noqa: E402
+from duckdal.search_index import OrderSearchIndex  # noqa: E402
+
+
+def synthetic_orders(count, users, start=0):
+    """Returns (user_id, order_id, tracking_number) like scripts/seed_orders.py writes them."""
+    rng = random.Random(start)
+    return [(f"user{rng.randrange(users):05d}", f"SYN-{index:09d}", f"SY{index:016d}") for index in range(start, start + count)]
+
+
+def lookup_latencies_us(index, queries):
+    latencies = []
+    for user_id, query in queries:
+        started = time.perf_counter()
+        index.search(user_id, query)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(0.99 * (len(latencies) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+
+    orders = synthetic_orders(args.orders, args.users)
+    index = OrderSearchIndex()
+    started = time.perf_counter()
+    # The repository feeds the index in batches of this size from its background thread
+    for start in range(0, len(orders), SEARCH_INDEX_BATCH):
+        index.add(orders[start:start + SEARCH_INDEX_BATCH])
+    build_s = time.perf_counter() - started
+    size_mib = (index._keys.nbytes + index._order_ids.nbytes) / 2**20
+    print(f"build:           {build_s:8.2f} s for {args.orders:,} orders ({len(index):,} keys, {size_mib:.0f} MiB)")
+
+    rng = random.Random(1)
+    picks = [orders[rng.randrange(len(orders))] for _ in range(args.lookups)]
+    for label, queries in (
+        ("exact tracking", [(user_id, tracking) for user_id, _, tracking in picks]),
+        ("exact order id", [(user_id, order_id.lower()) for user_id, order_id, _ in picks]),
+        ("prefix", [(user_id, tracking[:rng.randint(2, 12)]) for user_id, _, tracking in picks]),
+        ("miss", [(user_id, "1Z999") for user_id, _, _ in picks]),
+    ):
+        median_us, p99_us = lookup_latencies_us(index, queries)
+        print(f"{label + ':':<16} {median_us:8.1f} us median  {p99_us:8.1f} us p99")
+
+    new_orders = synthetic_orders(1_000, args.users, start=args.orders)
+    started = time.perf_counter()
+    for order in new_orders:
+        index.add([order])
+    add_us = (time.perf_counter() - started) / len(new_orders) * 1e6
+    print(f"add one order:   {add_us:8.1f} us")
+    median_us, p99_us = lookup_latencies_us(index, [(user_id, tracking) for user_id, _, tracking in new_orders])
+    print(f"{'recent exact:':<16} {median_us:8.1f} us median  {p99_us:8.1f} us p99")
+    assert all(index.search(user_id, tracking) == [order_id] for user_id, order_id, tracking in new_orders)
+
+    started = time.perf_counter()
+    index.add(synthetic_orders(index.merge_threshold, args.users, start=args.orders + 1_000))
+    print(f"merge {index.merge_threshold:,} orders: {time.perf_counter() - started:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
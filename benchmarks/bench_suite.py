@@ -0,0 +1,308 @@
+"""Runs the page and helper benchmarks and writes a JSON report that later runs are compared against.
+
+The page benchmarks drive the app headlessly with Streamlit's AppTest: the
+login flow, the tracking page with N synthetic orders for the demo user and
+the delivery request form. Every scenario runs in a fresh process with its
+own data directory, so N orders really means N. Latencies are per rerun;
+memory is the Python allocation peak of one rerun (tracemalloc) and the
+worker's peak RSS.
+
+Usage:
+    python benchmarks/bench_suite.py --json bench.json
+    python benchmarks/bench_suite.py --baseline bench.json
+    python benchmarks/bench_suite.py --orders 10 100 --repeat 5 --skip-micro
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_ORDER_COUNTS = [10, 100, 1_000, 10_000]
+# Medians below this many milliseconds apart are treated as noise
+NOISE_FLOOR_MS = 1.0
+
+
+def summarize(latencies_ms, **extra):
+    latencies_ms = sorted(latencies_ms)
+    p95_index = min(len(latencies_ms) - 1, round(0.95 * (len(latencies_ms) - 1)))
+    return {
+        "runs": len(latencies_ms),
+        "median_ms": round(statistics.median(latencies_ms), 3),
+        "p95_ms": round(latencies_ms[p95_index], 3),
+        "min_ms": round(latencies_ms[0], 3),
+        **extra,
+    }
+
+
+def timed(fn, repeat):
+    """Calls fn repeat times; returns the latency of each call in milliseconds."""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def peak_kib(fn):
+    """Calls fn once under tracemalloc; returns the peak of its Python allocations in KiB."""
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def max_rss_mib():
+    # ru_maxrss is in KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def start_worker(data_dir):
+    os.chdir(ROOT)
+    os.environ["DUCKDAL_ORDERS_DB"] = os.path.join(data_dir, "orders.db")
+    os.environ["DUCKDAL_REQUESTS_DB"] = os.path.join(data_dir, "delivery_requests.db")
+    os.environ["DUCKDAL_USERS_DB"] = os.path.join(data_dir, "users.db")
+    os.environ["DUCKDAL_GAZETTEER_DB"] = os.path.join(data_dir, "gazetteer.db")
+
+
+def check(at):
+    if at.exception:
+        raise RuntimeError(f"page failed: {[e.value for e in at.exception]}")
+    return at
+
+
+def open_page(page):
+    """Returns a logged-in AppTest session that has rendered page once."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file("streamlit_app.py", default_timeout=120)
+    at.session_state["logged_in"] = True
+    at.session_state["username"] = "test"
+    at.run()
+    at.switch_page(page)
+    check(at.run())
+    return at
+
+
+def bench_login(repeat):
+    from streamlit.testing.v1 import AppTest
+
+    latencies = []
+    # The first login also pays for imports and the user store; leave it out
+    for _ in range(repeat + 1):
+        at = AppTest.from_file("streamlit_app.py", default_timeout=120)
+        at.run()
+        at.text_input[0].input("test")
+        at.text_input[1].input("test")
+        started = time.perf_counter()
+        next(button for button in at.button if button.label == "Log in").click().run()
+        # The password is checked off the script thread; rerun the way the page's poll would
+        while not at.exception and not at.session_state.filtered_state.get("logged_in"):
+            time.sleep(0.01)
+            at.run()
+        check(at)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {"login": summarize(latencies[1:], max_rss_mib=max_rss_mib())}
+
+
+def seed_orders(count):
+    from duckdal.order_store import get_order_repository
+    from scripts.seed_orders import synthetic_order
+
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    get_order_repository().add_orders([synthetic_order(rng, i, "test", start) for i in range(count)])
+
+
+def bench_tracking_page(orders, repeat):
+    seed_orders(orders)
+    # Warm up imports and process-wide caches outside the measurement
+    open_page("pages/page1.py")
+    opens = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        at = open_page("pages/page1.py")
+        opens.append((time.perf_counter() - started) * 1000)
+    reruns = timed(lambda: check(at.run()), repeat)
+    return {
+        f"tracking_page.open[n={orders}]": summarize(opens),
+        f"tracking_page.rerun[n={orders}]": summarize(
+            reruns,
+            peak_kib=peak_kib(lambda: check(at.run())),
+            max_rss_mib=max_rss_mib(),
+        ),
+    }
+
+
+def bench_request_form(repeat):
+    at = open_page("pages/page2.py")
+    text_inputs, text_areas = at.text_input, at.text_area
+    for widget, value in zip(text_inputs, ["김덕", "010-1234-5678", "이덕", "010-9876-5432", "책"]):
+        widget.input(value)
+    text_areas[0].input("인천 연수구 송도동 1")
+    text_areas[1].input("서울 강남구 역삼동 2")
+    submit = next(button for button in at.button if button.label == "배송 요청 제출")
+
+    def submit_form():
+        submit.click().run()
+        if not check(at).success:
+            raise RuntimeError("delivery request was not accepted")
+
+    submit_form()  # starts the background writer and scheduler
+    latencies = timed(submit_form, repeat)
+    return {
+        "request_form.submit": summarize(latencies, peak_kib=peak_kib(submit_form), max_rss_mib=max_rss_mib())
+    }
+
+
+def run_scenario(scenario, orders, repeat):
+    if scenario == "login":
+        return bench_login(repeat)
+    if scenario == "tracking_page":
+        return bench_tracking_page(orders, repeat)
+    if scenario == "request_form":
+        return bench_request_form(repeat)
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def run_isolated(scenario, orders, repeat):
+    """Runs one scenario in a fresh worker process with an empty data directory."""
+    with tempfile.TemporaryDirectory(prefix="bench-suite-") as data_dir:
+        with ProcessPoolExecutor(1, initializer=start_worker, initargs=(data_dir,)) as pool:
+            return pool.submit(run_scenario, scenario, orders, repeat).result()
+
+
+def micro_benchmarks(repeat):
+    """Times the helpers the pages call on every rerun or dialog."""
+    import pandas as pd
+
+    from duckdal.asset_cache import clear_asset_cache, load_image_as_data_uri
+    from duckdal.qr_codes import clear_qr_cache, generate_qr_code
+    from duckdal.stations import get_station_registry
+    from duckdal.theme import build_theme_bundle
+    from duckdal.tracking_timeline import normalize_tracking_timeline
+
+    def qr_cold():
+        clear_qr_cache()
+        generate_qr_code("QR-0001", fmt="svg")
+
+    def image_cold():
+        clear_asset_cache()
+        load_image_as_data_uri("assets/coupang.svg")
+
+    rng = random.Random(0)
+    timeline = pd.DataFrame(
+        {
+            "order_index": [i // 4 for i in range(4_000)],
+            "date": [f"2024-01-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}" for _ in range(4_000)],
+        }
+    )
+    registry = get_station_registry()
+    lats = [rng.uniform(37.35, 37.65) for _ in range(1_000)]
+    lons = [rng.uniform(126.60, 127.10) for _ in range(1_000)]
+
+    benchmarks = {
+        "qr_code.cold": qr_cold,
+        "qr_code.cached": lambda: generate_qr_code("QR-0001", fmt="svg"),
+        "image_data_uri.cold": image_cold,
+        "image_data_uri.cached": lambda: load_image_as_data_uri("assets/coupang.svg"),
+        "tracking_timeline.normalize[events=4000]": lambda: normalize_tracking_timeline(timeline, date(2024, 6, 1)),
+        "stations.nearest_many[points=1000]": lambda: registry.nearest_many(lats, lons),
+        "theme.build_bundle": build_theme_bundle,
+    }
+    return {name: summarize(timed(fn, repeat)) for name, fn in benchmarks.items()}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Prints each benchmark against the baseline; returns the names that got slower than tolerance allows."""
+    regressions = []
+    for name, entry in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        change = entry["median_ms"] - before["median_ms"]
+        ratio = entry["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+        slower = ratio > 1 + tolerance and change > NOISE_FLOOR_MS
+        if slower:
+            regressions.append(name)
+        print(f"{name:<44} {before['median_ms']:>10.2f} -> {entry['median_ms']:>10.2f} ms  {ratio - 1:+7.1%}{'  REGRESSION' if slower else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, nargs="+", default=DEFAULT_ORDER_COUNTS, help="tracking page sizes to run")
+    parser.add_argument("--repeat", type=int, default=10, help="measured runs per benchmark")
+    parser.add_argument("--skip-pages", action="store_true")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="compare against a report written earlier with --json")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed median slowdown before a benchmark counts as a regression")
+    args = parser.parse_args()
+
+    results = {}
+    if not args.skip_pages:
+        results.update(run_isolated("login", None, args.repeat))
+        for orders in args.orders:
+            results.update(run_isolated("tracking_page", orders, args.repeat))
+        results.update(run_isolated("request_form", None, args.repeat))
+    if not args.skip_micro:
+        os.chdir(ROOT)
+        results.update(micro_benchmarks(args.repeat * 10))
+
+    for name, entry in results.items():
+        memory = "".join(
+            f"  {key} {entry[key]}" for key in ("peak_kib", "max_rss_mib") if key in entry
+        )
+        print(f"{name:<44} median {entry['median_ms']:>10.2f} ms  p95 {entry['p95_ms']:>10.2f} ms{memory}")
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nagainst {args.baseline} (revision {baseline['meta'].get('revision')}):")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            sys.exit(f"{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
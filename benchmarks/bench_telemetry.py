@@ -0,0 +1,122 @@
+"""Measures telemetry ingestion into the ring buffers against per-message dicts, read latency and UDP throughput.
+
+Usage:
+    python benchmarks/bench_telemetry.py --drones 1000 --messages 1000000
+"""
+import argparse
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.telemetry import (  # noqa: E402
+    FLUSH_INTERVAL, HISTORY_POINTS, MESSAGE_DTYPE, TelemetryService, TelemetryStore, pack_messages,
+)
+
+
+def synthetic_datagrams(drones, messages, start=0.0):
+    """Every drone reporting in turn, MAX_DATAGRAM_MESSAGES messages per datagram."""
+    rng = np.random.default_rng(0)
+    ids = [f"DR-{number % drones:05d}" for number in range(messages)]
+    return pack_messages(
+        ids, start + np.arange(messages) / drones, rng.uniform(37.2, 37.8, messages),
+        rng.uniform(126.5, 127.2, messages), np.full(messages, 60.0), rng.uniform(20, 100, messages),
+    )
+
+
+def dict_baseline(datagrams, history):
+    """One dict per message in a bounded deque per drone, as a straightforward ingester would keep them."""
+    tracks = {}
+    for data in datagrams:
+        for message in np.frombuffer(data, dtype=MESSAGE_DTYPE).tolist():
+            drone_id, timestamp, lat, lon, altitude, battery = message
+            track = tracks.get(drone_id)
+            if track is None:
+                track = tracks[drone_id] = deque(maxlen=history)
+            track.append({"time": timestamp, "lat": lat, "lon": lon, "altitude": altitude, "battery": battery})
+    return tracks
+
+
+def read_latencies_us(read, calls):
+    latencies = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        read()
+        latencies.append((time.perf_counter() - started) * 1e6)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(0.99 * (len(latencies) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drones", type=int, default=1_000)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--flush", type=int, default=100, help="datagrams parsed per flush")
+    parser.add_argument("--reads", type=int, default=10_000)
+    parser.add_argument("--udp-rate", type=int, default=100_000, help="messages per second sent over UDP")
+    args = parser.parse_args()
+
+    datagrams = synthetic_datagrams(args.drones, args.messages)
+    batches = [datagrams[start:start + args.flush] for start in range(0, len(datagrams), args.flush)]
+
+    started = time.perf_counter()
+    dict_baseline(datagrams, HISTORY_POINTS)
+    baseline_s = time.perf_counter() - started
+    print(f"dict per message:  {args.messages / baseline_s / 1e6:6.2f} M msg/s")
+
+    store = TelemetryStore()
+    started = time.perf_counter()
+    for batch in batches:
+        store.ingest_datagrams(batch)
+    ring_s = time.perf_counter() - started
+    print(f"ring buffers:      {args.messages / ring_s / 1e6:6.2f} M msg/s ({baseline_s / ring_s:.1f}x)")
+
+    drone_ids = [f"DR-{number:05d}" for number in range(args.drones)]
+    for label, read in (
+        ("latest", lambda: store.latest(drone_ids[0])),
+        ("track 300", lambda: store.track(drone_ids[0], 300)),
+        ("latest all", store.latest_all),
+    ):
+        median_us, p99_us = read_latencies_us(read, args.reads)
+        print(f"{label + ':':<18} {median_us:8.1f} us median  {p99_us:8.1f} us p99")
+
+    # Reads while another thread ingests a batch every flush, as the Streamlit script thread sees them
+    stop = threading.Event()
+
+    def keep_ingesting():
+        while not stop.wait(FLUSH_INTERVAL):
+            store.ingest_datagrams(batches[0])
+
+    writer = threading.Thread(target=keep_ingesting)
+    writer.start()
+    median_us, p99_us = read_latencies_us(lambda: store.latest(drone_ids[0]), args.reads)
+    stop.set()
+    writer.join()
+    print(f"{'latest, ingesting:':<18} {median_us:8.1f} us median  {p99_us:8.1f} us p99")
+
+    # Sent at a steady rate, in one burst every 10 ms, to the service's asyncio listener
+    service = TelemetryService("127.0.0.1", 0)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    per_tick = max(1, round(args.udp_rate / 100 / (len(datagrams[0]) // MESSAGE_DTYPE.itemsize)))
+    started = time.perf_counter()
+    for tick, start in enumerate(range(0, len(datagrams), per_tick)):
+        for data in datagrams[start:start + per_tick]:
+            sock.sendto(data, service.address)
+        time.sleep(max(0.0, started + (tick + 1) / 100 - time.perf_counter()))
+    sent_s = time.perf_counter() - started
+    time.sleep(2 * service.flush_interval)
+    service.stop()
+    received = service.store.messages
+    print(f"UDP at {args.messages / sent_s / 1e3:,.0f}k msg/s: {received:,} of {args.messages:,} received "
+          f"({1 - received / args.messages:.1%} lost)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Measures tracking log ingestion throughput and history reads with and without snapshots.
+
+Usage:
+    python benchmarks/bench_tracking_log.py --events 200000 --orders 5000 --batch 500
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.tracking_log import SNAPSHOT_EVERY, TrackingLog  # noqa: E402
+
+LOCATIONS = ["서울 물류센터", "인천 드론 배송", "인천 송도 제1 스테이션"]
+
+
+def run(directory, args, snapshot_every):
+    rng = random.Random(0)
+    log = TrackingLog(directory, snapshot_every=snapshot_every, checkpoint_every=args.events + 1)
+    started = time.perf_counter()
+    for start in range(0, args.events, args.batch):
+        log.append(
+            (f"ORD-{rng.randrange(args.orders):07d}", "2024-11-20 09:30", rng.choice(LOCATIONS), "스캔")
+            for _ in range(min(args.batch, args.events - start))
+        )
+    ingest = time.perf_counter() - started
+
+    order_ids = [f"ORD-{rng.randrange(args.orders):07d}" for _ in range(args.reads)]
+    started = time.perf_counter()
+    for order_id in order_ids:
+        log.history(order_id)
+    read = time.perf_counter() - started
+    log.close()
+    return ingest, read
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--orders", type=int, default=5_000)
+    parser.add_argument("--batch", type=int, default=500, help="scan events per append (one fsync each)")
+    parser.add_argument("--reads", type=int, default=2_000)
+    args = parser.parse_args()
+
+    for label, snapshot_every in (("snapshots", SNAPSHOT_EVERY), ("full replay", args.events + 1)):
+        with tempfile.TemporaryDirectory() as directory:
+            ingest, read = run(directory, args, snapshot_every)
+        print(
+            f"{label:>11}: ingest {args.events / ingest:,.0f} events/s, "
+            f"history read {read / args.reads * 1000:.3f} ms ({args.events / args.orders:.0f} events per order)"
+        )
+
+
+if __name__ == "__main__":
+    main()
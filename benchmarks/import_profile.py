@@ -0,0 +1,102 @@
+"""Profiles the import cost of each page with `python -X importtime`.
+
+Only the top-level import statements of every page are executed, in a fresh
+interpreter per page, so the numbers are what a cold page start pays before
+any Streamlit element is rendered.
+
+Usage:
+    python benchmarks/import_profile.py
+    python benchmarks/import_profile.py --json import_profile.json
+    python benchmarks/import_profile.py --baseline import_profile.json
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Every page, so pages added later are profiled without editing this list
+PAGES = ["streamlit_app.py"] + sorted(
+    os.path.relpath(path, ROOT).replace(os.sep, "/") for path in glob.glob(os.path.join(ROOT, "pages", "*.py"))
+)
+# Packages that should only be imported when a dialog or table is rendered.
+HEAVY_MODULES = ["pandas", "pyarrow", "qrcode", "PIL"]
+
+
+def top_level_imports(page):
+    """Returns the source of a page's module-level import statements."""
+    with open(os.path.join(ROOT, page), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in imports)
+
+
+def profile_imports(source):
+    """Runs source under -X importtime and returns {module: (self_us, cumulative_us)}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", source],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        timings[module.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def page_report(page, top, streamlit_modules):
+    """Builds the import report of a single page."""
+    timings = profile_imports(top_level_imports(page))
+    total_us = sum(self_us for self_us, _ in timings.values())
+    # A running server has imported streamlit already; the rest is what each page start pays.
+    own = {name: timing for name, timing in timings.items() if name not in streamlit_modules}
+    own_us = sum(self_us for self_us, _ in own.values())
+    slowest = sorted(own.items(), key=lambda item: item[1][1], reverse=True)[:top]
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "own_ms": round(own_us / 1000, 1),
+        "modules": len(timings),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in timings],
+        "slowest": [{"module": name, "cumulative_ms": round(cum / 1000, 1)} for name, (_, cum) in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports to list per page")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="compare against a report written earlier with --json")
+    args = parser.parse_args()
+
+    streamlit_modules = set(profile_imports("import streamlit"))
+    report = {page: page_report(page, args.top, streamlit_modules) for page in PAGES}
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    for page, entry in report.items():
+        line = f"{page:<20} {entry['total_ms']:>8.1f} ms cold  {entry['own_ms']:>7.1f} ms beyond streamlit  {entry['modules']:>5} modules"
+        if baseline and page in baseline:
+            line += f"  ({entry['own_ms'] - baseline[page]['own_ms']:+.1f} ms vs baseline)"
+        print(line)
+        if entry["heavy_modules"]:
+            print(f"{'':<20} imports heavy modules at start-up: {', '.join(entry['heavy_modules'])}")
+        for slow in entry["slowest"]:
+            print(f"{'':<22}{slow['cumulative_ms']:>8.1f} ms  {slow['module']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
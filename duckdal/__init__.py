@@ -0,0 +1,17 @@
+"""Shared helpers for the DuckDal Streamlit pages.
+
+Submodules that need pandas, qrcode or PIL load them on first use, so
+importing this package keeps page start-up cheap.
+"""
+from duckdal.asset_cache import load_image_as_data_uri
+from duckdal.common import KST, ORDER_STATUSES, get_current_kst, get_status_color
+from duckdal.qr_codes import generate_qr_code
+
+__all__ = [
+    "KST",
+    "ORDER_STATUSES",
+    "generate_qr_code",
+    "get_current_kst",
+    "get_status_color",
+    "load_image_as_data_uri",
+]
@@ -0,0 +1,69 @@
+import base64
+import hashlib
+import mimetypes
+import os
+import threading
+
+import streamlit as st
+
+from duckdal.instrumentation import traced
+
+# Process-wide cache shared by every session.
+# path -> (mtime_ns, size, content hash)
+_path_index = {}
+# content hash -> encoded data URI
+_data_uris = {}
+_lock = threading.Lock()
+
+
+def _mime_type(image_path):
+    """Guesses the MIME type of an asset, defaulting to SVG."""
+    mime_type, _ = mimetypes.guess_type(image_path)
+    return mime_type or "image/svg+xml"
+
+
+@traced()
+def load_image_as_data_uri(image_path):
+    """Converts an image to a Data URI, reusing the cached encoding while the file is unchanged."""
+    try:
+        stat = os.stat(image_path)
+    except FileNotFoundError:
+        st.error(f"이미지를 찾을 수 없습니다: {image_path}")
+        return ""
+    except OSError as e:
+        st.error(f"이미지 로딩 중 오류 발생: {image_path}, 오류: {e}")
+        return ""
+
+    key = os.path.abspath(image_path)
+    with _lock:
+        entry = _path_index.get(key)
+        if entry and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            return _data_uris[entry[2]]
+
+    # The file is new or changed on disk: read it and key the encoding by content.
+    try:
+        with open(image_path, "rb") as img_file:
+            content = img_file.read()
+    except OSError as e:
+        st.error(f"이미지 로딩 중 오류 발생: {image_path}, 오류: {e}")
+        return ""
+
+    digest = hashlib.sha256(content).hexdigest()
+    with _lock:
+        data_uri = _data_uris.get(digest)
+        if data_uri is None:
+            encoded = base64.b64encode(content).decode()
+            data_uri = f"data:{_mime_type(image_path)};base64,{encoded}"
+            _data_uris[digest] = data_uri
+        if entry and entry[2] != digest and all(e[2] != entry[2] for k, e in _path_index.items() if k != key):
+            # Drop the stale encoding once no path refers to it anymore.
+            _data_uris.pop(entry[2], None)
+        _path_index[key] = (stat.st_mtime_ns, stat.st_size, digest)
+    return data_uri
+
+
+def clear_asset_cache():
+    """Drops every cached asset, forcing the next load to read from disk."""
+    with _lock:
+        _path_index.clear()
+        _data_uris.clear()
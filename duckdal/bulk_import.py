@@ -0,0 +1,191 @@
+from collections import namedtuple
+from datetime import date, datetime
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from duckdal.delivery_requests import REQUEST_FIELDS
+
+# Columns a manifest must have, with the request form's length limits (None: no limit)
+MANIFEST_COLUMNS = {
+    "sender_name": 50,
+    "sender_address": None,
+    "sender_contact": 15,
+    "recipient_name": 50,
+    "recipient_address": None,
+    "recipient_contact": 15,
+    "package_description": 100,
+    "package_weight": None,
+    "pickup_date": None,
+    "pickup_time": None,
+}
+# Optional; rows that leave it empty use the station chosen on the page
+STATION_COLUMN = "station_id"
+MIN_PACKAGE_WEIGHT = 0.1
+
+# Parquet is read this many rows at a time; CSV in blocks of this many bytes
+BATCH_ROWS = 20_000
+CSV_BLOCK_SIZE = 4 << 20
+# Errors beyond this many are counted but not listed
+MAX_REPORTED_ERRORS = 1_000
+
+RowError = namedtuple("RowError", ["row", "column", "message"])
+ImportResult = namedtuple("ImportResult", ["rows", "accepted", "rejected", "unlocated", "errors", "error_count"])
+
+_NUMBER = r"^\d+(\.\d+)?$"
+# Spreadsheets and Parquet time columns add seconds; the form stores "%H:%M"
+_SECONDS = r"^(\d{1,2}:\d{2}):\d{2}(\.\d+)?$"
+
+
+def _check_columns(names):
+    missing = [name for name in MANIFEST_COLUMNS if name not in names]
+    if missing:
+        raise ValueError(f"필수 열이 없습니다: {', '.join(missing)}")
+
+
+def _as_strings(batch):
+    """Returns the manifest columns of a batch as trimmed strings, with missing values as ""."""
+    columns = {}
+    for name in [*MANIFEST_COLUMNS, STATION_COLUMN]:
+        if name not in batch.schema.names:
+            continue
+        column = batch.column(name)
+        if not pa.types.is_string(column.type):
+            column = pc.cast(column, pa.string())
+        columns[name] = pc.utf8_trim_whitespace(pc.fill_null(column, ""))
+    return columns
+
+
+def read_manifest(source, filename, batch_rows=BATCH_ROWS):
+    """Yields a CSV or Parquet manifest as dicts of string columns, one batch at a time.
+
+    Only one batch is in memory at once. Every CSV column is read as text,
+    so contacts keep their leading zeros.
+    """
+    if filename.lower().endswith(".parquet"):
+        parquet = pq.ParquetFile(source)
+        _check_columns(parquet.schema_arrow.names)
+        for batch in parquet.iter_batches(batch_size=batch_rows):
+            yield _as_strings(batch)
+        return
+    reader = pa_csv.open_csv(
+        source,
+        read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in [*MANIFEST_COLUMNS, STATION_COLUMN]}
+        ),
+    )
+    _check_columns(reader.schema.names)
+    for batch in reader:
+        yield _as_strings(batch)
+
+
+def validate_batch(columns, today, station_ids, default_station_id):
+    """Checks a batch of manifest rows the way the request form does, one column at a time.
+
+    :return: (valid, checks): a table of the valid rows in the form's formats,
+        and (column, message, mask) for every check, the mask marking the rows that fail it
+    """
+    lengths = {name: pc.utf8_length(columns[name]) for name in MANIFEST_COLUMNS}
+    filled = {name: pc.greater(length, 0) for name, length in lengths.items()}
+    checks = []
+    for name, max_length in MANIFEST_COLUMNS.items():
+        checks.append((name, "필수 항목이 비어 있습니다", pc.invert(filled[name])))
+        if max_length:
+            checks.append((name, f"{max_length}자를 넘을 수 없습니다", pc.greater(lengths[name], max_length)))
+
+    weight_text = columns["package_weight"]
+    is_number = pc.match_substring_regex(weight_text, _NUMBER)
+    weight = pc.cast(pc.if_else(is_number, weight_text, "0"), pa.float64())
+    checks.append((
+        "package_weight",
+        f"{MIN_PACKAGE_WEIGHT}kg 이상의 숫자여야 합니다",
+        pc.and_(filled["package_weight"], pc.or_(pc.invert(is_number), pc.less(weight, MIN_PACKAGE_WEIGHT))),
+    ))
+
+    pickup_date = pc.strptime(columns["pickup_date"], format="%Y-%m-%d", unit="s", error_is_null=True)
+    earliest = pa.scalar(datetime.combine(today, datetime.min.time()), pa.timestamp("s"))
+    checks.append((
+        "pickup_date",
+        "오늘 이후의 YYYY-MM-DD 날짜여야 합니다",
+        # Unparseable dates compare as null and fail too
+        pc.and_(filled["pickup_date"], pc.fill_null(pc.less(pickup_date, earliest), True)),
+    ))
+
+    time_text = pc.replace_substring_regex(columns["pickup_time"], _SECONDS, r"\1")
+    pickup_time = pc.strptime(time_text, format="%H:%M", unit="s", error_is_null=True)
+    checks.append(("pickup_time", "HH:MM 시간이어야 합니다", pc.and_(filled["pickup_time"], pc.is_null(pickup_time))))
+
+    if STATION_COLUMN in columns:
+        station_text = columns[STATION_COLUMN]
+        station_given = pc.greater(pc.utf8_length(station_text), 0)
+        checks.append((
+            STATION_COLUMN,
+            "알 수 없는 스테이션입니다",
+            pc.and_(station_given, pc.invert(pc.is_in(station_text, value_set=pa.array(sorted(station_ids), pa.string())))),
+        ))
+        station = pc.if_else(station_given, station_text, default_station_id)
+    else:
+        station = pa.array([default_station_id] * len(weight), pa.string())
+
+    invalid = checks[0][2]
+    for _, _, mask in checks[1:]:
+        invalid = pc.or_(invalid, mask)
+    valid = pa.table({
+        **{name: columns[name] for name in MANIFEST_COLUMNS},
+        "package_weight": weight,
+        "pickup_date": pc.strftime(pickup_date, format="%Y-%m-%d"),
+        "pickup_time": pc.strftime(pickup_time, format="%H:%M"),
+        STATION_COLUMN: station,
+    }).filter(pc.invert(invalid))
+    return valid, checks
+
+
+def import_requests(source, filename, user_id, default_station_id, station_ids, writer=None, geocoder=None,
+                    today=None, batch_rows=BATCH_ROWS, max_errors=MAX_REPORTED_ERRORS):
+    """Validates a manifest batch by batch and commits each batch's valid rows in one transaction.
+
+    Rows with an error are skipped and reported; the rest of their batch is
+    still imported. Validation is vectorized, so only valid rows are turned
+    into Python values, and only one batch at a time.
+
+    :param writer: DeliveryRequestWriter to commit to; None only validates
+    :param geocoder: Geocoder for the sender and recipient addresses; None leaves the coordinates empty
+    :param today: earliest allowed pickup date, today by default
+    :return: ImportResult; accepted counts the valid rows, errors lists at most max_errors RowError, with 1-based data row numbers
+    """
+    today = today or date.today()
+    rows = accepted = rejected = unlocated = error_count = 0
+    errors = []
+    for columns in read_manifest(source, filename, batch_rows):
+        valid, checks = validate_batch(columns, today, station_ids, default_station_id)
+        # Each check keeps its first rows that can still be listed; sorting merges them in row order
+        batch_errors = []
+        for column, message, mask in checks:
+            failed = pc.sum(mask).as_py() or 0
+            error_count += failed
+            if failed and len(errors) < max_errors:
+                for index in pc.indices_nonzero(mask)[:max_errors - len(errors)].to_pylist():
+                    batch_errors.append(RowError(rows + index + 1, column, message))
+        errors.extend(sorted(batch_errors, key=lambda error: error.row)[:max_errors - len(errors)])
+        batch_size = len(columns["sender_name"])
+        rejected += batch_size - valid.num_rows
+        rows += batch_size
+        accepted += valid.num_rows
+        if valid.num_rows == 0 or (writer is None and geocoder is None):
+            continue
+
+        # Through NumPy, which builds the Python strings several times faster than to_pylist()
+        values = {name: valid.column(name).to_numpy(zero_copy_only=False).tolist() for name in valid.column_names}
+        for prefix in ("sender", "recipient"):
+            locations = geocoder.geocode_many(values[f"{prefix}_address"]) if geocoder else [None] * valid.num_rows
+            values[f"{prefix}_lat"] = [location.lat if location else None for location in locations]
+            values[f"{prefix}_lon"] = [location.lon if location else None for location in locations]
+        if geocoder:
+            unlocated += values["recipient_lat"].count(None)
+        values["user_id"] = [user_id] * valid.num_rows
+        if writer is not None:
+            writer.write_many(zip(*(values[field] for field in REQUEST_FIELDS)))
+    return ImportResult(rows, accepted, rejected, unlocated, errors, error_count)
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+import pytz  # For timezone handling
+
+# Define the KST timezone globally
+KST = pytz.timezone("Asia/Seoul")
+
+ORDER_STATUSES = ["배송중", "배달 완료", "취소됨"]
+STATUS_COLORS = {
+    "배달 완료": "#28a745",  # Green
+    "배송중": "#ffc107",     # Yellow
+    "취소됨": "#dc3545"      # Red
+}
+DEFAULT_STATUS_COLOR = "#6c757d"  # Gray
+
+
+def get_current_kst():
+    """Returns the current Korean Standard Time (KST)."""
+    return datetime.now(KST)
+
+
+def get_status_color(status):
+    """Returns color based on order status."""
+    return STATUS_COLORS.get(status, DEFAULT_STATUS_COLOR)
@@ -0,0 +1,275 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+DEFAULT_DB_PATH = os.environ.get("DUCKDAL_REQUESTS_DB", os.path.join("data", "delivery_requests.db"))
+
+# Flush when this many requests are queued or the oldest one has waited this long.
+MAX_BATCH_SIZE = 500
+MAX_BATCH_DELAY = 0.05
+# A batch that still fails after this many attempts is spilled to a file instead
+MAX_WRITE_ATTEMPTS = 5
+RETRY_DELAY = 1.0
+# How long close() waits for the writer thread, so shutdown never hangs on a broken database
+CLOSE_TIMEOUT = 30.0
+
+REQUEST_FIELDS = [
+    "user_id",
+    "sender_name",
+    "sender_address",
+    "sender_contact",
+    "recipient_name",
+    "recipient_address",
+    "recipient_contact",
+    "package_description",
+    "package_weight",
+    "pickup_date",
+    "pickup_time",
+    "station_id",
+    "sender_lat",
+    "sender_lon",
+    "recipient_lat",
+    "recipient_lon",
+]
+# Left empty when an address could not be geocoded
+OPTIONAL_FIELDS = {"sender_lat", "sender_lon", "recipient_lat", "recipient_lon"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS delivery_requests (
+    id TEXT PRIMARY KEY,
+    submitted_at TEXT NOT NULL,
+    user_id TEXT,
+    sender_name TEXT NOT NULL,
+    sender_address TEXT NOT NULL,
+    sender_contact TEXT NOT NULL,
+    recipient_name TEXT NOT NULL,
+    recipient_address TEXT NOT NULL,
+    recipient_contact TEXT NOT NULL,
+    package_description TEXT NOT NULL,
+    package_weight REAL NOT NULL,
+    pickup_date TEXT NOT NULL,
+    pickup_time TEXT NOT NULL,
+    station_id TEXT,
+    sender_lat REAL,
+    sender_lon REAL,
+    recipient_lat REAL,
+    recipient_lon REAL,
+    status TEXT NOT NULL DEFAULT 'pending'
+);
+CREATE INDEX IF NOT EXISTS idx_delivery_requests_status ON delivery_requests (status, pickup_date, pickup_time);
+CREATE INDEX IF NOT EXISTS idx_delivery_requests_user ON delivery_requests (user_id);
+"""
+
+# Columns added after the first release, created on stores that predate them
+_ADDED_COLUMNS = {
+    "station_id": "TEXT",
+    "sender_lat": "REAL",
+    "sender_lon": "REAL",
+    "recipient_lat": "REAL",
+    "recipient_lon": "REAL",
+}
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def new_request_id():
+    """Returns a new, unique delivery request id."""
+    return f"REQ-{uuid.uuid4().hex[:12].upper()}"
+
+
+def new_request_ids(count):
+    """Returns count new request ids, drawn from one read of the random source."""
+    # The first 12 hex digits of a uuid4 are random too, so the ids look and collide the same
+    digits = os.urandom(6 * count).hex().upper()
+    return [f"REQ-{digits[start:start + 12]}" for start in range(0, 12 * count, 12)]
+
+
+class DeliveryRequestWriter:
+    """Accepts delivery requests without blocking and writes them to SQLite in batches.
+
+    submit() only enqueues; a background thread commits everything that has
+    queued up in one transaction, so one fsync covers a whole batch.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, max_batch_size=MAX_BATCH_SIZE, max_batch_delay=MAX_BATCH_DELAY):
+        self.path = path
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self._queue = queue.Queue()
+        self._closed = False
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(delivery_requests)")}
+        for column, column_type in _ADDED_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE delivery_requests ADD COLUMN {column} {column_type}")
+        conn.close()
+        self._thread = threading.Thread(target=self._run, name="delivery-request-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, request):
+        """Queues a delivery request and returns its id immediately.
+
+        :param request: dict with the REQUEST_FIELDS, pickup_date as "%Y-%m-%d" and pickup_time as "%H:%M";
+            user_id set to the submitting user and station_id to the chosen pickup station;
+            the sender_/recipient_ lat and lon may be missing
+        :return: the id the request will be stored under
+        """
+        if self._closed:
+            raise RuntimeError("DeliveryRequestWriter is closed")
+        request_id = new_request_id()
+        row = (
+            request_id,
+            datetime.now().isoformat(timespec="seconds"),
+            *(request.get(field) if field in OPTIONAL_FIELDS else request[field] for field in REQUEST_FIELDS),
+        )
+        self._queue.put(row)
+        return request_id
+
+    def write_many(self, requests):
+        """Commits many requests in one transaction, bypassing the queue; for bulk imports.
+
+        :param requests: iterable of tuples of the REQUEST_FIELDS values, in that order
+        :return: the ids the requests were stored under
+        """
+        if self._closed:
+            raise RuntimeError("DeliveryRequestWriter is closed")
+        submitted_at = datetime.now().isoformat(timespec="seconds")
+        requests = list(requests)
+        rows = [
+            (request_id, submitted_at, *request)
+            for request_id, request in zip(new_request_ids(len(requests)), requests)
+        ]
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO delivery_requests (id, submitted_at, {', '.join(REQUEST_FIELDS)}) "
+                    f"VALUES ({', '.join('?' * (len(REQUEST_FIELDS) + 2))})",
+                    rows,
+                )
+        finally:
+            conn.close()
+        return [row[0] for row in rows]
+
+    def pending(self):
+        """Returns the number of queued requests that are not committed yet."""
+        return self._queue.unfinished_tasks
+
+    def flush(self):
+        """Blocks until every request submitted so far is committed."""
+        self._queue.join()
+
+    @property
+    def spill_path(self):
+        """JSON-lines file next to the database that receives requests which could not be committed."""
+        return f"{os.path.splitext(self.path)[0]}-unwritten.jsonl"
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Flushes outstanding requests and stops the writer thread, waiting at most timeout seconds."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error("Delivery request writer did not stop within %.0f s; %d requests may be lost",
+                         timeout, self.pending())
+
+    def _next_batch(self):
+        """Waits for one request, then collects more until the batch is full or its delay has passed."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_batch_delay
+        while len(batch) < self.max_batch_size and batch[-1] is not _STOP:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        conn = sqlite3.connect(self.path)
+        # With WAL, FULL syncs on every commit; batching turns that into one fsync per batch.
+        conn.execute("PRAGMA synchronous=FULL")
+        stopping = False
+        while not stopping:
+            batch = self._next_batch()
+            if batch[-1] is _STOP:
+                stopping = True
+            rows = [row for row in batch if row is not _STOP]
+            if rows:
+                self._write_batch(conn, rows)
+            for _ in batch:
+                self._queue.task_done()
+        conn.close()
+
+    def _write_batch(self, conn, rows):
+        """Commits a batch, retrying a few times.
+
+        The form has already been answered, so a batch that keeps failing is
+        spilled to spill_path rather than retried forever.
+        """
+        for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+            try:
+                with conn:
+                    conn.executemany(
+                        f"INSERT INTO delivery_requests (id, submitted_at, {', '.join(REQUEST_FIELDS)}) "
+                        f"VALUES ({', '.join('?' * (len(REQUEST_FIELDS) + 2))})",
+                        rows,
+                    )
+                return
+            except sqlite3.Error:
+                logger.exception("Failed to write %d delivery requests (attempt %d of %d)",
+                                 len(rows), attempt, MAX_WRITE_ATTEMPTS)
+                if attempt < MAX_WRITE_ATTEMPTS:
+                    time.sleep(RETRY_DELAY)
+        columns = ["id", "submitted_at", *REQUEST_FIELDS]
+        try:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+        except OSError:
+            logger.exception("Dropped %d delivery requests: %s", len(rows), ", ".join(row[0] for row in rows))
+        else:
+            logger.error("Spilled %d unwritten delivery requests to %s", len(rows), self.spill_path)
+
+    def get_request(self, request_id):
+        """Returns a committed delivery request as a dict, or None."""
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute("SELECT * FROM delivery_requests WHERE id = ?", (request_id,)).fetchone()
+        finally:
+            conn.close()
+        return dict(row) if row else None
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_delivery_request_writer():
+    """Returns the process-wide delivery request writer, starting it on first use."""
+    global _writer
+
+    with _writer_lock:
+        if _writer is None:
+            _writer = DeliveryRequestWriter()
+            atexit.register(_writer.close)
+        return _writer
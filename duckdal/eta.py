@@ -0,0 +1,167 @@
+import threading
+from datetime import datetime
+
+import numpy as np
+from cachetools import LRUCache
+
+from duckdal.stations import EARTH_RADIUS_KM
+
+CRUISE_SPEED_KMH = 60.0
+# Take-off, landing and handover added to every delivery
+HANDLING_MINUTES = 5.0
+# Destinations are cached per grid cell of this size (about 500 m north-south)
+GRID_DEG = 0.005
+MAX_CACHED_CELLS = 1_000_000
+
+# Bit layout of the int64 cache key: station index | cell row | cell column
+_CELL_OFFSET = 1 << 17
+_CELL_BITS = 18
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between coordinate arrays (broadcast like NumPy)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class EtaEngine:
+    """Computes drone flight times from stations to destinations in bulk.
+
+    Flight time is cached per (station, destination grid cell); a batch only
+    computes haversine distances for the cells it has not seen before, all in
+    one vectorized call.
+    """
+
+    def __init__(self, cruise_speed_kmh=CRUISE_SPEED_KMH, handling_minutes=HANDLING_MINUTES,
+                 grid_deg=GRID_DEG, max_cached_cells=MAX_CACHED_CELLS):
+        self.cruise_speed_kmh = cruise_speed_kmh
+        self.handling_minutes = handling_minutes
+        self.grid_deg = grid_deg
+        self._cache = LRUCache(maxsize=max_cached_cells)
+        self._stations = {}
+        self._lock = threading.Lock()
+
+    def _station_indexes(self, station_lat, station_lon, size):
+        """Maps station coordinates to small integers that are stable for this engine."""
+        station_lat = np.broadcast_to(np.asarray(station_lat, dtype=np.float64), size)
+        station_lon = np.broadcast_to(np.asarray(station_lon, dtype=np.float64), size)
+        stations, inverse = np.unique(np.stack([station_lat, station_lon], axis=1), axis=0, return_inverse=True)
+        with self._lock:
+            ids = np.array(
+                [self._stations.setdefault((lat, lon), len(self._stations)) for lat, lon in stations.tolist()],
+                dtype=np.int64,
+            )
+        return ids[inverse.reshape(-1)], stations[inverse.reshape(-1)]
+
+    def flight_minutes(self, station_lat, station_lon, dest_lat, dest_lon):
+        """Returns door-to-door minutes for every destination, handling time included.
+
+        Station coordinates may be scalars (one station for all) or arrays.
+        """
+        dest_lat = np.asarray(dest_lat, dtype=np.float64).reshape(-1)
+        dest_lon = np.asarray(dest_lon, dtype=np.float64).reshape(-1)
+        if dest_lat.size == 0:
+            return np.empty(0)
+        station_ids, station_coords = self._station_indexes(station_lat, station_lon, dest_lat.size)
+
+        cell_lat = np.floor(dest_lat / self.grid_deg).astype(np.int64)
+        cell_lon = np.floor(dest_lon / self.grid_deg).astype(np.int64)
+        keys = (
+            (station_ids << (2 * _CELL_BITS))
+            | ((cell_lat + _CELL_OFFSET) << _CELL_BITS)
+            | (cell_lon + _CELL_OFFSET)
+        )
+        unique_keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+        with self._lock:
+            minutes = np.array([self._cache.get(key, np.nan) for key in unique_keys.tolist()])
+        missing = np.isnan(minutes)
+        if missing.any():
+            rows = first[missing]
+            # Distances are measured to the centre of the destination's cell.
+            centre_lat = (cell_lat[rows] + 0.5) * self.grid_deg
+            centre_lon = (cell_lon[rows] + 0.5) * self.grid_deg
+            distance = haversine_km(station_coords[rows, 0], station_coords[rows, 1], centre_lat, centre_lon)
+            minutes[missing] = distance / self.cruise_speed_kmh * 60 + self.handling_minutes
+            with self._lock:
+                for key, value in zip(unique_keys[missing].tolist(), minutes[missing].tolist()):
+                    self._cache[key] = value
+        return minutes[inverse.reshape(-1)]
+
+    def estimate_arrivals(self, departure, station_lat, station_lon, dest_lat, dest_lon):
+        """Returns numpy datetime64 arrival times for drones leaving at departure.
+
+        departure is one datetime for every drone or a sequence of naive datetimes, one per destination.
+        """
+        minutes = self.flight_minutes(station_lat, station_lon, dest_lat, dest_lon)
+        if isinstance(departure, datetime):
+            departure = departure.replace(tzinfo=None)
+        departure = np.asarray(departure, dtype="datetime64[s]")
+        return departure + np.round(minutes * 60).astype("timedelta64[s]")
+
+
+def plan_route(start_lat, start_lon, stop_lats, stop_lons, return_to_start=True):
+    """Orders the stops of one multi-stop flight with nearest neighbour, then 2-opt.
+
+    Not used by the pages yet: every delivery is still flown as its own sortie.
+
+    :return: (stop indexes in visiting order, total distance in km)
+    """
+    lats = np.concatenate([[start_lat], np.asarray(stop_lats, dtype=np.float64)])
+    lons = np.concatenate([[start_lon], np.asarray(stop_lons, dtype=np.float64)])
+    size = lats.size
+    if size == 1:
+        return [], 0.0
+    distances = haversine_km(lats[:, None], lons[:, None], lats[None, :], lons[None, :])
+
+    # Nearest neighbour tour from the station (node 0)
+    route = [0]
+    unvisited = np.ones(size, dtype=bool)
+    unvisited[0] = False
+    for _ in range(size - 1):
+        remaining = np.where(unvisited, distances[route[-1]], np.inf)
+        nearest = int(np.argmin(remaining))
+        route.append(nearest)
+        unvisited[nearest] = False
+    route.append(0)
+    route = np.array(route)
+
+    # 2-opt: reverse route[i:j + 1] while that shortens the tour. For a one-way
+    # flight the leg back to the station costs nothing.
+    if not return_to_start:
+        distances = distances.copy()
+        distances[:, 0] = 0.0
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, size - 1):
+            a, b = route[i - 1], route[i]
+            c, d = route[i + 1:size], route[i + 2:size + 1]
+            delta = distances[a, c] + distances[b, d] - distances[a, b] - distances[c, d]
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                route[i:i + j + 2] = route[i:i + j + 2][::-1]
+                improved = True
+
+    legs = distances[route[:-1], route[1:]]
+    return (route[1:-1] - 1).tolist(), float(legs.sum())
+
+
+def plan_routes(start_lat, start_lon, stop_groups, return_to_start=True):
+    """Plans one route per group of (lats, lons) stops, all from the same station."""
+    return [plan_route(start_lat, start_lon, lats, lons, return_to_start) for lats, lons in stop_groups]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_eta_engine():
+    """Returns the process-wide ETA engine, sharing its cell cache across sessions."""
+    global _engine
+
+    with _engine_lock:
+        if _engine is None:
+            _engine = EtaEngine()
+        return _engine
@@ -0,0 +1,267 @@
+import csv
+import functools
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import namedtuple
+
+from cachetools import LRUCache
+
+DEFAULT_DB_PATH = os.environ.get("DUCKDAL_GAZETTEER_DB", os.path.join("data", "gazetteer.db"))
+# Sample gazetteer loaded into an empty store; scripts/load_gazetteer.py loads a full one
+DEFAULT_GAZETTEER_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.csv")
+
+GEOCODE_CACHE_SIZE = 100_000
+# SQLite's default limit on bound parameters is 999
+LOOKUP_CHUNK_SIZE = 900
+
+# Province names as people type them -> the official name used in the gazetteer
+SIDO_ALIASES = {
+    "서울": "서울특별시", "서울시": "서울특별시", "서울특별시": "서울특별시",
+    "인천": "인천광역시", "인천시": "인천광역시", "인천광역시": "인천광역시",
+    "부산": "부산광역시", "부산시": "부산광역시", "부산광역시": "부산광역시",
+    "대구": "대구광역시", "대구시": "대구광역시", "대구광역시": "대구광역시",
+    "광주": "광주광역시", "광주광역시": "광주광역시",
+    "대전": "대전광역시", "대전시": "대전광역시", "대전광역시": "대전광역시",
+    "울산": "울산광역시", "울산시": "울산광역시", "울산광역시": "울산광역시",
+    "세종": "세종특별자치시", "세종시": "세종특별자치시", "세종특별자치시": "세종특별자치시",
+    "경기": "경기도", "경기도": "경기도",
+    "강원": "강원특별자치도", "강원도": "강원특별자치도", "강원특별자치도": "강원특별자치도",
+    "충북": "충청북도", "충청북도": "충청북도",
+    "충남": "충청남도", "충청남도": "충청남도",
+    "전북": "전북특별자치도", "전라북도": "전북특별자치도", "전북특별자치도": "전북특별자치도",
+    "전남": "전라남도", "전라남도": "전라남도",
+    "경북": "경상북도", "경상북도": "경상북도",
+    "경남": "경상남도", "경상남도": "경상남도",
+    "제주": "제주특별자치도", "제주도": "제주특별자치도", "제주특별자치도": "제주특별자치도",
+}
+
+logger = logging.getLogger(__name__)
+
+NormalizedAddress = namedtuple("NormalizedAddress", ["sido", "sigungu", "name", "number"])
+Geocode = namedtuple("Geocode", ["lat", "lon", "precision", "matched"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS gazetteer (
+    key TEXT NOT NULL,
+    sido TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    precision TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_gazetteer_key ON gazetteer (key);
+"""
+
+_PARENTHESES = re.compile(r"\([^)]*\)")
+# "테헤란로152", "송도동1" -> "테헤란로 152", "송도동 1"
+_GLUED_NUMBER = re.compile(r"([가-힣](?:로|길|동|리|가))(산?\d)")
+_NUMBER = re.compile(r"^(산)?0*(\d+)(?:-0*(\d+))?$")
+
+
+def _is_sigungu(token):
+    return len(token) > 1 and token[-1] in "시군구"
+
+
+def _is_street(token):
+    return len(token) > 1 and token[-1] in "로길동리가"
+
+
+@functools.lru_cache(maxsize=GEOCODE_CACHE_SIZE)
+def normalize_address(address):
+    """Splits a Korean road-name or lot-number address into province, district, street and number.
+
+    Spelling variants normalize to the same result: abbreviated provinces
+    ("서울" -> "서울특별시"), "번지", parentheses, spacing and the detail
+    after a comma (building and unit) are dropped, and numbers lose their
+    leading zeros. Parts that cannot be found are None.
+    """
+    text = unicodedata.normalize("NFC", address or "")
+    text = _PARENTHESES.sub(" ", text).split(",")[0]
+    text = _GLUED_NUMBER.sub(r"\1 \2", text.replace("번지", " "))
+    tokens = text.split()
+
+    sido = SIDO_ALIASES.get(tokens[0]) if tokens else None
+    if sido:
+        tokens = tokens[1:]
+    district = []
+    while tokens and _is_sigungu(tokens[0]):
+        district.append(tokens.pop(0))
+    street = []
+    # Towns and townships ("읍", "면") come before the village ("리") they contain
+    while tokens and tokens[0][-1] in "읍면" and len(tokens) > 1:
+        street.append(tokens.pop(0))
+    if tokens and _is_street(tokens[0]):
+        street.append(tokens.pop(0))
+    number = None
+    if street and tokens:
+        match = _NUMBER.match(tokens[0])
+        if match:
+            mountain, main, sub = match.groups()
+            number = f"{mountain or ''}{main}" + (f"-{sub}" if sub and sub != "0" else "")
+    return NormalizedAddress(
+        sido,
+        " ".join(district) or None,
+        " ".join(street) or None,
+        number,
+    )
+
+
+def lookup_keys(normalized):
+    """Returns the gazetteer keys to try for an address, most precise first, as (precision, key) pairs.
+
+    Cities with no district below the province (세종특별자치시) are keyed
+    by the province instead.
+    """
+    district = normalized.sigungu or normalized.sido
+    if not district:
+        return []
+    keys = []
+    if normalized.name and normalized.number:
+        keys.append(("address", f"{district} {normalized.name} {normalized.number}"))
+    if normalized.name:
+        keys.append(("street", f"{district} {normalized.name}"))
+    keys.append(("district", district))
+    return keys
+
+
+class Geocoder:
+    """Resolves addresses to coordinates from a local gazetteer, without a network service.
+
+    The gazetteer lives in SQLite, indexed by district, street and number
+    without the province, so addresses typed without one still resolve
+    when the district name is unique. Results are kept in an LRU cache
+    keyed by the normalized address, so spelling variants share an entry.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, csv_path=DEFAULT_GAZETTEER_CSV, cache_size=GEOCODE_CACHE_SIZE):
+        self.path = path
+        self._local = threading.local()
+        self._cache = LRUCache(maxsize=cache_size)
+        self._cache_lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        if csv_path and conn.execute("SELECT 1 FROM gazetteer LIMIT 1").fetchone() is None:
+            self.load_csv(csv_path)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def load_csv(self, csv_path, replace=False, batch_size=50_000):
+        """Loads gazetteer rows from a CSV with sido, sigungu, name, number, lat and lon columns.
+
+        Rows without a name are district centroids and rows without a
+        number are street or neighbourhood centroids. Rows with neither a
+        known province nor a district cannot be looked up and are skipped.
+        Returns the number of rows loaded.
+        """
+        conn = self._connection()
+        loaded = skipped = 0
+        with open(csv_path, encoding="utf-8", newline="") as f, conn:
+            if replace:
+                conn.execute("DELETE FROM gazetteer")
+            batch = []
+            for row in csv.DictReader(f):
+                # Bypasses the LRU, which is meant for lookups rather than a bulk load
+                normalized = normalize_address.__wrapped__(
+                    " ".join(part for part in (row["sido"], row["sigungu"], row["name"], row["number"]) if part)
+                )
+                keys = lookup_keys(normalized)
+                if not keys:
+                    skipped += 1
+                    continue
+                precision, key = keys[0]
+                batch.append((key, normalized.sido or row["sido"], float(row["lat"]), float(row["lon"]), precision))
+                if len(batch) >= batch_size:
+                    conn.executemany("INSERT INTO gazetteer VALUES (?, ?, ?, ?, ?)", batch)
+                    loaded += len(batch)
+                    batch = []
+            conn.executemany("INSERT INTO gazetteer VALUES (?, ?, ?, ?, ?)", batch)
+            loaded += len(batch)
+        if skipped:
+            logger.warning("Skipped %d gazetteer rows in %s without a province or district", skipped, csv_path)
+        self.clear_cache()
+        return loaded
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def geocode(self, address):
+        """Returns a Geocode for one address, or None if not even its district is known."""
+        return self.geocode_many([address])[0]
+
+    def geocode_many(self, addresses):
+        """Resolves many addresses with one indexed query per chunk of distinct lookup keys.
+
+        :return: list of Geocode or None, in the order of addresses
+        """
+        normalized = [normalize_address(address) for address in addresses]
+        results = {}
+        with self._cache_lock:
+            for address in normalized:
+                if address in self._cache:
+                    results[address] = self._cache[address]
+        missing = {address for address in normalized if address not in results}
+        if missing:
+            rows = self._lookup({key for address in missing for _, key in lookup_keys(address)})
+            resolved = {address: self._resolve(address, rows) for address in missing}
+            with self._cache_lock:
+                self._cache.update(resolved)
+            results.update(resolved)
+        return [results[address] for address in normalized]
+
+    def _lookup(self, keys):
+        """Returns {key: [(sido, lat, lon, precision), ...]} for the keys present in the gazetteer."""
+        conn = self._connection()
+        rows = {}
+        keys = list(keys)
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            for key, sido, lat, lon, precision in conn.execute(
+                f"SELECT key, sido, lat, lon, precision FROM gazetteer WHERE key IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ):
+                rows.setdefault(key, []).append((sido, lat, lon, precision))
+        return rows
+
+    @staticmethod
+    def _resolve(address, rows):
+        for precision, key in lookup_keys(address):
+            candidates = [
+                row for row in rows.get(key, ())
+                if row[3] == precision and (address.sido is None or row[0] == address.sido)
+            ]
+            if not candidates:
+                continue
+            if len({row[0] for row in candidates}) > 1:
+                # The same district or street name in several provinces; only the province can tell them apart
+                return None
+            # Repeated rows for one place (e.g. several entrances) resolve to the first
+            sido, lat, lon, _ = candidates[0]
+            return Geocode(lat, lon, precision, f"{sido} {key}" if address.sigungu else key)
+        return None
+
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+
+def get_geocoder():
+    """Returns the process-wide geocoder, loading the sample gazetteer into an empty store."""
+    global _geocoder
+
+    with _geocoder_lock:
+        if _geocoder is None:
+            _geocoder = Geocoder()
+        return _geocoder
@@ -0,0 +1,167 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter, namedtuple
+
+# Set DUCKDAL_PROFILE=1 to time the instrumented functions and show the sidebar overlay.
+# Setting DUCKDAL_TRACE_FILE also enables profiling and appends one JSON line per rerun to that file.
+TRACE_FILE = os.environ.get("DUCKDAL_TRACE_FILE")
+ENABLED = os.environ.get("DUCKDAL_PROFILE") == "1" or bool(TRACE_FILE)
+
+Span = namedtuple("Span", ["name", "depth", "start_ms", "duration_ms", "elements"])
+
+_trace_file_lock = threading.Lock()
+
+
+class RerunTrace:
+    """The spans and Streamlit elements recorded during one script run of one session."""
+
+    def __init__(self, ctx):
+        self.session_id = ctx.session_id
+        self.page = ctx.pages_manager.get_pages().get(ctx.page_script_hash, {}).get("page_name", "")
+        self.fragment = bool(ctx.fragment_ids_this_run)
+        self.started_at = time.time()
+        self.spans = []
+        self.elements = Counter()
+        self.finished = False
+        # Streamlit gives every script run a fresh cursors dict, which tells runs apart
+        self._run_marker = ctx.cursors
+        self._started = time.perf_counter()
+        self._depth = 0
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self._started) * 1000
+
+    def element_count(self):
+        return sum(self.elements.values())
+
+    def ordered_spans(self):
+        """Returns the spans in call order; they are recorded as they finish."""
+        return sorted(self.spans, key=lambda span: span.start_ms)
+
+    def to_dict(self):
+        return {
+            "session": self.session_id,
+            "page": self.page,
+            "fragment": self.fragment,
+            "started_at": self.started_at,
+            "duration_ms": round(self.elapsed_ms(), 3),
+            "elements": dict(self.elements),
+            "spans": [span._asdict() for span in self.ordered_spans()],
+        }
+
+
+def _count_elements(ctx):
+    """Routes the session's outgoing messages through the current trace's element counter."""
+    enqueue = ctx._enqueue
+    if getattr(enqueue, "counts_elements", False):
+        return
+
+    def counting_enqueue(msg):
+        trace = getattr(ctx, "duckdal_trace", None)
+        if trace is not None and msg.HasField("delta"):
+            trace.elements[msg.delta.WhichOneof("type")] += 1
+        enqueue(msg)
+
+    counting_enqueue.counts_elements = True
+    ctx._enqueue = counting_enqueue
+
+
+def current_trace():
+    """Returns the trace of the script run on this thread, starting one for a new run; None outside a run.
+
+    Runs that end before profile_overlay(), such as fragment reruns and
+    redirects, have their trace written when the session's next run starts.
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    trace = getattr(ctx, "duckdal_trace", None)
+    if trace is None or trace._run_marker is not ctx.cursors:
+        if trace is not None:
+            finish_trace(trace)
+        trace = RerunTrace(ctx)
+        _count_elements(ctx)
+        ctx.duckdal_trace = trace
+    return trace
+
+
+def finish_trace(trace):
+    """Closes a trace and appends it to DUCKDAL_TRACE_FILE, once."""
+    if trace.finished:
+        return
+    trace.finished = True
+    if TRACE_FILE:
+        line = json.dumps(trace.to_dict(), ensure_ascii=False)
+        with _trace_file_lock, open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def traced(name=None):
+    """Decorator that records a span for every call made during a script run.
+
+    Returns the function unchanged when profiling is off, so instrumented
+    code costs nothing in production.
+    """
+
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = current_trace()
+            if trace is None or trace.finished:
+                return fn(*args, **kwargs)
+            depth = trace._depth
+            trace._depth += 1
+            start_ms = trace.elapsed_ms()
+            elements = trace.element_count()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                trace._depth = depth
+                trace.spans.append(
+                    Span(
+                        span_name,
+                        depth,
+                        round(start_ms, 3),
+                        round(trace.elapsed_ms() - start_ms, 3),
+                        trace.element_count() - elements,
+                    )
+                )
+
+        return wrapper
+
+    return decorator
+
+
+def profile_overlay():
+    """Shows this rerun's spans in the sidebar and writes its trace; call at the end of a page."""
+    if not ENABLED:
+        return
+    import streamlit as st
+
+    trace = current_trace()
+    if trace is None:
+        return
+    with st.sidebar.expander(f"⏱ Rerun {trace.elapsed_ms():.1f} ms · {trace.element_count()} elements"):
+        st.dataframe(
+            [
+                {
+                    "span": "  " * span.depth + span.name,
+                    "ms": span.duration_ms,
+                    "elements": span.elements,
+                }
+                for span in trace.ordered_spans()
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.caption(", ".join(f"{kind} {count}" for kind, count in trace.elements.most_common()))
+    finish_trace(trace)
@@ -0,0 +1,154 @@
+import functools
+import io
+import multiprocessing
+import os
+import threading
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from duckdal.qr_codes import qr_modules
+
+Label = namedtuple("Label", ["tracking_number", "lines"])
+SheetLayout = namedtuple("SheetLayout", ["width", "height", "columns", "rows", "margin", "padding", "dpi"])
+
+# A4 at 150 dpi, 2 x 7 labels of about 99 x 38 mm, the common 14-up shipping label sheet
+A4_14_UP = SheetLayout(1240, 1754, 2, 7, 48, 14, 150)
+
+# MIME type of the download for each sheet format; PNG pages are bundled in a ZIP archive
+SHEET_FORMATS = {"pdf": "application/pdf", "png": "application/zip"}
+
+# Jobs of up to this many pages render in the calling process; sending them to the pool costs more
+INLINE_MAX_PAGES = 2
+# Pages handed to a worker at once; amortizes the transfer while still spreading small jobs
+PAGES_PER_TASK = 4
+# Any mask gives a valid code; choosing the best one per label costs more than the rest of the label.
+# Printed labels are scanned up close, where the mask makes no difference.
+LABEL_QR_MASK = 0
+
+
+@functools.lru_cache(maxsize=None)
+def _font(size):
+    from PIL import ImageFont
+
+    # Pillow's built-in scalable font; it covers Latin text such as tracking numbers, not Hangul
+    return ImageFont.load_default(size=size)
+
+
+@functools.lru_cache(maxsize=1024)
+def _text_image(text, size):
+    """Renders one line of text; lines such as launch slots repeat on many labels."""
+    from PIL import Image, ImageDraw
+
+    font = _font(size)
+    left, top, right, bottom = font.getbbox(text)
+    image = Image.new("1", (right, bottom), 1)
+    ImageDraw.Draw(image).text((0, 0), text, font=font, fill=0)
+    return image
+
+
+def render_sheet(labels, layout=A4_14_UP):
+    """Tiles up to one page of labels into a black-and-white sheet image.
+
+    Each label has its QR code on the left and the tracking number and
+    the label's lines on the right, inside a cut outline.
+    """
+    from PIL import Image, ImageDraw
+
+    sheet = Image.new("1", (layout.width, layout.height), 1)
+    draw = ImageDraw.Draw(sheet)
+    cell_width = (layout.width - 2 * layout.margin) // layout.columns
+    cell_height = (layout.height - 2 * layout.margin) // layout.rows
+    qr_size = cell_height - 2 * layout.padding
+    title_size, line_size = cell_height // 7, cell_height // 10
+    for index, label in enumerate(labels):
+        x = layout.margin + index % layout.columns * cell_width
+        y = layout.margin + index // layout.columns * cell_height
+        draw.rectangle([x, y, x + cell_width - 1, y + cell_height - 1], outline=0)
+
+        modules = qr_modules(label.tracking_number, mask_pattern=LABEL_QR_MASK)
+        # Whole pixels per module keep the code sharp; mode "1" takes a bool array with True as white
+        scale = qr_size // len(modules)
+        code = Image.fromarray((~modules).repeat(scale, axis=0).repeat(scale, axis=1))
+        offset = (qr_size - code.height) // 2
+        sheet.paste(code, (x + layout.padding + offset, y + layout.padding + offset))
+
+        text_x = x + qr_size + 2 * layout.padding
+        text_y = y + 2 * layout.padding
+        draw.text((text_x, text_y), label.tracking_number, font=_font(title_size), fill=0)
+        text_y += title_size * 3 // 2
+        for line in label.lines:
+            sheet.paste(_text_image(line, line_size), (text_x, text_y))
+            text_y += line_size * 4 // 3
+    return sheet
+
+
+def _render_pages(pages, layout, fmt):
+    """Renders pages of labels; returns each page as PNG bytes, or as raw 1-bit pixels for a PDF."""
+    rendered = []
+    for labels in pages:
+        sheet = render_sheet(labels, layout)
+        if fmt == "png":
+            buffered = io.BytesIO()
+            sheet.save(buffered, format="PNG")
+            rendered.append(buffered.getvalue())
+        else:
+            rendered.append(sheet.tobytes())
+    return rendered
+
+
+def _assemble(rendered, layout, fmt):
+    buffered = io.BytesIO()
+    if fmt == "png":
+        # The pages are compressed already
+        with zipfile.ZipFile(buffered, "w", zipfile.ZIP_STORED) as archive:
+            for number, page in enumerate(rendered, start=1):
+                archive.writestr(f"labels-{number:03d}.png", page)
+    else:
+        from PIL import Image
+
+        pages = [Image.frombytes("1", (layout.width, layout.height), page) for page in rendered]
+        # 1-bit pages are stored CCITT G4 compressed, which keeps QR edges exact
+        pages[0].save(buffered, format="PDF", save_all=True, append_images=pages[1:], resolution=layout.dpi)
+    return buffered.getvalue()
+
+
+def render_label_sheets(labels, fmt="pdf", layout=A4_14_UP, executor=None):
+    """Renders labels onto printable sheets and returns the file: a PDF, or a ZIP of PNG pages.
+
+    Pages are rendered in parallel in worker processes, the process-wide
+    pool unless an executor is given; small jobs render in this process.
+
+    :param labels: list of Label, in print order
+    :param fmt: "pdf" or "png", see SHEET_FORMATS
+    """
+    if fmt not in SHEET_FORMATS:
+        raise ValueError(f"Unsupported label sheet format: {fmt}")
+    if not labels:
+        raise ValueError("No labels to render")
+    per_page = layout.columns * layout.rows
+    pages = [labels[start:start + per_page] for start in range(0, len(labels), per_page)]
+    if executor is None and len(pages) <= INLINE_MAX_PAGES:
+        rendered = _render_pages(pages, layout, fmt)
+    else:
+        tasks = [pages[start:start + PAGES_PER_TASK] for start in range(0, len(pages), PAGES_PER_TASK)]
+        # map() returns the tasks' results in order, so the pages stay in print order
+        results = (executor or get_label_pool()).map(_render_pages, tasks, repeat(layout), repeat(fmt))
+        rendered = [page for result in results for page in result]
+    return _assemble(rendered, layout, fmt)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_label_pool():
+    """Returns the process-wide label rendering pool, one worker per CPU, started on first use."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            # Spawned rather than forked, since the app server runs many threads
+            _pool = ProcessPoolExecutor(os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+        return _pool
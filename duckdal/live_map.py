@@ -0,0 +1,234 @@
+import math
+import threading
+import zlib
+
+import numpy as np
+
+# Sizes assumed for the map element when culling to its viewport
+MAP_WIDTH_PX = 1000
+MAP_HEIGHT_PX = 500
+# Points closer together than this on screen are drawn as one cluster
+CLUSTER_CELL_PX = 48
+# Drones that moved less than this are not re-sent (about 1 m)
+MIN_MOVE_DEG = 1e-5
+
+# Demo fleet movement until drone telemetry is connected
+DEMO_SORTIE_SECONDS = 600
+DEMO_RANGE_KM = 6.0
+
+
+class PositionBuffer:
+    """Latest position of every drone, stored column-wise with a version per row.
+
+    Writers call update() with whole batches; readers ask for the rows that
+    changed since the version they last saw and get them as a pyarrow table,
+    so a refresh only carries the drones that actually moved.
+    """
+
+    def __init__(self, capacity=1024):
+        self._index = {}
+        self._ids = np.empty(capacity, dtype=object)
+        self._lat = np.zeros(capacity)
+        self._lon = np.zeros(capacity)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._version = np.zeros(capacity, dtype=np.int64)
+        self._size = 0
+        self._current = 0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._current
+
+    def __len__(self):
+        return int(self._active[:self._size].sum())
+
+    def _rows_for(self, drone_ids):
+        rows = np.empty(len(drone_ids), dtype=np.int64)
+        for i, drone_id in enumerate(drone_ids):
+            row = self._index.get(drone_id)
+            if row is None:
+                if self._size == len(self._ids):
+                    self._grow()
+                row = self._index[drone_id] = self._size
+                self._ids[row] = drone_id
+                self._size += 1
+            rows[i] = row
+        return rows
+
+    def _grow(self):
+        capacity = 2 * len(self._ids)
+        for name in ("_ids", "_lat", "_lon", "_active", "_version"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def update(self, drone_ids, lats, lons):
+        """Stores new positions and returns the buffer version afterwards.
+
+        Drones missing from earlier updates are added; drones that have not
+        moved keep their old version.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        with self._lock:
+            rows = self._rows_for(drone_ids)
+            moved = (
+                ~self._active[rows]
+                | (np.abs(self._lat[rows] - lats) >= MIN_MOVE_DEG)
+                | (np.abs(self._lon[rows] - lons) >= MIN_MOVE_DEG)
+            )
+            if moved.any():
+                self._current += 1
+                rows = rows[moved]
+                self._lat[rows] = lats[moved]
+                self._lon[rows] = lons[moved]
+                self._active[rows] = True
+                self._version[rows] = self._current
+            return self._current
+
+    def remove(self, drone_ids):
+        """Marks drones as landed; readers receive them once with active=False."""
+        with self._lock:
+            rows = [self._index[drone_id] for drone_id in drone_ids if drone_id in self._index]
+            rows = np.array([row for row in rows if self._active[row]], dtype=np.int64)
+            if rows.size:
+                self._current += 1
+                self._active[rows] = False
+                self._version[rows] = self._current
+            return self._current
+
+    def changes_since(self, version):
+        """Returns (pyarrow table of id, lat, lon, active for rows changed after version, current version)."""
+        import pyarrow as pa
+
+        with self._lock:
+            rows = np.flatnonzero(self._version[:self._size] > version)
+            table = pa.table({
+                "id": pa.array(self._ids[rows].tolist(), type=pa.string()),
+                "lat": self._lat[rows],
+                "lon": self._lon[rows],
+                "active": self._active[rows],
+            })
+            return table, self._current
+
+
+class PositionMirror:
+    """One session's copy of a PositionBuffer, kept current by applying changes only."""
+
+    def __init__(self):
+        self.version = 0
+        self._index = {}
+        self.lat = np.empty(0)
+        self.lon = np.empty(0)
+        self.active = np.empty(0, dtype=bool)
+
+    def sync(self, buffer):
+        """Applies everything that changed in buffer since the last sync; returns the number of rows applied."""
+        changes, self.version = buffer.changes_since(self.version)
+        if changes.num_rows == 0:
+            return 0
+        ids = changes.column("id").to_pylist()
+        new_ids = [drone_id for drone_id in ids if drone_id not in self._index]
+        if new_ids:
+            start = len(self._index)
+            self._index.update((drone_id, start + i) for i, drone_id in enumerate(new_ids))
+            self.lat = np.concatenate([self.lat, np.zeros(len(new_ids))])
+            self.lon = np.concatenate([self.lon, np.zeros(len(new_ids))])
+            self.active = np.concatenate([self.active, np.zeros(len(new_ids), dtype=bool)])
+        rows = np.fromiter((self._index[drone_id] for drone_id in ids), dtype=np.int64, count=len(ids))
+        self.lat[rows] = changes.column("lat").to_numpy()
+        self.lon[rows] = changes.column("lon").to_numpy()
+        self.active[rows] = changes.column("active").to_numpy(zero_copy_only=False)
+        return changes.num_rows
+
+    def positions(self):
+        """Returns (lats, lons) of the drones in the air."""
+        return self.lat[self.active], self.lon[self.active]
+
+
+def _degrees_per_px(zoom):
+    # Web Mercator: the world is 512 px wide at zoom 0 in deck.gl
+    return 360.0 / (512 * 2 ** zoom)
+
+
+def viewport_bounds(center_lat, center_lon, zoom, width_px=MAP_WIDTH_PX, height_px=MAP_HEIGHT_PX):
+    """Returns (south, west, north, east) of what a map of that size shows around the centre."""
+    lon_span = width_px * _degrees_per_px(zoom)
+    lat_span = height_px * _degrees_per_px(zoom) * math.cos(math.radians(center_lat))
+    return center_lat - lat_span / 2, center_lon - lon_span / 2, center_lat + lat_span / 2, center_lon + lon_span / 2
+
+
+def cull(lats, lons, bounds):
+    """Returns a mask of the points inside (south, west, north, east)."""
+    south, west, north, east = bounds
+    return (lats >= south) & (lats <= north) & (lons >= west) & (lons <= east)
+
+
+def cluster_points(lats, lons, zoom, ref_lat=0.0, cell_px=CLUSTER_CELL_PX):
+    """Merges points that share a screen grid cell at this zoom.
+
+    ref_lat sets the Mercator scale of the latitude cells, normally the map centre.
+
+    :return: dict of lat, lon (cluster centroids) and count arrays, at most one entry per cell
+    """
+    if len(lats) == 0:
+        return {"lat": np.empty(0), "lon": np.empty(0), "count": np.empty(0, dtype=np.int64)}
+    cell = cell_px * _degrees_per_px(zoom)
+    cell_lat = np.floor(lats / (cell * math.cos(math.radians(ref_lat)))).astype(np.int64)
+    cell_lon = np.floor(lons / cell).astype(np.int64)
+    _, inverse, counts = np.unique(np.stack([cell_lat, cell_lon], axis=1), axis=0, return_inverse=True,
+                                   return_counts=True)
+    inverse = inverse.reshape(-1)
+    return {
+        "lat": np.bincount(inverse, weights=lats) / counts,
+        "lon": np.bincount(inverse, weights=lons) / counts,
+        "count": counts,
+    }
+
+
+def visible_clusters(lats, lons, center_lat, center_lon, zoom):
+    """Culls positions to the viewport, then clusters what is left; the result is bounded by the map size."""
+    mask = cull(lats, lons, viewport_bounds(center_lat, center_lon, zoom))
+    return cluster_points(lats[mask], lons[mask], zoom, center_lat)
+
+
+def simulate_fleet(drones, stations, now):
+    """Demo positions for the station fleets while no telemetry is connected.
+
+    Each drone flies out and back on its own bearing from its station during
+    the first half of every sortie and is parked for the second half.
+
+    :return: (ids in the air, lats, lons, ids parked)
+    """
+    stations = {station.id: station for station in stations}
+    seconds = now.timestamp()
+    flying, lats, lons, parked = [], [], [], []
+    for drone in drones:
+        seed = zlib.crc32(drone.id.encode())
+        phase = ((seconds + seed) % DEMO_SORTIE_SECONDS) / DEMO_SORTIE_SECONDS
+        if phase >= 0.5:
+            parked.append(drone.id)
+            continue
+        station = stations[drone.station_id]
+        bearing = math.radians(seed % 360)
+        distance = DEMO_RANGE_KM * (1 - abs(4 * phase - 1))
+        flying.append(drone.id)
+        lats.append(station.lat + distance / 111.32 * math.cos(bearing))
+        lons.append(station.lon + distance / (111.32 * math.cos(math.radians(station.lat))) * math.sin(bearing))
+    return flying, lats, lons, parked
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_position_buffer():
+    """Returns the process-wide drone position buffer."""
+    global _buffer
+
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = PositionBuffer()
+        return _buffer
@@ -0,0 +1,112 @@
+import threading
+import time
+from datetime import datetime
+
+from cachetools import TTLCache
+
+# Seconds a session keeps its order queries before asking the store again
+ORDER_CACHE_TTL = 60
+# Histories of finished orders no longer change and are shared by every session.
+TIMELINE_CACHE_TTL = 3600
+TIMELINE_CACHE_SIZE = 10_000
+FINAL_STATUSES = frozenset({"배달 완료", "취소됨"})
+# Orders found without a take-off are looked up again after this many seconds, or on their next status update
+NO_DEPARTURE_TTL = 30
+# Status of the tracking event recorded when an order's drone takes off
+DEPARTURE_STATUS = "배송 중"
+# TRACKING_DATE_FORMAT of duckdal.tracking_timeline, which needs pandas
+_EVENT_DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+class SessionOrderCache:
+    """One session's cached order queries, with a TTL and tag-based invalidation.
+
+    The cache is kept in st.session_state, so it lasts as long as the
+    session. Each entry carries tags such as ("user", user_id); invalidate()
+    drops every entry with a tag, e.g. when a tracking event for one of the
+    user's orders arrives.
+    """
+
+    def __init__(self, ttl=ORDER_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+
+    def get(self, key, loader, tags=()):
+        """Returns the cached value for key, calling loader() when it is missing or expired."""
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is None or entry[1] <= now:
+            entry = (loader(), now + self.ttl, frozenset(tags))
+            self._entries[key] = entry
+        return entry[0]
+
+    def invalidate(self, tag):
+        """Drops every entry carrying tag; returns how many were dropped."""
+        stale = [key for key, entry in self._entries.items() if tag in entry[2]]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        self._entries.clear()
+
+
+_timelines = TTLCache(maxsize=TIMELINE_CACHE_SIZE, ttl=TIMELINE_CACHE_TTL)
+_departures = TTLCache(maxsize=TIMELINE_CACHE_SIZE, ttl=TIMELINE_CACHE_TTL)
+_not_departed = TTLCache(maxsize=TIMELINE_CACHE_SIZE, ttl=NO_DEPARTURE_TTL)
+_timelines_lock = threading.Lock()
+
+
+def get_tracking_details(repository, order):
+    """Returns an order's tracking history; histories of finished orders come from a cache shared by all sessions."""
+    if order["status"] not in FINAL_STATUSES:
+        return repository.get_tracking_details(order["id"])
+    with _timelines_lock:
+        details = _timelines.get(order["id"])
+    if details is None:
+        details = repository.get_tracking_details(order["id"])
+        with _timelines_lock:
+            _timelines[order["id"]] = details
+    return details
+
+
+def get_departure_time(repository, order):
+    """Returns when an order's drone took off, from its first "배송 중" tracking event, or None before that.
+
+    A take-off time never changes once recorded, so it is shared by every
+    session. So is the answer that there is none yet, for NO_DEPARTURE_TTL
+    seconds or until forget_departures() is called for the order.
+    """
+    with _timelines_lock:
+        departure = _departures.get(order["id"])
+        if departure is None and order["id"] in _not_departed:
+            return None
+    if departure is not None:
+        return departure
+    for event in get_tracking_details(repository, order):
+        if event["status"] != DEPARTURE_STATUS:
+            continue
+        try:
+            departure = datetime.strptime(event["date"], _EVENT_DATE_FORMAT)
+        except ValueError:
+            continue
+        with _timelines_lock:
+            _departures[order["id"]] = departure
+        return departure
+    with _timelines_lock:
+        _not_departed[order["id"]] = True
+    return None
+
+
+def forget_departures(order_ids):
+    """Makes the next get_departure_time() of these orders read their history again, e.g. after a tracking event."""
+    with _timelines_lock:
+        for order_id in order_ids:
+            _not_departed.pop(order_id, None)
+
+
+def clear_timeline_cache():
+    with _timelines_lock:
+        _timelines.clear()
+        _departures.clear()
+        _not_departed.clear()
@@ -0,0 +1,358 @@
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+from duckdal.search_index import SEARCH_LIMIT, OrderSearchIndex, normalize_query
+from duckdal.tracking_log import open_tracking_log
+
+DEFAULT_DB_PATH = os.environ.get("DUCKDAL_ORDERS_DB", os.path.join("data", "orders.db"))
+
+# Orders read per batch while the search index catches up
+SEARCH_INDEX_BATCH = 200_000
+# SQLite's default limit on bound parameters is 999
+_ID_CHUNK_SIZE = 900
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    company TEXT NOT NULL,
+    logo_path TEXT,
+    status TEXT NOT NULL,
+    estimated_delivery TEXT,
+    items TEXT NOT NULL,
+    tracking_number TEXT NOT NULL,
+    qr_number INTEGER,
+    dest_lat REAL,
+    dest_lon REAL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_user ON orders (user_id, id);
+CREATE INDEX IF NOT EXISTS idx_orders_user_status ON orders (user_id, status, id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_tracking_number ON orders (tracking_number);
+"""
+
+_ORDER_COLUMNS = "id, company, logo_path, status, estimated_delivery, items, tracking_number, qr_number, dest_lat, dest_lon"
+
+# Columns added after the first release, created on stores that predate them
+_ADDED_COLUMNS = {"dest_lat": "REAL", "dest_lon": "REAL"}
+
+
+def _is_exact_match(order, term):
+    return normalize_query(order["id"]) == term or normalize_query(order["tracking_number"]) == term
+
+
+class OrderRepository(ABC):
+    """Storage interface for customer orders and their tracking history."""
+
+    @abstractmethod
+    def list_orders(self, user_id, limit, after=None, statuses=None):
+        """Returns up to limit of a user's orders with an id greater than after, ordered by order id.
+
+        statuses restricts the result to orders in one of the given states; None means all.
+        """
+
+    @abstractmethod
+    def count_orders(self, user_id, statuses=None):
+        """Returns the number of a user's orders, optionally restricted to some statuses."""
+
+    @abstractmethod
+    def get_order(self, order_id):
+        """Returns a single order, or None if it does not exist."""
+
+    @abstractmethod
+    def find_by_tracking_number(self, tracking_number):
+        """Returns the order with the given tracking number, or None."""
+
+    @abstractmethod
+    def search_orders(self, user_id, query, limit=SEARCH_LIMIT, statuses=None):
+        """Returns up to limit of a user's orders whose id or tracking number starts with query, an exact match first.
+
+        statuses restricts the result to orders in one of the given states before the limit applies; None means all.
+        """
+
+    def warm_search_index(self):
+        """Prepares search_orders in the background, for stores that index in memory."""
+
+    @abstractmethod
+    def get_tracking_details(self, order_id):
+        """Returns the tracking history of an order, oldest first."""
+
+    @abstractmethod
+    def add_orders(self, orders):
+        """Stores orders from any iterable, each carrying its user_id and tracking details."""
+
+    @abstractmethod
+    def update_status(self, order_id, status):
+        """Sets the delivery status of an order."""
+
+    @abstractmethod
+    def add_tracking_events(self, events):
+        """Appends scan events, given as (order_id, date, location, status), to their orders' histories."""
+
+
+class SQLiteOrderRepository(OrderRepository):
+    """OrderRepository backed by a single SQLite database in WAL mode.
+
+    Tracking histories live in a TrackingLog next to the database
+    (orders-tracking/ for orders.db) rather than in the database itself.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, tracking_log_dir=None):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(orders)")}
+        for column, column_type in _ADDED_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE orders ADD COLUMN {column} {column_type}")
+        self.tracking_log = open_tracking_log(tracking_log_dir or f"{os.path.splitext(path)[0]}-tracking")
+        self._migrate_tracking_events(conn)
+        # Built and caught up on a background thread; searches use SQL until the first build is done
+        self._search_index = OrderSearchIndex()
+        self._search_indexed_rowid = 0
+        self._search_ready = False
+        self._search_lock = threading.Lock()
+        self._search_wanted = threading.Event()
+        self._search_thread = None
+
+    def _migrate_tracking_events(self, conn):
+        """Moves histories from the tracking_events table of older stores into the tracking log."""
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'tracking_events'").fetchone():
+            return
+        if self.tracking_log.is_empty():
+            rows = conn.execute("SELECT order_id, date, location, status FROM tracking_events ORDER BY order_id, seq")
+            while True:
+                batch = rows.fetchmany(10_000)
+                if not batch:
+                    break
+                self.tracking_log.append(batch)
+            self.tracking_log.checkpoint()
+        with conn:
+            conn.execute("DROP TABLE tracking_events")
+
+    def _connection(self):
+        # sqlite3 connections are not shared across threads, so every
+        # Streamlit script thread gets its own.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _order_from_row(row):
+        order = dict(row)
+        order["logo"] = order.pop("logo_path")
+        order["items"] = json.loads(order["items"])
+        return order
+
+    @staticmethod
+    def _user_filter(user_id, statuses):
+        clause = "user_id = ?"
+        params = [user_id]
+        if statuses is not None:
+            clause += f" AND status IN ({', '.join('?' * len(statuses))})"
+            params.extend(statuses)
+        return clause, params
+
+    def list_orders(self, user_id, limit, after=None, statuses=None):
+        if statuses is not None and not statuses:
+            return []
+        clause, params = self._user_filter(user_id, statuses)
+        # Keyset pagination: resume after the last id of the previous page
+        # instead of skipping rows with OFFSET.
+        if after is not None:
+            clause += " AND id > ?"
+            params.append(after)
+        rows = self._connection().execute(
+            f"SELECT {_ORDER_COLUMNS} FROM orders WHERE {clause} ORDER BY id LIMIT ?",
+            (*params, limit),
+        )
+        return [self._order_from_row(row) for row in rows]
+
+    def count_orders(self, user_id, statuses=None):
+        if statuses is not None and not statuses:
+            return 0
+        clause, params = self._user_filter(user_id, statuses)
+        return self._connection().execute(
+            f"SELECT COUNT(*) FROM orders WHERE {clause}", params
+        ).fetchone()[0]
+
+    def get_order(self, order_id):
+        row = self._connection().execute(
+            f"SELECT {_ORDER_COLUMNS} FROM orders WHERE id = ?", (order_id,)
+        ).fetchone()
+        return self._order_from_row(row) if row else None
+
+    def find_by_tracking_number(self, tracking_number):
+        row = self._connection().execute(
+            f"SELECT {_ORDER_COLUMNS} FROM orders WHERE tracking_number = ?", (tracking_number,)
+        ).fetchone()
+        return self._order_from_row(row) if row else None
+
+    def _update_search_index(self):
+        """Indexes the orders inserted since the last update, by any process; orders are never deleted."""
+        rows = self._connection().execute(
+            "SELECT rowid, user_id, id, tracking_number FROM orders WHERE rowid > ? ORDER BY rowid",
+            (self._search_indexed_rowid,),
+        )
+        while True:
+            batch = rows.fetchmany(SEARCH_INDEX_BATCH)
+            if not batch:
+                break
+            self._search_index.add((row[1], row[2], row[3]) for row in batch)
+            self._search_indexed_rowid = batch[-1][0]
+        self._search_ready = True
+
+    def _index_orders(self):
+        while True:
+            self._search_wanted.wait()
+            self._search_wanted.clear()
+            try:
+                self._update_search_index()
+            except sqlite3.Error:
+                logger.exception("Updating the order search index failed")
+
+    def warm_search_index(self):
+        # Indexing millions of orders takes seconds, so it never runs on a script thread
+        with self._search_lock:
+            if self._search_thread is None:
+                self._search_thread = threading.Thread(target=self._index_orders, name="order-search-index", daemon=True)
+                self._search_thread.start()
+        self._search_wanted.set()
+
+    def search_orders(self, user_id, query, limit=SEARCH_LIMIT, statuses=None):
+        term = normalize_query(query)
+        if not term or (statuses is not None and not statuses):
+            return []
+        # Catches the index up with new orders for the next search
+        self.warm_search_index()
+        if not self._search_ready:
+            return self._search_unindexed(user_id, term, limit, statuses)
+        # Read before searching the index, so every order is either indexed or after this rowid
+        indexed_rowid = self._search_indexed_rowid
+        orders = {}
+        for order in self._search_indexed(user_id, term, limit, statuses):
+            orders.setdefault(order["id"], order)
+        for order in self._search_unindexed(user_id, term, limit, statuses, after_rowid=indexed_rowid):
+            orders.setdefault(order["id"], order)
+        # Stable, so each part keeps its own order behind the exact matches
+        return sorted(orders.values(), key=lambda order: not _is_exact_match(order, term))[:limit]
+
+    def _search_indexed(self, user_id, term, limit, statuses):
+        """Looks the term up in the index and keeps the orders in statuses, widening the lookup until limit are found."""
+        orders = []
+        looked_up = 0
+        wanted = limit
+        while True:
+            # A wider lookup returns the narrower one's ids first
+            order_ids = self._search_index.search(user_id, term, wanted)
+            orders.extend(self._orders_by_id(order_ids[looked_up:], statuses))
+            looked_up = len(order_ids)
+            if len(orders) >= limit or looked_up < wanted:
+                return orders[:limit]
+            wanted *= 4
+
+    def _orders_by_id(self, order_ids, statuses):
+        """Returns the orders with the given ids and one of statuses, in the order of order_ids."""
+        conn = self._connection()
+        orders = {}
+        for start in range(0, len(order_ids), _ID_CHUNK_SIZE):
+            chunk = order_ids[start:start + _ID_CHUNK_SIZE]
+            clause = f"id IN ({', '.join('?' * len(chunk))})"
+            params = list(chunk)
+            if statuses is not None:
+                clause += f" AND status IN ({', '.join('?' * len(statuses))})"
+                params.extend(statuses)
+            for row in conn.execute(f"SELECT {_ORDER_COLUMNS} FROM orders WHERE {clause}", params):
+                orders[row["id"]] = self._order_from_row(row)
+        return [orders[order_id] for order_id in order_ids if order_id in orders]
+
+    def _search_unindexed(self, user_id, term, limit, statuses, after_rowid=None):
+        """Searches with SQL: every order of the user, or only those after after_rowid that the index lacks."""
+        clause, params = self._user_filter(user_id, statuses)
+        if after_rowid is not None:
+            clause += " AND rowid > ?"
+            params.append(after_rowid)
+        pattern = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = self._connection().execute(
+            f"SELECT {_ORDER_COLUMNS} FROM orders WHERE {clause} "
+            "AND (UPPER(id) LIKE ? ESCAPE '\\' OR UPPER(tracking_number) LIKE ? ESCAPE '\\') "
+            "ORDER BY (UPPER(id) = ? OR UPPER(tracking_number) = ?) DESC, id LIMIT ?",
+            (*params, pattern, pattern, term, term, limit),
+        )
+        return [self._order_from_row(row) for row in rows]
+
+    def get_tracking_details(self, order_id):
+        return self.tracking_log.history(order_id)
+
+    def add_orders(self, orders):
+        # Read twice, for the order rows and for their tracking events
+        orders = list(orders)
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO orders (id, user_id, company, logo_path, status, estimated_delivery, items, tracking_number, qr_number, dest_lat, dest_lon) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        order["id"],
+                        order["user_id"],
+                        order["company"],
+                        order.get("logo"),
+                        order["status"],
+                        order.get("estimated_delivery"),
+                        json.dumps(order["items"], ensure_ascii=False),
+                        order["tracking_number"],
+                        order.get("qr_number"),
+                        order.get("dest_lat"),
+                        order.get("dest_lon"),
+                    )
+                    for order in orders
+                ),
+            )
+        self.tracking_log.append(
+            (order["id"], detail["date"], detail["location"], detail["status"])
+            for order in orders
+            for detail in order.get("tracking_details", [])
+        )
+
+    def update_status(self, order_id, status):
+        conn = self._connection()
+        with conn:
+            conn.execute("UPDATE orders SET status = ? WHERE id = ?", (status, order_id))
+
+    def add_tracking_events(self, events):
+        self.tracking_log.append(events)
+
+    def close(self):
+        """Checkpoints the tracking log and closes it."""
+        self.tracking_log.close()
+
+
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def get_order_repository():
+    """Returns the process-wide order repository, opening it on first use."""
+    global _repository
+
+    with _repository_lock:
+        if _repository is None:
+            _repository = SQLiteOrderRepository()
+            atexit.register(_repository.close)
+        return _repository
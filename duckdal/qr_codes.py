@@ -0,0 +1,147 @@
+import base64
+import threading
+from collections import namedtuple
+from io import BytesIO
+
+from cachetools import LRUCache
+
+from duckdal.instrumentation import traced
+
+# Upper bounds for the process-wide QR cache.
+QR_CACHE_MAX_ENTRIES = 1024
+QR_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+QRCacheInfo = namedtuple("QRCacheInfo", ["hits", "misses", "entries", "max_entries", "bytes", "max_bytes"])
+
+_MIME_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+
+class _BoundedLRUCache(LRUCache):
+    """LRU cache bounded both by the total size of its values in bytes and by entry count."""
+
+    def __init__(self, max_entries, max_bytes):
+        super().__init__(maxsize=max_bytes, getsizeof=len)
+        self.max_entries = max_entries
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        while len(self) > self.max_entries:
+            self.popitem()
+
+
+_cache = _BoundedLRUCache(QR_CACHE_MAX_ENTRIES, QR_CACHE_MAX_BYTES)
+_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def _render(data, fmt, version, error_correction, box_size, border, fill_color, back_color):
+    """Renders a QR code and returns the encoded image bytes."""
+    # qrcode pulls in PIL, so it is only imported once a QR code is actually rendered.
+    import qrcode
+    import qrcode.image.svg
+
+    qr = qrcode.QRCode(
+        version=version,
+        error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{error_correction}"),
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    buffered = BytesIO()
+    if fmt == "svg":
+        # The SVG factory writes vector paths directly and never touches PIL.
+        img = qr.make_image(image_factory=qrcode.image.svg.SvgPathImage)
+        img.save(buffered)
+    else:
+        img = qr.make_image(fill_color=fill_color, back_color=back_color)
+        img.save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def qr_modules(data, error_correction="M", border=2, mask_pattern=None):
+    """Returns a QR code as a 2D NumPy bool array, True for dark modules, including the quiet-zone border.
+
+    For callers that place many codes on one image and scale them themselves,
+    such as label sheets, instead of encoding an image per code. A fixed
+    mask_pattern (0-7) skips scoring all eight masks, most of the encoding time.
+    """
+    import numpy as np
+    import qrcode
+
+    if error_correction not in ("L", "M", "Q", "H"):
+        raise ValueError(f"Unsupported QR error correction level: {error_correction}")
+    qr = qrcode.QRCode(
+        error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{error_correction}"),
+        border=border,
+        mask_pattern=mask_pattern,
+    )
+    qr.add_data(str(data))
+    qr.make(fit=True)
+    return np.array(qr.get_matrix(), dtype=bool)
+
+
+@traced()
+def generate_qr_code(
+    data,
+    fmt="png",
+    version=1,
+    error_correction="L",
+    box_size=10,
+    border=4,
+    fill_color="black",
+    back_color="white",
+):
+    """Generates a QR code image from the given data and returns it as a Data URI.
+
+    error_correction is one of the qrcode levels "L", "M", "Q" or "H".
+
+    Rendered images are memoized per payload and render settings, so repeated
+    requests for the same QR code skip rasterization and encoding.
+    """
+    global _hits, _misses
+
+    if fmt not in _MIME_TYPES:
+        raise ValueError(f"Unsupported QR code format: {fmt}")
+    if error_correction not in ("L", "M", "Q", "H"):
+        raise ValueError(f"Unsupported QR error correction level: {error_correction}")
+
+    key = (str(data), fmt, version, error_correction, box_size, border, fill_color, back_color)
+    with _lock:
+        data_uri = _cache.get(key)
+        if data_uri is not None:
+            _hits += 1
+            return data_uri
+        _misses += 1
+
+    image_bytes = _render(str(data), fmt, version, error_correction, box_size, border, fill_color, back_color)
+    data_uri = f"data:{_MIME_TYPES[fmt]};base64,{base64.b64encode(image_bytes).decode()}"
+
+    with _lock:
+        try:
+            _cache[key] = data_uri
+        except ValueError:
+            # Larger than the whole byte budget; hand it out uncached.
+            pass
+    return data_uri
+
+
+def qr_cache_info():
+    """Returns hit/miss counters and current occupancy of the QR cache."""
+    with _lock:
+        return QRCacheInfo(_hits, _misses, len(_cache), _cache.max_entries, _cache.currsize, _cache.maxsize)
+
+
+def clear_qr_cache():
+    """Empties the QR cache and resets its counters."""
+    global _hits, _misses
+
+    with _lock:
+        _cache.clear()
+        _hits = 0
+        _misses = 0
@@ -0,0 +1,364 @@
+import logging
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sortedcontainers import SortedDict, SortedKeyList
+
+from duckdal.common import get_current_kst
+from duckdal.delivery_requests import DEFAULT_DB_PATH, get_delivery_request_writer
+from duckdal.stations import get_station_registry
+
+# Pickups are planned in fixed slots; every launch occupies one slot of its drone.
+SLOT_MINUTES = 30
+# How far ahead of the requested pickup time a slot is searched for.
+HORIZON_SLOTS = 96
+POLL_INTERVAL = 1.0
+
+# Payloads of the drones based at every station
+STATION_FLEET_KG = [2.0, 2.0, 5.0, 10.0]
+
+Drone = namedtuple("Drone", ["id", "station_id", "max_payload_kg"])
+Assignment = namedtuple("Assignment", ["request_id", "drone_id", "station_id", "slot_start"])
+
+# Slots are numbered from here internally
+_SLOT_EPOCH = datetime(2000, 1, 1)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pickup_assignments (
+    request_id TEXT PRIMARY KEY,
+    drone_id TEXT NOT NULL,
+    station_id TEXT NOT NULL,
+    slot_start TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pickup_assignments_slot ON pickup_assignments (slot_start);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def default_drones(stations):
+    """Returns the standard fleet for every station."""
+    return [
+        Drone(f"DR-{station.id[3:]}-{number}", station.id, payload)
+        for station in stations
+        for number, payload in enumerate(STATION_FLEET_KG, start=1)
+    ]
+
+
+def slot_for(moment, slot_minutes=SLOT_MINUTES):
+    """Returns the start of the first slot that begins at or after moment."""
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    slot = timedelta(minutes=slot_minutes)
+    return midnight + -(-(moment - midnight) // slot) * slot
+
+
+class _SlotRuns:
+    """Taken slot numbers kept as disjoint runs, so the first free slot at or after any slot is one bisect away."""
+
+    def __init__(self):
+        # run start -> end (exclusive)
+        self._runs = SortedDict()
+
+    def first_free(self, slot):
+        index = self._runs.bisect_right(slot) - 1
+        if index >= 0:
+            _, end = self._runs.peekitem(index)
+            if end > slot:
+                return end
+        return slot
+
+    def add(self, slot):
+        """Marks a free slot as taken, merging it with the runs next to it."""
+        start, end = slot, slot + 1
+        index = self._runs.bisect_right(slot) - 1
+        if index >= 0:
+            previous_start, previous_end = self._runs.peekitem(index)
+            if previous_end == slot:
+                start = previous_start
+        following_end = self._runs.pop(slot + 1, None)
+        if following_end is not None:
+            end = following_end
+        self._runs[start] = end
+
+    def discard_before(self, slot):
+        """Forgets every slot before slot."""
+        for start in list(self._runs.irange(maximum=slot, inclusive=(True, False))):
+            end = self._runs.pop(start)
+            if end > slot:
+                self._runs[slot] = end
+
+
+class PickupScheduler:
+    """Assigns pending pickups to drones and time slots.
+
+    Pending requests wait in a priority queue ordered by requested pickup time.
+    Each request gets the earliest slot at or after its pickup time in which
+    a drone that can carry its weight is free and its station still has
+    launch capacity. Among those drones, the one with the smallest sufficient
+    payload is used. Requests that name a station only get drones based there.
+
+    Every drone's booked slots and every station's full slots are kept as
+    sorted runs, so a drone's next usable slot is found with a few bisects
+    instead of stepping through the horizon. Requests that find no slot in
+    their horizon are parked until release_before moves on to a new slot.
+    """
+
+    def __init__(self, stations, drones=None, slot_minutes=SLOT_MINUTES, horizon_slots=HORIZON_SLOTS):
+        stations = list(stations)
+        if drones is None:
+            drones = default_drones(stations)
+        self.stations = {station.id: station for station in stations}
+        self.slot_minutes = slot_minutes
+        self.horizon_slots = horizon_slots
+        self._pending = SortedKeyList(key=lambda request: (request["pickup_at"], request["id"]))
+        self._pending_ids = set()
+        self._parked = []
+        self._released_until = None
+        # Drones sorted by payload, so the eligible ones for a weight are one bisect away.
+        self._drones = SortedKeyList(drones, key=lambda drone: drone.max_payload_kg)
+        self._drone_busy = {drone.id: _SlotRuns() for drone in drones}
+        self._station_launches = {station.id: SortedDict() for station in stations}
+        self._station_full = {station.id: _SlotRuns() for station in stations}
+
+    def __len__(self):
+        return len(self._pending) + len(self._parked)
+
+    def _slot_number(self, moment):
+        return (moment - _SLOT_EPOCH) // timedelta(minutes=self.slot_minutes)
+
+    def _slot_start(self, number):
+        return _SLOT_EPOCH + number * timedelta(minutes=self.slot_minutes)
+
+    def add_request(self, request):
+        """Queues a pending request with id, pickup_at (datetime), package_weight and optional station_id."""
+        if request["id"] in self._pending_ids:
+            return
+        self._pending_ids.add(request["id"])
+        self._pending.add(request)
+
+    def book(self, assignment):
+        """Marks a slot as taken by an existing assignment, e.g. after a restart."""
+        number = self._slot_number(assignment.slot_start)
+        self._drone_busy[assignment.drone_id].add(number)
+        launches = self._station_launches[assignment.station_id]
+        launches[number] = launches.get(number, 0) + 1
+        if launches[number] >= self.stations[assignment.station_id].launch_capacity:
+            self._station_full[assignment.station_id].add(number)
+
+    def release_before(self, moment):
+        """Forgets bookings of slots that started before moment.
+
+        Once moment reaches a new slot, the horizons of parked requests have
+        moved on as well, so they are queued again.
+        """
+        number = self._slot_number(moment)
+        if self._released_until is not None and number <= self._released_until:
+            return
+        self._released_until = number
+        for launches in self._station_launches.values():
+            for slot in list(launches.irange(maximum=number, inclusive=(True, False))):
+                del launches[slot]
+        for runs in (*self._drone_busy.values(), *self._station_full.values()):
+            runs.discard_before(number)
+        for request in self._parked:
+            self._pending.add(request)
+        self._parked.clear()
+
+    def _eligible_drones(self, request):
+        """Drones that can carry the request, smallest sufficient payload first."""
+        eligible = self._drones.irange_key(min_key=request["package_weight"])
+        if request.get("station_id"):
+            return [drone for drone in eligible if drone.station_id == request["station_id"]]
+        return list(eligible)
+
+    def _first_open_slot(self, drone, slot, limit):
+        """Returns the first slot from slot on where the drone is free and its station can launch, or limit."""
+        busy = self._drone_busy[drone.id]
+        full = self._station_full[drone.station_id]
+        while slot < limit:
+            slot = busy.first_free(slot)
+            open_slot = full.first_free(slot)
+            if open_slot == slot:
+                return slot
+            slot = open_slot
+        return limit
+
+    def _assign(self, request, eligible, first_slot):
+        first_slot = self._slot_number(first_slot)
+        limit = first_slot + self.horizon_slots
+        best_slot, best_drone = limit, None
+        for drone in eligible:
+            # Only a strictly earlier slot replaces a smaller drone
+            slot = self._first_open_slot(drone, first_slot, best_slot)
+            if slot < best_slot:
+                best_slot, best_drone = slot, drone
+                if slot == first_slot:
+                    break
+        if best_drone is None:
+            return None
+        assignment = Assignment(request["id"], best_drone.id, best_drone.station_id, self._slot_start(best_slot))
+        self.book(assignment)
+        return assignment
+
+    def schedule(self, now):
+        """Assigns every queued request, earliest pickup first.
+
+        :param now: naive KST datetime; no slot before it is handed out
+        :return: (assignments, ids of requests no drone can carry)
+        """
+        assignments = []
+        rejected = []
+        # Bookings only grow during a round, so a horizon found full stays full for alike requests
+        full = set()
+        while self._pending:
+            request = self._pending.pop(0)
+            eligible = self._eligible_drones(request)
+            if not eligible:
+                self._pending_ids.discard(request["id"])
+                rejected.append(request["id"])
+                continue
+            first_slot = slot_for(max(request["pickup_at"], now), self.slot_minutes)
+            key = (first_slot, request.get("station_id"), request["package_weight"])
+            assignment = None if key in full else self._assign(request, eligible, first_slot)
+            if assignment:
+                self._pending_ids.discard(request["id"])
+                assignments.append(assignment)
+            else:
+                # Fully booked within the horizon; parked until the horizon moves.
+                full.add(key)
+                self._parked.append(request)
+        return assignments, rejected
+
+
+class SchedulerService:
+    """Runs a PickupScheduler on a background thread against the delivery request store."""
+
+    def __init__(self, path=DEFAULT_DB_PATH, scheduler=None, poll_interval=POLL_INTERVAL):
+        self.path = path
+        self.scheduler = scheduler or PickupScheduler(get_station_registry())
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._last_rowid = 0
+        self._unsaved_assignments = []
+        self._unsaved_rejected = []
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        now = get_current_kst().replace(tzinfo=None)
+        for row in conn.execute(
+            "SELECT request_id, drone_id, station_id, slot_start FROM pickup_assignments WHERE slot_start >= ?",
+            (now.isoformat(timespec="minutes"),),
+        ):
+            self.scheduler.book(Assignment(*row[:3], datetime.fromisoformat(row[3])))
+        conn.close()
+        self._thread = threading.Thread(target=self._run, name="pickup-scheduler", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def stop(self):
+        """Stops the background thread after its current round."""
+        self._stop.set()
+        self._thread.join()
+
+    def run_once(self, conn):
+        """Loads new pending requests, schedules them and stores the result."""
+        # Request ids are random, so new rows are found by rowid; only this service changes a status,
+        # and requests still pending after a round stay queued in the scheduler.
+        rows = conn.execute(
+            "SELECT rowid, id, pickup_date, pickup_time, package_weight, station_id FROM delivery_requests "
+            "WHERE rowid > ? AND status = 'pending' ORDER BY rowid",
+            (self._last_rowid,),
+        ).fetchall()
+        if rows:
+            self._last_rowid = rows[-1]["rowid"]
+        for row in rows:
+            self.scheduler.add_request({
+                "id": row["id"],
+                "pickup_at": datetime.fromisoformat(f"{row['pickup_date']} {row['pickup_time']}"),
+                "package_weight": row["package_weight"],
+                "station_id": row["station_id"],
+            })
+        now = get_current_kst().replace(tzinfo=None)
+        self.scheduler.release_before(slot_for(now) - timedelta(minutes=self.scheduler.slot_minutes))
+        assignments, rejected = self.scheduler.schedule(now)
+        # Kept until committed, as their requests are not read again
+        self._unsaved_assignments.extend(assignments)
+        self._unsaved_rejected.extend(rejected)
+        assignments, rejected = self._unsaved_assignments, self._unsaved_rejected
+        if not assignments and not rejected:
+            return
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO pickup_assignments (request_id, drone_id, station_id, slot_start) VALUES (?, ?, ?, ?)",
+                [(a.request_id, a.drone_id, a.station_id, a.slot_start.isoformat(timespec="minutes")) for a in assignments],
+            )
+            conn.executemany(
+                "UPDATE delivery_requests SET status = 'scheduled' WHERE id = ?",
+                [(a.request_id,) for a in assignments],
+            )
+            conn.executemany(
+                "UPDATE delivery_requests SET status = 'rejected' WHERE id = ?",
+                [(request_id,) for request_id in rejected],
+            )
+        self._unsaved_assignments = []
+        self._unsaved_rejected = []
+
+    def _run(self):
+        conn = self._connect()
+        while not self._stop.is_set():
+            try:
+                self.run_once(conn)
+            except sqlite3.Error:
+                logger.exception("Pickup scheduling round failed")
+            self._stop.wait(self.poll_interval)
+        conn.close()
+
+    def requests_for_user(self, user_id):
+        """Returns a user's delivery requests with their drone and slot, newest first."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT r.id, r.recipient_name, r.pickup_date, r.pickup_time, r.status, "
+                "a.drone_id, a.station_id, a.slot_start "
+                "FROM delivery_requests r LEFT JOIN pickup_assignments a ON a.request_id = r.id "
+                "WHERE r.user_id = ? ORDER BY r.submitted_at DESC",
+                (user_id,),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def pickups_for_station(self, station_id, day):
+        """Returns the requests scheduled to leave a station on a day, in launch order."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT r.id, r.package_weight, a.drone_id, a.station_id, a.slot_start "
+                "FROM pickup_assignments a JOIN delivery_requests r ON r.id = a.request_id "
+                "WHERE a.slot_start >= ? AND a.slot_start < ? AND a.station_id = ? "
+                "ORDER BY a.slot_start, a.drone_id",
+                (day.isoformat(), (day + timedelta(days=1)).isoformat(), station_id),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_scheduler_service():
+    """Returns the process-wide scheduler service, starting its thread on first use."""
+    global _service
+
+    with _service_lock:
+        if _service is None:
+            # The writer creates the delivery_requests table the service reads.
+            _service = SchedulerService(get_delivery_request_writer().path)
+        return _service
@@ -0,0 +1,106 @@
+import threading
+from itertools import islice
+
+import numpy as np
+from sortedcontainers import SortedList
+
+# Recent additions are merged into the sorted arrays once this many have collected
+MERGE_THRESHOLD = 50_000
+SEARCH_LIMIT = 20
+
+# Between the user id and the search term in a key; sorts below every printable character
+_SEPARATOR_TEXT = "\x1f"
+_SEPARATOR = _SEPARATOR_TEXT.encode()
+# Above every byte that occurs in UTF-8, so key + _UPPER bounds all keys starting with key
+_UPPER = b"\xff"
+
+
+def normalize_query(text):
+    """Returns a search term as stored in the index: trimmed and upper-case."""
+    return text.strip().upper()
+
+
+def _prefix_range(keys, prefix):
+    """Returns the slice of a sorted byte-string array whose entries start with prefix."""
+    width = keys.dtype.itemsize
+    if len(prefix) > width:
+        return 0, 0
+    start = int(np.searchsorted(keys, prefix, "left"))
+    # Searching for a value wider than the array would truncate it
+    if len(prefix) == width:
+        return start, int(np.searchsorted(keys, prefix, "right"))
+    return start, int(np.searchsorted(keys, prefix + _UPPER, "left"))
+
+
+class OrderSearchIndex:
+    """In-memory index of order ids and tracking numbers with exact and prefix lookup per user.
+
+    Keys are user id + term as bytes in one sorted NumPy array, next to
+    an array of the order ids they point to, so millions of orders cost
+    tens of bytes each and a lookup is two binary searches. New orders go
+    to a small SortedList first and are merged in batches, so adding a few
+    orders never re-sorts the arrays.
+    """
+
+    def __init__(self, merge_threshold=MERGE_THRESHOLD):
+        self.merge_threshold = merge_threshold
+        self._keys = np.array([], dtype="S1")
+        self._order_ids = np.array([], dtype="S1")
+        self._recent = SortedList()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys) + len(self._recent)
+
+    def add(self, orders):
+        """Indexes orders given as (user_id, order_id, tracking_number)."""
+        orders = list(orders)
+        # Two keys per order, each term normalized as normalize_query() does, inlined for bulk loads
+        keys = [
+            f"{user_id}{_SEPARATOR_TEXT}{term.strip().upper()}".encode()
+            for user_id, order_id, tracking_number in orders
+            for term in (tracking_number, order_id)
+        ]
+        order_ids = [order_id.encode() for _, order_id, _ in orders for _ in range(2)]
+        with self._lock:
+            if len(keys) + len(self._recent) < self.merge_threshold:
+                self._recent.update(zip(keys, order_ids))
+                return
+            keys.extend(key for key, _ in self._recent)
+            order_ids.extend(order_id for _, order_id in self._recent)
+            self._recent.clear()
+            self._merge(np.array(keys, dtype=bytes), np.array(order_ids, dtype=bytes))
+
+    def _merge(self, keys, order_ids):
+        order = np.argsort(keys, kind="stable")
+        keys, order_ids = keys[order], order_ids[order]
+        # Wider new entries would be truncated on insert, so widen the arrays first
+        base_keys = self._keys.astype(np.result_type(self._keys, keys))
+        base_order_ids = self._order_ids.astype(np.result_type(self._order_ids, order_ids))
+        positions = np.searchsorted(base_keys, keys)
+        self._keys = np.insert(base_keys, positions, keys)
+        self._order_ids = np.insert(base_order_ids, positions, order_ids)
+
+    def search(self, user_id, query, limit=SEARCH_LIMIT):
+        """Returns the ids of the user's orders whose id or tracking number starts with query.
+
+        An exact match comes first; the rest follow in key order.
+        """
+        term = normalize_query(query)
+        if not term:
+            return []
+        prefix = user_id.encode() + _SEPARATOR + term.encode()
+        # An order can match by id and tracking number, so 2 * limit entries hold limit orders
+        wanted = 2 * limit
+        with self._lock:
+            start, stop = _prefix_range(self._keys, prefix)
+            stop = min(stop, start + wanted)
+            matches = list(zip(self._keys[start:stop].tolist(), self._order_ids[start:stop].tolist()))
+            matches.extend(islice(self._recent.irange((prefix,), (prefix + _UPPER,)), wanted))
+        matches.sort()
+        order_ids = []
+        for _, order_id in matches:
+            order_id = order_id.decode()
+            if order_id not in order_ids:
+                order_ids.append(order_id)
+        return order_ids[:limit]
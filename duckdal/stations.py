@@ -0,0 +1,115 @@
+import csv
+import math
+import os
+import threading
+from collections import namedtuple
+
+DEFAULT_STATIONS_PATH = os.environ.get(
+    "DUCKDAL_STATIONS_CSV", os.path.join(os.path.dirname(os.path.abspath(__file__)), "stations.csv")
+)
+EARTH_RADIUS_KM = 6371.0088
+
+Station = namedtuple("Station", ["id", "name", "lat", "lon", "launch_capacity"])
+
+
+def load_stations(path=DEFAULT_STATIONS_PATH):
+    """Reads the station list from a CSV file with id, name, lat, lon and launch_capacity columns."""
+    with open(path, encoding="utf-8", newline="") as f:
+        return [
+            Station(row["id"], row["name"], float(row["lat"]), float(row["lon"]), int(row["launch_capacity"]))
+            for row in csv.DictReader(f)
+        ]
+
+
+def _to_unit_xyz(lat, lon):
+    """Projects coordinates onto the unit sphere, where chord length grows with great-circle distance."""
+    import numpy as np
+
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def _chord_to_km(chord):
+    import numpy as np
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+class StationRegistry:
+    """All stations plus a KD-tree over them for nearest-k and within-radius lookups.
+
+    The tree is built over 3D unit-sphere points, so Euclidean queries match
+    great-circle order. numpy and scipy are only imported when the first
+    spatial query needs the tree.
+    """
+
+    def __init__(self, stations):
+        self.stations = list(stations)
+        self._by_id = {station.id: station for station in self.stations}
+        self._tree = None
+        self._tree_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.stations)
+
+    def __iter__(self):
+        return iter(self.stations)
+
+    def get(self, station_id):
+        """Returns the station with the given id, or None."""
+        return self._by_id.get(station_id)
+
+    def _index(self):
+        with self._tree_lock:
+            if self._tree is None:
+                from scipy.spatial import cKDTree
+
+                self._tree = cKDTree(_to_unit_xyz([s.lat for s in self.stations], [s.lon for s in self.stations]))
+            return self._tree
+
+    def nearest_many(self, lats, lons, k=1):
+        """Vectorized nearest-k lookup.
+
+        :return: (station indexes, distances in km), both shaped (n,) for k=1 or (n, k)
+        """
+        k = min(k, len(self.stations))
+        chords, indexes = self._index().query(_to_unit_xyz(lats, lons), k=k)
+        return indexes, _chord_to_km(chords)
+
+    def nearest(self, lat, lon, k=1):
+        """Returns the k closest stations to a point as [(station, distance_km)], closest first."""
+        indexes, distances = self.nearest_many([lat], [lon], k=k)
+        return [
+            (self.stations[index], float(distance))
+            for index, distance in zip(indexes.reshape(-1).tolist(), distances.reshape(-1).tolist())
+        ]
+
+    def within_radius(self, lat, lon, radius_km):
+        """Returns every station within radius_km of a point as [(station, distance_km)], closest first."""
+        import numpy as np
+
+        point = _to_unit_xyz(lat, lon)
+        chord = 2 * math.sin(min(radius_km / (2 * EARTH_RADIUS_KM), math.pi / 2))
+        indexes = self._index().query_ball_point(point, chord)
+        if not indexes:
+            return []
+        distances = _chord_to_km(np.linalg.norm(self._index().data[indexes] - point, axis=1))
+        return sorted(
+            ((self.stations[index], float(distance)) for index, distance in zip(indexes, distances.tolist())),
+            key=lambda match: match[1],
+        )
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_station_registry():
+    """Returns the process-wide station registry, loading the station list on first use."""
+    global _registry
+
+    with _registry_lock:
+        if _registry is None:
+            _registry = StationRegistry(load_stations())
+        return _registry
@@ -0,0 +1,155 @@
+import logging
+import os
+import random
+import sqlite3
+import threading
+import weakref
+from collections import namedtuple
+
+from duckdal.common import get_current_kst
+
+# Seconds between the tracking page's checks for new statuses
+REFRESH_SECONDS = float(os.environ.get("DUCKDAL_STATUS_REFRESH_SECONDS", "5"))
+# Set to 1 to run the demo producer, which advances watched in-flight orders
+DEMO_UPDATES = os.environ.get("DUCKDAL_DEMO_STATUS_UPDATES") == "1"
+DEMO_INTERVAL = 3.0
+
+StatusUpdate = namedtuple("StatusUpdate", ["order_id", "status", "seq"])
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One session's view of the status bus: the updates for the orders it watches.
+
+    Updates are kept per order until drained, so only the newest status of an
+    order is ever handed out.
+    """
+
+    def __init__(self, bus):
+        self._bus = bus
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def watch(self, order_ids):
+        """Starts delivering updates for these orders."""
+        self._bus._watch(self, order_ids)
+
+    def _deliver(self, update):
+        with self._lock:
+            self._pending[update.order_id] = update
+
+    def has_updates(self):
+        """Returns True if an update is waiting, without consuming it."""
+        with self._lock:
+            return bool(self._pending)
+
+    def drain(self):
+        """Returns every unseen update, at most one per order, and forgets them."""
+        with self._lock:
+            updates = list(self._pending.values())
+            self._pending.clear()
+        return updates
+
+
+class StatusBus:
+    """In-process publish/subscribe channel for order status changes and tracking events.
+
+    publish() only reaches the subscriptions watching that order, so the
+    cost of an update does not grow with the number of orders on screen.
+    Subscriptions are held weakly and disappear with their sessions.
+    """
+
+    def __init__(self):
+        self._watchers = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Returns a new subscription; keep it for as long as updates are wanted."""
+        return Subscription(self)
+
+    def _watch(self, subscription, order_ids):
+        with self._lock:
+            for order_id in order_ids:
+                self._watchers.setdefault(order_id, weakref.WeakSet()).add(subscription)
+
+    def watched_order_ids(self):
+        """Returns the ids of the orders some live subscription is watching."""
+        with self._lock:
+            for order_id in [order_id for order_id, watchers in self._watchers.items() if not watchers]:
+                del self._watchers[order_id]
+            return list(self._watchers)
+
+    def publish(self, order_id, status):
+        """Sends a new status of an order to everyone watching it."""
+        with self._lock:
+            self._seq += 1
+            update = StatusUpdate(order_id, status, self._seq)
+            watchers = list(self._watchers.get(order_id, ()))
+        for subscription in watchers:
+            subscription._deliver(update)
+        return update
+
+
+class DemoStatusProducer:
+    """Stands in for courier scans: advances a watched in-flight order every interval.
+
+    Each step appends a scan event to the order's tracking history and
+    publishes the order's status; about one step in four completes the
+    delivery.
+    """
+
+    def __init__(self, bus, repository, interval=DEMO_INTERVAL):
+        self.bus = bus
+        self.repository = repository
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="demo-status-producer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def step(self):
+        """Advances one random watched in-flight order; returns the published StatusUpdate."""
+        in_flight = [
+            order for order in map(self.repository.get_order, self.bus.watched_order_ids())
+            if order and order["status"] == "배송중"
+        ]
+        if not in_flight:
+            return None
+        order = random.choice(in_flight)
+        now = get_current_kst().strftime("%Y-%m-%d %H:%M")
+        if random.random() < 0.25:
+            self.repository.add_tracking_events([(order["id"], now, "배송지", "배달 완료")])
+            self.repository.update_status(order["id"], "배달 완료")
+            return self.bus.publish(order["id"], "배달 완료")
+        self.repository.add_tracking_events([(order["id"], now, "드론 비행 중", "배송 중")])
+        return self.bus.publish(order["id"], order["status"])
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.step()
+            except sqlite3.Error:
+                logger.exception("Demo status update failed")
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_status_bus():
+    """Returns the process-wide status bus, with the demo producer if DUCKDAL_DEMO_STATUS_UPDATES=1."""
+    global _bus
+
+    with _bus_lock:
+        if _bus is None:
+            _bus = StatusBus()
+            if DEMO_UPDATES:
+                from duckdal.order_store import get_order_repository
+
+                DemoStatusProducer(_bus, get_order_repository())
+        return _bus
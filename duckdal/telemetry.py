@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# host:port the telemetry listener binds to; telemetry is off while unset
+TELEMETRY_ADDRESS = os.environ.get("DUCKDAL_TELEMETRY_ADDR", "")
+# Points kept per drone: ten minutes at the simulator's 1 Hz
+HISTORY_POINTS = 600
+# Received datagrams are parsed together at this interval
+FLUSH_INTERVAL = 0.1
+# Latest positions are copied to the live map's PositionBuffer at this interval
+PUBLISH_INTERVAL = 1.0
+# Drones silent for longer than this leave the live map
+STALE_SECONDS = 10.0
+
+# One message as sent on the wire, little-endian; a datagram carries one or more
+MESSAGE_DTYPE = np.dtype([
+    ("drone_id", "S16"),
+    ("time", "<f8"),
+    ("lat", "<f8"),
+    ("lon", "<f8"),
+    ("altitude", "<f4"),
+    ("battery", "<f4"),
+])
+# Messages per datagram that keep it within a 1500-byte MTU
+MAX_DATAGRAM_MESSAGES = 1400 // MESSAGE_DTYPE.itemsize
+
+TelemetryPoint = namedtuple("TelemetryPoint", ["drone_id", "time", "lat", "lon", "altitude", "battery"])
+
+_FIELDS = ("time", "lat", "lon", "altitude", "battery")
+
+logger = logging.getLogger(__name__)
+
+
+def pack_messages(drone_ids, times, lats, lons, altitudes, batteries):
+    """Encodes telemetry as datagrams of at most MAX_DATAGRAM_MESSAGES messages each."""
+    messages = np.empty(len(drone_ids), dtype=MESSAGE_DTYPE)
+    messages["drone_id"] = [drone_id.encode() for drone_id in drone_ids]
+    messages["time"] = times
+    messages["lat"] = lats
+    messages["lon"] = lons
+    messages["altitude"] = altitudes
+    messages["battery"] = batteries
+    return [
+        messages[start:start + MAX_DATAGRAM_MESSAGES].tobytes()
+        for start in range(0, len(messages), MAX_DATAGRAM_MESSAGES)
+    ]
+
+
+class TelemetryStore:
+    """Recent telemetry of every drone in fixed-size NumPy ring buffers.
+
+    Each field is a (drones, history) array; a drone's row is a ring of its
+    last history points, written in place. Messages arrive in batches and are
+    scattered into the rings with a few array operations, so ingesting does
+    not allocate per message.
+
+    There is one writer. Readers never take a lock: a sequence number is odd
+    while a batch is being written, and a read that overlapped a write is
+    simply retried.
+    """
+
+    def __init__(self, history=HISTORY_POINTS, capacity=256):
+        self.history = history
+        self.messages = 0
+        self.rejected = 0
+        self._index = {}
+        self._ids = []
+        self._columns = {
+            name: np.zeros((capacity, history), dtype=MESSAGE_DTYPE[name])
+            for name in _FIELDS
+        }
+        # Messages written per drone; the newest point is at (count - 1) % history
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _rows_for(self, drone_ids):
+        """Returns the row of each message's drone, adding rows for new drones."""
+        unique_ids, inverse = np.unique(drone_ids, return_inverse=True)
+        rows = np.empty(len(unique_ids), dtype=np.int64)
+        for i, drone_id in enumerate(unique_ids.tolist()):
+            row = self._index.get(drone_id)
+            if row is None:
+                if len(self._ids) == len(self._count):
+                    self._grow()
+                row = self._index[drone_id] = len(self._ids)
+                self._ids.append(drone_id.decode())
+            rows[i] = row
+        return rows[inverse.reshape(-1)]
+
+    def _grow(self):
+        capacity = 2 * len(self._count)
+        for name, column in self._columns.items():
+            grown = np.zeros((capacity, self.history), dtype=column.dtype)
+            grown[:len(column)] = column
+            self._columns[name] = grown
+        count = np.zeros(capacity, dtype=np.int64)
+        count[:len(self._count)] = self._count
+        self._count = count
+
+    def ingest(self, messages):
+        """Writes a MESSAGE_DTYPE array, in arrival order, to the drones' rings."""
+        if len(messages) == 0:
+            return
+        self._seq += 1
+        try:
+            rows = self._rows_for(messages["drone_id"])
+            # Group the batch by drone; within a drone, messages keep their order
+            order = np.argsort(rows, kind="stable")
+            rows = rows[order]
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            counts = np.diff(np.r_[starts, len(rows)])
+            rank = np.arange(len(rows)) - np.repeat(starts, counts)
+            slots = (self._count[rows] + rank) % self.history
+            for name, column in self._columns.items():
+                column[rows, slots] = messages[name][order]
+            self._count[rows[starts]] += counts
+            self.messages += len(messages)
+        finally:
+            self._seq += 1
+
+    def ingest_datagrams(self, datagrams):
+        """Parses raw datagrams in one pass and ingests them; malformed ones are counted and dropped."""
+        valid = [data for data in datagrams if data and len(data) % MESSAGE_DTYPE.itemsize == 0]
+        self.rejected += len(datagrams) - len(valid)
+        if valid:
+            self.ingest(np.frombuffer(b"".join(valid), dtype=MESSAGE_DTYPE))
+
+    def _read(self, read):
+        while True:
+            seq = self._seq
+            if seq % 2 == 0:
+                try:
+                    result = read()
+                except (IndexError, ValueError):
+                    # Arrays were grown under the read
+                    if self._seq == seq:
+                        raise
+                else:
+                    if self._seq == seq:
+                        return result
+            # Let the writer finish its batch
+            time.sleep(0)
+
+    def latest(self, drone_id):
+        """Returns a drone's newest TelemetryPoint, or None if it never reported."""
+        row = self._index.get(drone_id.encode())
+        if row is None:
+            return None
+
+        def read():
+            slot = (self._count[row] - 1) % self.history
+            return TelemetryPoint(drone_id, *(float(self._columns[name][row, slot]) for name in _FIELDS))
+
+        return self._read(read)
+
+    def track(self, drone_id, points=HISTORY_POINTS):
+        """Returns a drone's last points, oldest first, as a dict of time, lat, lon, altitude and battery arrays."""
+        row = self._index.get(drone_id.encode())
+
+        def read():
+            count = self._count[row] if row is not None else 0
+            size = min(points, count, self.history)
+            slots = (count - size + np.arange(size)) % self.history
+            return {name: self._columns[name][row, slots] if size else np.empty(0) for name in _FIELDS}
+
+        return self._read(read)
+
+    def latest_all(self):
+        """Returns (drone ids, dict of field arrays) with the newest point of every drone."""
+
+        def read():
+            size = len(self._ids)
+            rows = np.arange(size)
+            slots = (self._count[:size] - 1) % self.history
+            return self._ids[:size], {name: self._columns[name][rows, slots] for name in _FIELDS}
+
+        return self._read(read)
+
+
+class _TelemetryProtocol(asyncio.DatagramProtocol):
+    """Collects datagrams until the next flush; parsing happens in batches."""
+
+    def __init__(self):
+        self.pending = []
+
+    def datagram_received(self, data, addr):
+        self.pending.append(data)
+
+    def take(self):
+        pending, self.pending = self.pending, []
+        return pending
+
+
+class TelemetryService:
+    """Receives drone telemetry over UDP on an asyncio loop in a background thread.
+
+    Datagrams are parsed into the store every FLUSH_INTERVAL, and the drones'
+    latest positions are published to the live map's PositionBuffer every
+    PUBLISH_INTERVAL; drones that went silent are removed from it.
+    """
+
+    def __init__(self, host, port, store=None, positions=None,
+                 flush_interval=FLUSH_INTERVAL, publish_interval=PUBLISH_INTERVAL):
+        self.store = store or TelemetryStore()
+        self.positions = positions
+        self.flush_interval = flush_interval
+        self.publish_interval = publish_interval
+        self.address = None
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(host, port),),
+                                        name="drone-telemetry", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error:
+            raise self._error
+
+    def stop(self):
+        """Stops listening after the current flush."""
+        self._stop.set()
+        self._thread.join()
+
+    async def _serve(self, host, port):
+        loop = asyncio.get_running_loop()
+        try:
+            transport, protocol = await loop.create_datagram_endpoint(_TelemetryProtocol, local_addr=(host, port))
+        except OSError as error:
+            self._error = error
+            self._ready.set()
+            return
+        self.address = transport.get_extra_info("sockname")[:2]
+        self._ready.set()
+        published = loop.time()
+        try:
+            while not self._stop.is_set():
+                await asyncio.sleep(self.flush_interval)
+                self.store.ingest_datagrams(protocol.take())
+                if self.positions is not None and loop.time() - published >= self.publish_interval:
+                    published = loop.time()
+                    self.publish()
+        finally:
+            transport.close()
+
+    def publish(self, now=None):
+        """Sends the latest position of every drone that reported recently to the PositionBuffer."""
+        drone_ids, latest = self.store.latest_all()
+        fresh = latest["time"] >= (now or time.time()) - STALE_SECONDS
+        self.positions.update([drone_id for drone_id, ok in zip(drone_ids, fresh) if ok],
+                              latest["lat"][fresh], latest["lon"][fresh])
+        self.positions.remove([drone_id for drone_id, ok in zip(drone_ids, fresh) if not ok])
+
+
+_service = None
+_service_failed = False
+_service_lock = threading.Lock()
+
+
+def get_telemetry_service():
+    """Returns the process-wide telemetry service, or None while DUCKDAL_TELEMETRY_ADDR is unset."""
+    global _service, _service_failed
+
+    if not TELEMETRY_ADDRESS:
+        return None
+    with _service_lock:
+        if _service is None and not _service_failed:
+            from duckdal.live_map import get_position_buffer
+
+            host, _, port = TELEMETRY_ADDRESS.rpartition(":")
+            try:
+                port = int(port)
+                if not 0 < port < 65536:
+                    raise ValueError(port)
+            except ValueError:
+                logger.warning("Drone telemetry is off: DUCKDAL_TELEMETRY_ADDR=%r is not host:port", TELEMETRY_ADDRESS)
+                _service_failed = True
+                return None
+            try:
+                _service = TelemetryService(host or "127.0.0.1", port, positions=get_position_buffer())
+            except OSError:
+                # Another app process already listens on the address
+                logger.exception("Drone telemetry listener could not bind %s", TELEMETRY_ADDRESS)
+                _service_failed = True
+        return _service
@@ -0,0 +1,66 @@
+import html
+import os
+import re
+import threading
+
+import streamlit as st
+
+from duckdal.common import DEFAULT_STATUS_COLOR, STATUS_COLORS
+
+THEME_CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "theme.css")
+
+# Badge class per order status; colours come from duckdal.common.STATUS_COLORS
+STATUS_BADGE_CLASSES = {
+    "배송중": "in-transit",
+    "배달 완료": "delivered",
+    "취소됨": "cancelled",
+}
+DEFAULT_BADGE_CLASS = "other"
+
+_bundle = None
+_bundle_lock = threading.Lock()
+
+
+def _minify(css):
+    """Drops comments and the whitespace a browser does not need."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def build_theme_bundle(path=THEME_CSS_PATH):
+    """Returns the minified theme stylesheet with a rule per status badge."""
+    with open(path, encoding="utf-8") as f:
+        css = f.read()
+    for status, color in STATUS_COLORS.items():
+        css += f"\n.status-badge.{STATUS_BADGE_CLASSES[status]} {{ background-color: {color}; }}"
+    css += f"\n.status-badge.{DEFAULT_BADGE_CLASS} {{ background-color: {DEFAULT_STATUS_COLOR}; }}"
+    return _minify(css)
+
+
+def get_theme_bundle():
+    """Returns the theme stylesheet, built on first use and shared by every session."""
+    global _bundle
+
+    with _bundle_lock:
+        if _bundle is None:
+            _bundle = build_theme_bundle()
+        return _bundle
+
+
+def apply_theme():
+    """Adds the theme stylesheet to the page.
+
+    Every rerun sends the same element, so the browser keeps it in its
+    message cache and later reruns only carry a reference to it (see
+    global.minCachedMessageSize in .streamlit/config.toml).
+    """
+    st.markdown(f"<style>{get_theme_bundle()}</style>", unsafe_allow_html=True)
+
+
+def status_badge(status):
+    """Returns the HTML of an order status badge."""
+    badge_class = STATUS_BADGE_CLASSES.get(status, DEFAULT_BADGE_CLASS)
+    return f"<span class='status-badge {badge_class}'>{html.escape(status)}</span>"
@@ -0,0 +1,322 @@
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from collections import namedtuple
+
+# A new segment is started once the active one reaches this size.
+SEGMENT_BYTES = 8 * 1024 * 1024
+# An order's history is snapshotted once this many events follow its last snapshot.
+SNAPSHOT_EVERY = 16
+# Every order is snapshotted after this many appended events, so reopening
+# the log only scans what was written after the last checkpoint.
+CHECKPOINT_EVERY = 50_000
+
+TrackingEvent = namedtuple("TrackingEvent", ["order_id", "date", "location", "status"])
+
+# Record: payload length, CRC32 of everything after the header, order id length;
+# then the order id and a JSON [date, location, status] payload.
+_HEADER = struct.Struct("<IIH")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    order_id TEXT PRIMARY KEY,
+    events TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_SEGMENT_SHIFT = 32
+# Orders looked up per query when snapshots are written
+_SNAPSHOT_QUERY_SIZE = 500
+
+
+def _position(segment, offset):
+    """Packs a segment number and byte offset into one sortable integer."""
+    return (segment << _SEGMENT_SHIFT) | offset
+
+
+def _split_position(position):
+    return position >> _SEGMENT_SHIFT, position & ((1 << _SEGMENT_SHIFT) - 1)
+
+
+def _lock_exclusively(f):
+    """Takes a non-blocking exclusive lock on an open file; raises OSError if another process holds it."""
+    if os.name == "nt":
+        import msvcrt
+
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def _encode(event):
+    order_id = event.order_id.encode()
+    payload = json.dumps([event.date, event.location, event.status], ensure_ascii=False).encode()
+    body = order_id + payload
+    return _HEADER.pack(len(payload), zlib.crc32(body), len(order_id)) + body
+
+
+class TrackingLog:
+    """Append-only, segmented log of tracking events with per-order snapshots.
+
+    Events are appended in batches to segment files and read back through
+    mmap. Each order's history is stored as a snapshot in SQLite plus the
+    log positions of the events written after it (its tail), which stays
+    short: an order is snapshotted again once its tail reaches
+    snapshot_every events, and checkpoint() snapshots every tail and
+    records how far the log is covered. Reopening the log only scans the
+    records after the last checkpoint.
+
+    Record positions and tails live in this process, so a log has a single
+    writer: opening it takes an exclusive lock on its directory and raises
+    RuntimeError while another process has it open. Within a process, open
+    it with open_tracking_log() so that every user shares one instance.
+    """
+
+    def __init__(self, directory, segment_bytes=SEGMENT_BYTES, snapshot_every=SNAPSHOT_EVERY,
+                 checkpoint_every=CHECKPOINT_EVERY):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.snapshot_every = snapshot_every
+        self.checkpoint_every = checkpoint_every
+        self._lock = threading.Lock()
+        self._tails = {}
+        self._maps = {}
+        self._since_checkpoint = 0
+        os.makedirs(directory, exist_ok=True)
+        # Held until close(); taken before the scan, which may truncate a torn record
+        self._lock_file = open(os.path.join(directory, "writer.lock"), "a+b")
+        try:
+            _lock_exclusively(self._lock_file)
+        except OSError as error:
+            self._lock_file.close()
+            raise RuntimeError(f"Tracking log {directory} is open in another process") from error
+        self._db = sqlite3.connect(os.path.join(directory, "snapshots.db"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'checkpoint'").fetchone()
+        self._checkpoint = row[0] if row else 0
+
+        segments = sorted(
+            int(name[len("segment-"):-len(".log")])
+            for name in os.listdir(directory)
+            if name.startswith("segment-") and name.endswith(".log")
+        )
+        self._segment = segments[-1] if segments else 1
+        # Orders snapshotted after the checkpoint already hold part of what the scan finds.
+        snapshotted = dict(self._db.execute(
+            "SELECT order_id, position FROM snapshots WHERE position >= ?", (self._checkpoint,)
+        ))
+        for segment in segments:
+            self._scan(segment, snapshotted)
+        self._file = open(self._segment_path(self._segment), "ab", buffering=0)
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"segment-{segment:06d}.log")
+
+    def _map(self, segment, end):
+        """Returns a read-only mmap of a segment covering at least end bytes, remapping the active one as it grows."""
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            if mapped is not None:
+                mapped.close()
+            with open(self._segment_path(segment), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mapped
+        return mapped
+
+    def _scan(self, segment, snapshotted):
+        """Indexes the tails written to a segment after the last checkpoint and cuts off a torn last record."""
+        checkpoint_segment, checkpoint_offset = _split_position(self._checkpoint)
+        size = os.path.getsize(self._segment_path(segment))
+        if segment < checkpoint_segment or size == 0:
+            return
+        data = self._map(segment, size)
+        offset = checkpoint_offset if segment == checkpoint_segment else 0
+        while offset < len(data):
+            if offset + _HEADER.size > len(data):
+                break
+            payload_length, crc, id_length = _HEADER.unpack_from(data, offset)
+            end = offset + _HEADER.size + id_length + payload_length
+            if end > len(data) or zlib.crc32(data[offset + _HEADER.size:end]) != crc:
+                break
+            order_id = data[offset + _HEADER.size:offset + _HEADER.size + id_length].decode()
+            position = _position(segment, offset)
+            if position > snapshotted.get(order_id, -1):
+                self._tails.setdefault(order_id, []).append(position)
+            offset = end
+        if offset < len(data):
+            # A write was interrupted; everything from here on is incomplete.
+            self._maps.pop(segment).close()
+            with open(self._segment_path(segment), "r+b") as f:
+                f.truncate(offset)
+
+    def _payload(self, position):
+        """Returns the JSON [date, location, status] text of the record at position."""
+        segment, offset = _split_position(position)
+        data = self._map(segment, offset + _HEADER.size)
+        payload_length, _, id_length = _HEADER.unpack_from(data, offset)
+        start = offset + _HEADER.size + id_length
+        data = self._map(segment, start + payload_length)
+        return data[start:start + payload_length].decode()
+
+    def _write_snapshots(self, order_ids):
+        """Folds the tails of order_ids into their snapshots; call with the lock held, in a transaction.
+
+        Snapshots are JSON arrays of [date, location, status] arrays, so the
+        raw payloads of the tail are spliced in without decoding them.
+        Returns the order ids written; the caller drops their tails once the
+        transaction has committed.
+        """
+        order_ids = [order_id for order_id in order_ids if order_id in self._tails]
+        rows = []
+        for start in range(0, len(order_ids), _SNAPSHOT_QUERY_SIZE):
+            chunk = order_ids[start:start + _SNAPSHOT_QUERY_SIZE]
+            existing = dict(self._db.execute(
+                f"SELECT order_id, events FROM snapshots WHERE order_id IN ({', '.join('?' * len(chunk))})", chunk
+            ))
+            for order_id in chunk:
+                tail = self._tails[order_id]
+                events = [existing[order_id][1:-1]] if order_id in existing else []
+                events.extend(self._payload(position) for position in tail)
+                rows.append((order_id, f"[{','.join(events)}]", tail[-1]))
+        self._db.executemany(
+            "INSERT OR REPLACE INTO snapshots (order_id, events, position) VALUES (?, ?, ?)", rows
+        )
+        return order_ids
+
+    def _drop_tails(self, order_ids):
+        for order_id in order_ids:
+            del self._tails[order_id]
+
+    def append(self, events):
+        """Appends a batch of TrackingEvents (or equivalent tuples) with one write and one fsync."""
+        with self._lock:
+            full = set()
+            chunk = []
+            # Positions of the records in chunk; they join the tails only once the chunk is on disk
+            positions = []
+            offset = self._file.tell()
+            for event in events:
+                if offset >= self.segment_bytes:
+                    self._write_chunk(chunk, positions, full)
+                    chunk, positions = [], []
+                    self._roll()
+                    offset = 0
+                event = TrackingEvent(*event)
+                record = _encode(event)
+                chunk.append(record)
+                positions.append((event.order_id, _position(self._segment, offset)))
+                offset += len(record)
+            self._write_chunk(chunk, positions, full)
+            if full:
+                with self._db:
+                    written = self._write_snapshots(list(full))
+                self._drop_tails(written)
+            if self._since_checkpoint >= self.checkpoint_every:
+                self._checkpoint_locked()
+
+    def _write_chunk(self, chunk, positions, full):
+        """Writes and fsyncs records, then adds their positions to the tails and the orders due a snapshot to full.
+
+        If the write fails, the segment is cut back to where the chunk
+        started, so the next append reuses those offsets without leaving a
+        torn record in between.
+        """
+        if not chunk:
+            return
+        start = self._file.tell()
+        data = memoryview(b"".join(chunk))
+        try:
+            while data:
+                data = data[self._file.write(data):]
+            os.fsync(self._file.fileno())
+        except BaseException:
+            self._file.truncate(start)
+            self._file.seek(start)
+            raise
+        for order_id, position in positions:
+            tail = self._tails.setdefault(order_id, [])
+            tail.append(position)
+            if len(tail) >= self.snapshot_every:
+                full.add(order_id)
+        self._since_checkpoint += len(positions)
+
+    def _roll(self):
+        self._file.close()
+        self._segment += 1
+        self._file = open(self._segment_path(self._segment), "ab", buffering=0)
+
+    def history(self, order_id):
+        """Returns an order's events, oldest first: its snapshot plus the events appended after it."""
+        with self._lock:
+            row = self._db.execute("SELECT events FROM snapshots WHERE order_id = ?", (order_id,)).fetchone()
+            events = json.loads(row[0]) if row else []
+            events.extend(json.loads(self._payload(position)) for position in self._tails.get(order_id, []))
+        return [{"date": date, "location": location, "status": status} for date, location, status in events]
+
+    def checkpoint(self):
+        """Snapshots every order with a tail, so a reopened log starts scanning from here."""
+        with self._lock:
+            self._checkpoint_locked()
+
+    def _checkpoint_locked(self):
+        checkpoint = _position(self._segment, self._file.tell())
+        with self._db:
+            written = self._write_snapshots(list(self._tails))
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('checkpoint', ?)", (checkpoint,)
+            )
+        self._drop_tails(written)
+        self._checkpoint = checkpoint
+        self._since_checkpoint = 0
+
+    def is_empty(self):
+        """Returns True if no event was ever appended."""
+        with self._lock:
+            return self._segment == 1 and self._file.tell() == 0
+
+    def close(self):
+        """Checkpoints and releases the files."""
+        with _open_logs_lock:
+            if _open_logs.get(os.path.realpath(self.directory)) is self:
+                del _open_logs[os.path.realpath(self.directory)]
+        with self._lock:
+            if self._file.closed:
+                return
+            self._checkpoint_locked()
+            self._file.close()
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            self._db.close()
+            self._lock_file.close()
+
+
+_open_logs = {}
+_open_logs_lock = threading.Lock()
+
+
+def open_tracking_log(directory):
+    """Returns this process's open TrackingLog for a directory, opening it on first use.
+
+    A log takes its writer lock once per process, so a repository created
+    again (e.g. after Streamlit reloads order_store) shares the open log
+    instead of failing on the lock.
+    """
+    key = os.path.realpath(directory)
+    with _open_logs_lock:
+        log = _open_logs.get(key)
+        if log is None:
+            log = _open_logs[key] = TrackingLog(directory)
+        return log
@@ -0,0 +1,58 @@
+import pandas as pd
+
+from duckdal.instrumentation import traced
+
+TRACKING_DATE_FORMAT = "%Y-%m-%d %H:%M"
+KST_ZONE = "Asia/Seoul"
+
+
+def rebase_tracking_dates(dates, base_date, now=None):
+    """Moves every timestamp onto base_date, keeping its time of day, localized to KST.
+
+    :param dates: pandas Series, pyarrow Array/ChunkedArray or sequence of "%Y-%m-%d %H:%M" strings
+    :param base_date: datetime.date object, the date every event is moved to
+    :param now: datetime used for rows that cannot be parsed, defaults to the current KST time
+    :return: (Series of tz-aware timestamps, boolean numpy mask of rows that could not be parsed)
+    """
+    if hasattr(dates, "to_pandas"):
+        dates = dates.to_pandas()
+    dates = pd.Series(dates, copy=False)
+
+    # One vectorized parse for the whole column; bad rows become NaT.
+    parsed = pd.to_datetime(dates, format=TRACKING_DATE_FORMAT, errors="coerce")
+    invalid = parsed.isna().to_numpy()
+
+    time_of_day = parsed - parsed.dt.normalize()
+    if invalid.any():
+        now = now or pd.Timestamp.now(tz=KST_ZONE)
+        fallback = pd.Timedelta(hours=now.hour, minutes=now.minute, seconds=now.second)
+        time_of_day = time_of_day.fillna(fallback)
+
+    rebased = (pd.Timestamp(base_date) + time_of_day).dt.tz_localize(KST_ZONE)
+    return rebased, invalid
+
+
+@traced()
+def normalize_tracking_timeline(timeline, base_date, column="date", now=None):
+    """Returns a copy of a tracking timeline with its dates rebased onto base_date in KST.
+
+    The input frame is never modified. Rows whose date cannot be parsed get the
+    current KST time of day and are flagged in the returned mask instead of
+    being reported one by one.
+
+    :param timeline: pandas DataFrame or pyarrow Table with a date column
+    :param base_date: datetime.date object, the base date to add
+    :param column: name of the date column
+    :param now: datetime used for rows that cannot be parsed
+    :return: (new DataFrame with tz-aware dates, boolean numpy mask of invalid rows)
+    """
+    if hasattr(timeline, "to_pandas"):
+        timeline = timeline.to_pandas()
+    rebased, invalid = rebase_tracking_dates(timeline[column], base_date, now=now)
+    return timeline.assign(**{column: rebased}), invalid
+
+
+def format_tracking_dates(timeline, column="date"):
+    """Returns a copy of a normalized timeline with its dates formatted as display strings."""
+    return timeline.assign(**{column: timeline[column].dt.strftime(TRACKING_DATE_FORMAT)})
+
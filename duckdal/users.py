@@ -0,0 +1,177 @@
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+import jwt
+
+DEFAULT_DB_PATH = os.environ.get("DUCKDAL_USERS_DB", os.path.join("data", "users.db"))
+
+BCRYPT_ROUNDS = 12
+# bcrypt releases the GIL, so this bounds how many cores password checks may take.
+HASH_WORKERS = 4
+MAX_FAILED_ATTEMPTS = 5
+LOCKOUT_SECONDS = 300
+SESSION_TTL_SECONDS = 7 * 24 * 3600
+SESSION_COOKIE = "duckdal_session"
+
+# Created when the store is empty, so the demo login keeps working
+DEMO_USERNAME = "test"
+DEMO_PASSWORD = "test"
+
+LoginResult = namedtuple("LoginResult", ["ok", "username", "token", "locked_until"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password_hash BLOB NOT NULL,
+    failed_attempts INTEGER NOT NULL DEFAULT 0,
+    locked_until REAL NOT NULL DEFAULT 0,
+    token_version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class UserStore:
+    """User accounts with bcrypt password hashes, lockout and signed session tokens.
+
+    Password checks run on a small thread pool and return futures, so a
+    Streamlit script never waits on bcrypt. A successful login issues a JWT
+    that later visits exchange for the user without checking the password
+    again; logging out bumps the user's token version, which revokes every
+    token issued before.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, secret=None):
+        self.path = path
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="password-check")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        self._secret = secret or os.environ.get("DUCKDAL_SESSION_SECRET") or self._stored_secret(conn)
+        # Compared against for unknown or locked usernames, so timing does not reveal which exist
+        self._dummy_hash = bcrypt.hashpw(b"", bcrypt.gensalt(BCRYPT_ROUNDS))
+        if conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0:
+            self.create_user(DEMO_USERNAME, DEMO_PASSWORD)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _stored_secret(conn):
+        """Returns the token signing key kept in the store, creating it on first use."""
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO settings (key, value) VALUES ('session_secret', ?)", (secrets.token_hex(32),)
+            )
+        return conn.execute("SELECT value FROM settings WHERE key = 'session_secret'").fetchone()[0]
+
+    def create_user(self, username, password):
+        """Adds a user, or replaces the password of an existing one."""
+        password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt(BCRYPT_ROUNDS))
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO users (username, password_hash) VALUES (?, ?) "
+                "ON CONFLICT (username) DO UPDATE SET password_hash = excluded.password_hash, "
+                "failed_attempts = 0, locked_until = 0",
+                (username, password_hash),
+            )
+
+    def authenticate(self, username, password):
+        """Checks a password on the hashing pool; returns a Future of a LoginResult."""
+        return self._pool.submit(self._authenticate, username, password)
+
+    def _authenticate(self, username, password):
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT password_hash, locked_until FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        now = time.time()
+        if row is None or row["locked_until"] > now:
+            # Unknown and locked accounts pay for a check as well, so timing reveals neither
+            bcrypt.checkpw(password.encode(), self._dummy_hash)
+            return LoginResult(False, username, None, row["locked_until"] if row else None)
+        password_ok = bcrypt.checkpw(password.encode(), row["password_hash"])
+        # The lock is checked again in the same statement that records the attempt, so attempts
+        # that ran concurrently cannot get past it; the UPDATE holds the write lock until commit.
+        with conn:
+            if password_ok:
+                updated = conn.execute(
+                    "UPDATE users SET failed_attempts = 0, locked_until = 0 WHERE username = ? AND locked_until <= ?",
+                    (username, now),
+                ).rowcount
+            else:
+                # An expired lockout starts the count again rather than locking on the next failure
+                attempts = "CASE WHEN locked_until > 0 THEN 1 ELSE failed_attempts + 1 END"
+                updated = conn.execute(
+                    f"UPDATE users SET failed_attempts = {attempts}, "
+                    f"locked_until = CASE WHEN {attempts} >= ? THEN ? ELSE 0 END "
+                    "WHERE username = ? AND locked_until <= ?",
+                    (MAX_FAILED_ATTEMPTS, now + LOCKOUT_SECONDS, username, now),
+                ).rowcount
+            locked_until = conn.execute(
+                "SELECT locked_until FROM users WHERE username = ?", (username,)
+            ).fetchone()[0]
+        if not password_ok or not updated:
+            return LoginResult(False, username, None, locked_until if locked_until > now else None)
+        return LoginResult(True, username, self.issue_token(username), None)
+
+    def issue_token(self, username):
+        """Returns a signed session token for a user."""
+        row = self._connection().execute(
+            "SELECT token_version FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        now = int(time.time())
+        claims = {"sub": username, "ver": row[0], "iat": now, "exp": now + SESSION_TTL_SECONDS}
+        return jwt.encode(claims, self._secret, algorithm="HS256")
+
+    def verify_token(self, token):
+        """Returns the username a session token was issued to, or None if it is invalid, expired or revoked."""
+        try:
+            claims = jwt.decode(token, self._secret, algorithms=["HS256"])
+        except jwt.InvalidTokenError:
+            return None
+        row = self._connection().execute(
+            "SELECT token_version FROM users WHERE username = ?", (claims["sub"],)
+        ).fetchone()
+        if row is None or row[0] != claims.get("ver"):
+            return None
+        return claims["sub"]
+
+    def revoke_tokens(self, username):
+        """Invalidates every session token issued to a user so far."""
+        conn = self._connection()
+        with conn:
+            conn.execute("UPDATE users SET token_version = token_version + 1 WHERE username = ?", (username,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store():
+    """Returns the process-wide user store, opening it on first use."""
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = UserStore()
+        return _store
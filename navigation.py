@@ -1,21 +1,167 @@
+import threading
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta
+
 import streamlit as st
-from time import sleep
 from streamlit.runtime.scriptrunner import get_script_run_ctx
-from streamlit.source_util import get_pages
 
+from duckdal.instrumentation import traced
 
-def get_current_page_name():
+PageEntry = namedtuple("PageEntry", ["name", "script_path", "requires_login"])
+
+# Access policy: pages anyone may open. Every other page requires login.
+PUBLIC_PAGES = frozenset({"streamlit_app"})
+# What Streamlit runs for a page hash it does not know
+DEFAULT_PAGE = PageEntry("streamlit_app", "streamlit_app.py", False)
+
+_registry = None
+_registry_lock = threading.Lock()
+# None until tried; False where Streamlit offers no page-change callback
+_watching_pages = None
+
+_redirects = Counter()
+_redirects_lock = threading.Lock()
+
+
+def build_page_registry(pages):
+    """Returns {page script hash: PageEntry} for Streamlit's page table."""
+    return {
+        page_hash: PageEntry(info["page_name"], info["script_path"], info["page_name"] not in PUBLIC_PAGES)
+        for page_hash, info in pages.items()
+    }
+
+
+def invalidate_page_registry(_sender=None):
+    """Drops the cached registry; the next lookup rebuilds it. Runs when the pages directory changes."""
+    global _registry
+
+    with _registry_lock:
+        _registry = None
+
+
+def _watch_pages(ctx):
+    """Subscribes invalidate_page_registry to page-set changes; returns False if this Streamlit cannot.
+
+    register_pages_changed_callback is internal Streamlit API (present in 1.40), so it is looked up, not assumed.
+    """
+    register = getattr(ctx.pages_manager, "register_pages_changed_callback", None)
+    if register is None:
+        return False
+    register(invalidate_page_registry)
+    return True
+
+
+def get_page_registry(ctx):
+    """Returns the process-wide page registry, building it on first use.
+
+    Without a page-change callback a cached registry could go stale, so it
+    is then rebuilt on every call instead.
+    """
+    global _registry, _watching_pages
+
+    registry = _registry
+    if registry is None:
+        with _registry_lock:
+            if _watching_pages is None:
+                _watching_pages = _watch_pages(ctx)
+            if not _watching_pages:
+                return build_page_registry(ctx.pages_manager.get_pages())
+            if _registry is None:
+                _registry = build_page_registry(ctx.pages_manager.get_pages())
+            registry = _registry
+    return registry
+
+
+def get_current_page():
     ctx = get_script_run_ctx()
     if ctx is None:
         raise RuntimeError("Couldn't get script context")
 
-    pages = get_pages("")
+    page = get_page_registry(ctx).get(ctx.page_script_hash)
+    if page is None:
+        # A page the registry has not seen yet; pick up the new page table once.
+        invalidate_page_registry()
+        # A hash that is still unknown is stale, and Streamlit runs the default page for it
+        page = get_page_registry(ctx).get(ctx.page_script_hash, DEFAULT_PAGE)
+    return page
 
-    return pages[ctx.page_script_hash]["page_name"]
 
+def get_current_page_name():
+    return get_current_page().name
 
+
+def record_redirect(reason, page_name):
+    with _redirects_lock:
+        _redirects[reason, page_name] += 1
+
+
+def redirect_metrics():
+    """Returns {(reason, page name): count} of the redirects made by this process."""
+    with _redirects_lock:
+        return dict(_redirects)
+
+
+def flash(message, icon=None):
+    """Queues a toast for the next page this session renders, so redirects never wait to show it."""
+    st.session_state.flash = {"body": message, "icon": icon}
+
+
+def show_flash():
+    message = st.session_state.pop("flash", None)
+    if message:
+        st.toast(**message)
+
+
+def restore_session():
+    """Logs a returning visitor in from their session cookie, without checking a password."""
+    if st.session_state.get("logged_in", False) or st.session_state.get("session_checked", False):
+        return
+    st.session_state.session_checked = True
+    from duckdal.users import SESSION_COOKIE, get_user_store
+
+    token = st.context.cookies.get(SESSION_COOKIE)
+    username = get_user_store().verify_token(token) if token else None
+    if username:
+        st.session_state.logged_in = True
+        st.session_state.username = username
+
+
+def write_session_cookie():
+    """Sends a session cookie change queued by login() or logout() to the browser."""
+    change = st.session_state.pop("session_cookie", None)
+    if change is None:
+        return
+    import extra_streamlit_components as stx
+    from duckdal.users import SESSION_COOKIE
+
+    token, max_age = change
+    cookies = stx.CookieManager(key="session_cookie_manager")
+    if max_age:
+        cookies.set(
+            SESSION_COOKIE, token, key="session_cookie", max_age=max_age,
+            expires_at=datetime.now() + timedelta(seconds=max_age),
+        )
+    else:
+        # An expiry in the past deletes the cookie
+        cookies.set(SESSION_COOKIE, "", key="session_cookie", expires_at=datetime(1970, 1, 1))
+
+
+def login(username, token):
+    """Marks the session as logged in and queues its session cookie; the caller redirects."""
+    from duckdal.users import SESSION_TTL_SECONDS
+
+    st.session_state.logged_in = True
+    st.session_state.username = username
+    st.session_state.session_cookie = (token, SESSION_TTL_SECONDS)
+    flash("Logged in successfully!", icon="✅")
+
+
+@traced()
 def make_sidebar():
+    restore_session()
+    show_flash()
     with st.sidebar:
+        write_session_cookie()
         st.title("🦆 DuckDal")
         st.write("")
         st.write("")
@@ -23,6 +169,7 @@ def make_sidebar():
         if st.session_state.get("logged_in", False):
             st.page_link("pages/page1.py", label="내 배송정보 조회", icon="📦")
             st.page_link("pages/page2.py", label="배송하고 싶어요", icon="🚚")
+            st.page_link("pages/page3.py", label="운항 현황", icon="🗺️")
             st.write("")
             st.write("")
             st.write("")
@@ -30,14 +177,23 @@ def make_sidebar():
             if st.button("Log out"):
                 logout()
 
-        elif get_current_page_name() != "streamlit_app":
-            # If anyone tries to access a secret page without being logged in,
-            # redirect them to the login page
-            st.switch_page("streamlit_app.py")
+        else:
+            page = get_current_page()
+            if page.requires_login:
+                # If anyone tries to access a secret page without being logged in,
+                # redirect them to the login page
+                record_redirect("login_required", page.name)
+                st.switch_page("streamlit_app.py")
 
 
 def logout():
+    from duckdal.users import get_user_store
+
+    if st.session_state.get("username"):
+        get_user_store().revoke_tokens(st.session_state.username)
     st.session_state.logged_in = False
-    st.info("Logged out successfully!")
-    sleep(0.5)
+    # Revoking signs the user out of every browser, not only this one
+    st.session_state.session_cookie = ("", 0)
+    flash("Logged out successfully!", icon="👋")
+    record_redirect("logout", get_current_page_name())
     st.switch_page("streamlit_app.py")
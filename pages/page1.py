@@ -1,69 +1,47 @@
 import streamlit as st
-from datetime import datetime, timedelta
-import base64
-import os
-import pandas as pd
-import qrcode
-from io import BytesIO
+from datetime import timedelta
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from navigation import make_sidebar
-import pytz  # For timezone handling
+from duckdal.asset_cache import load_image_as_data_uri
+from duckdal.instrumentation import profile_overlay, traced
+from duckdal.common import ORDER_STATUSES, get_current_kst
+from duckdal.order_cache import FINAL_STATUSES, SessionOrderCache, forget_departures, get_departure_time, get_tracking_details
+from duckdal.order_store import get_order_repository
+from duckdal.qr_codes import generate_qr_code
+from duckdal.scheduler import get_scheduler_service
+from duckdal.stations import get_station_registry
+from duckdal.status_updates import REFRESH_SECONDS, get_status_bus
+from duckdal.telemetry import get_telemetry_service
+from duckdal.theme import apply_theme, status_badge
 
 # 페이지 설정
 st.set_page_config(page_title="배송 현황", page_icon=":truck:", layout="wide")
 
-# Define the KST timezone globally
-KST = pytz.timezone("Asia/Seoul")
-
-def load_image_as_data_uri(image_path):
-    """Converts an SVG image to a Data URI."""
-    try:
-        if not os.path.exists(image_path):
-            st.error(f"이미지를 찾을 수 없습니다: {image_path}")
-            return ""
-        
-        with open(image_path, "rb") as img_file:
-            encoded = base64.b64encode(img_file.read()).decode()
-            return f"data:image/svg+xml;base64,{encoded}"
-    except Exception as e:
-        st.error(f"이미지 로딩 중 오류 발생: {image_path}, 오류: {e}")
-        return ""
-
-def get_status_color(status):
-    """Returns color based on order status."""
-    status_colors = {
-        "배달 완료": "#28a745",  # Green
-        "배송중": "#ffc107",     # Yellow
-        "취소됨": "#dc3545"      # Red
-    }
-    return status_colors.get(status, "#6c757d")  # Default Gray
-
-def generate_qr_code(data):
-    """Generates a QR code image from the given data and returns it as a Data URI."""
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-
-    buffered = BytesIO()
-    img.save(buffered, format="PNG")
-    img_str = base64.b64encode(buffered.getvalue()).decode()
-    return f"data:image/png;base64,{img_str}"
-
-
+DEMO_USER_ID = "test"
+CARD_PAGE_SIZE = 20
+TABLE_PAGE_SIZE = 500
+# Above this many matching orders the page opens in table view
+TABLE_VIEW_THRESHOLD = 100
+SEARCH_RESULT_LIMIT = 20
+# Telemetry points drawn as a drone's recent path: five minutes at 1 Hz
+DRONE_TRACK_POINTS = 300
+PICKUP_STATUS_LABELS = {
+    "pending": "배정 대기",
+    "scheduled": "배정 완료",
+    "rejected": "배정 불가 (무게 초과)",
+}
 
 @st.dialog("배송 상세 정보", width="large")
+@traced()
 def show_tracking_details(order):
     """Displays the detailed delivery information in a modal dialog."""
+    import pandas as pd  # Imported lazily; only the dialog and table need it
+
     st.markdown(f"### {order['company']} - {order['id']}")
     st.write(f"**운송장 번호:** {order['tracking_number']}")
     st.markdown("---")
     st.markdown("#### 배송 추적")
-    tracking_df = pd.DataFrame(order['tracking_details'])
+    tracking_df = pd.DataFrame(get_tracking_details(get_order_repository(), order))
     st.table(tracking_df)
     
     # If delivery is completed, add QR code and map
@@ -71,22 +49,22 @@ def show_tracking_details(order):
         st.markdown("---")
         st.markdown("#### 배송 확인 QR 코드")
         qr_data =order['qr_number']
-        qr_data_uri = generate_qr_code(qr_data)
+        qr_data_uri = generate_qr_code(qr_data, fmt="svg")
         st.markdown(f"<img src='{qr_data_uri}' width='200' alt='QR Code'>", unsafe_allow_html=True)
         
         st.markdown("---")
         st.markdown("#### 스테이션 위치 지도")
         
-        # Station location coordinates (Latitude: 37.3840662, Longitude: 126.6574478)
-        station_lat = 37.3840662
-        station_lon = 126.6574478
+        registry = get_station_registry()
+        if order.get('dest_lat') is not None:
+            station, _ = registry.nearest(order['dest_lat'], order['dest_lon'])[0]
+            points = [(station.lat, station.lon, station.name), (order['dest_lat'], order['dest_lon'], '배송지')]
+        else:
+            station = registry.stations[0]
+            points = [(station.lat, station.lon, station.name)]
         
         # Prepare data for the map
-        map_data = pd.DataFrame({
-            'lat': [station_lat],
-            'lon': [station_lon],
-            'label': ['스테이션 위치']
-        })
+        map_data = pd.DataFrame(points, columns=['lat', 'lon', 'label'])
         
         st.map(map_data)
         
@@ -94,168 +72,453 @@ def show_tracking_details(order):
         #st.subheader("지도에 표시된 위치")
         #st.table(map_data)
 
-def get_current_kst():
-    """Returns the current Korean Standard Time (KST)."""
-    return datetime.now(KST)
-
-def update_tracking_dates(tracking_details, base_date):
-    """
-    Updates the 'date' field in tracking_details to be base_date + original_time, localized to KST.
-
-    :param tracking_details: List of dicts, each dict is a tracking detail
-    :param base_date: datetime.date object, the base date to add
-    :return: Updated tracking_details list
-    """
-    updated_details = []
-    for detail in tracking_details:
-        # Parse the original time
-        try:
-            original_datetime = datetime.strptime(detail['date'], "%Y-%m-%d %H:%M")
-            original_time = original_datetime.time()
-        except ValueError:
-            st.error(f"잘못된 날짜 형식: {detail['date']}")
-            original_time = datetime.now(KST).time()
-        
-        # Combine base_date + original_time
-        new_datetime = datetime.combine(base_date, original_time)
-        # Localize to KST
-        new_datetime = KST.localize(new_datetime)
-        # Format back to string
-        detail['date'] = new_datetime.strftime("%Y-%m-%d %H:%M")
-        updated_details.append(detail)
-    return updated_details
+@st.dialog("드론 위치", width="large")
+@traced()
+def show_drone_position(request):
+    """Shows the latest telemetry of the drone assigned to a pickup request and its recent path."""
+    import pandas as pd
 
-def user_page():
-    # Custom CSS styling
-    st.markdown("""
-    <style>
-    [data-testid="stAppViewContainer"] {
-        background-color: #f4f6f9;
-    }
-    .order-card {
-        background-color: white;
-        border-radius: 15px;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        padding: 20px;
-        margin-bottom: 20px;
-        transition: transform 0.3s ease;
-    }
-    .order-card:hover {
-        transform: scale(1.02);
-    }
-    .status-badge {
-        display: inline-block;
-        padding: 5px 10px;
-        border-radius: 20px;
-        font-weight: bold;
-        font-size: 14px;
-        color: white;
-    }
-    .tracking-btn {
-        display: inline-block;
-        background-color: #007bff !important;
-        color: white !important;
-        padding: 8px 16px;
-        text-decoration: none;
-        border-radius: 20px !important;
-        transition: all 0.3s ease !important;
-        margin-top: 10px;
-        cursor: pointer;
-    }
-    .tracking-btn:hover {
-        background-color: #0056b3 !important;
-        transform: translateY(-2px);
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(f"### {request['drone_id']} - {request['id']}")
+    telemetry = get_telemetry_service()
+    point = telemetry.store.latest(request["drone_id"]) if telemetry else None
+    if point is None:
+        st.info("이 드론의 위치 정보가 아직 수신되지 않았습니다.")
+        return
+    battery_col, altitude_col, age_col = st.columns(3)
+    battery_col.metric("배터리", f"{point.battery:.0f}%")
+    altitude_col.metric("고도", f"{point.altitude:.0f} m")
+    age_col.metric("마지막 수신", f"{max(0.0, get_current_kst().timestamp() - point.time):.0f}초 전")
+    track = telemetry.store.track(request["drone_id"], DRONE_TRACK_POINTS)
+    st.map(pd.DataFrame({"lat": track["lat"], "lon": track["lon"]}))
 
-    # Welcome message header
-    st.markdown("""
-    <div style="background-color: #007bff; color: white; padding: 20px; border-radius: 10px; margin-bottom: 20px;">
-        <h1 style="margin-bottom: 10px;">안녕하세요, Induck님!</h1>
-        <p style="opacity: 0.8;">현재 진행 중인 드론 배송 현황을 확인하세요.</p>
-    </div>
-    """, unsafe_allow_html=True)
+def seed_demo_orders(repository, user_id):
+    """Stores the sample orders for the demo account."""
+    import pandas as pd
+    from duckdal.tracking_timeline import format_tracking_dates, normalize_tracking_timeline
 
     # Add 2 days to the current KST date
     current_kst = get_current_kst()
     base_date = (current_kst + timedelta(days=2)).date()
 
     # Sample order data
-    orders_data = [
+    demo_orders = [
         {
             "id": "ORD-001",
             "company": "Coupang",
-            "logo": load_image_as_data_uri("assets/coupang.svg"),
+            "logo": "assets/coupang.svg",
             "status": "배송중",
             "estimated_delivery": (current_kst + timedelta(days=2)).strftime('%Y-%m-%d'),
             "items": ["나이키 양말"],
             "tracking_number": "1Z999AA10123456784",
             "qr_number":9,
-            "tracking_details": update_tracking_dates([
+            "dest_lat": 37.3925,
+            "dest_lon": 126.6398,
+            "tracking_details": [
                 {"date": "2024-11-18 09:30", "location": "서울 물류센터", "status": "상품 접수"},
                 {"date": "2024-03-17 13:45", "location": "인천 드론 배송", "status": "출고 준비"},
                 {"date": "2024-03-17 14:01", "location": "인천 송도 제1 스테이션", "status": "배송 중"}
-            ], base_date)
+            ]
         },
         {
             "id": "ORD-002",
             "company": "당근마켓",
-            "logo": load_image_as_data_uri("assets/dang.svg"),
+            "logo": "assets/dang.svg",
             "status": "배달 완료",
             "estimated_delivery": (current_kst - timedelta(days=1)).strftime('%Y-%m-%d'),
             "items": ["F-35 피규어"],
             "tracking_number": "1Z999AA10123456783",
             "qr_number":9,
-            "tracking_details": update_tracking_dates([
+            "dest_lat": 37.4530,
+            "dest_lon": 126.6520,
+            "tracking_details": [
                 {"date": "2024-03-14 11:20", "location": "용현동 판매자", "status": "상품 발송"},
                 {"date": "2024-03-15 09:45", "location": "인천 드론 배송", "status": "배송 중"},
                 {"date": "2024-03-16 14:30", "location": "인천 송도 제1 스테이션", "status": "배달 완료"}
-            ], base_date)
+            ]
         },
         {
             "id": "ORD-003",
             "company": "Coupang",
-            "logo": load_image_as_data_uri("assets/coupang.svg"),
+            "logo": "assets/coupang.svg",
             "status": "취소됨",
             "estimated_delivery": current_kst.strftime('%Y-%m-%d'),
             "items": ["노트북 파우치"],
             "tracking_number": "1Z999AA10123456786",
             "qr_number":9,
-            "tracking_details": update_tracking_dates([
+            "dest_lat": 37.3800,
+            "dest_lon": 126.6560,
+            "tracking_details": [
                 {"date": "2024-03-15 10:00", "location": "주문 취소", "status": "고객 요청 취소"}
-            ], base_date)
+            ]
         }
     ]
 
-    # Display each order
-    for order in orders_data:
-        st.markdown("---")
-        with st.container():
-            col1, col2 = st.columns([1, 4])
-            with col1:
-                if order["logo"]:
-                    # Embed SVG image as HTML
-                    st.markdown(f"<img src='{order['logo']}' width='100' alt='{order['company']} 로고'>", unsafe_allow_html=True)
-            with col2:
-                st.markdown(f"### {order['company']} - {order['id']}")
-                st.write(f"**상품:** {', '.join(order['items'])}")
-                st.write(f"**물류 스테이션 번호:** {order['tracking_number']}")
-                status_color = get_status_color(order['status'])
-                st.markdown(f"<span class='status-badge' style='background-color: {status_color};'>{order['status']}</span>", unsafe_allow_html=True)
-                if order['status'] in ["배송중", "배달 완료"]:
-                    st.write(f"**예상 배송일:** {order['estimated_delivery']}")
-                if order['status'] != "취소됨":
-                    if st.button("상세 추적", key=f"tracking_btn_{order['id']}"):
-                        show_tracking_details(order)
+    # Rebase every timeline onto base_date in one vectorized pass
+    timeline = pd.DataFrame(
+        [dict(detail, order_index=i) for i, order in enumerate(demo_orders) for detail in order["tracking_details"]]
+    )
+    normalized, invalid = normalize_tracking_timeline(timeline, base_date)
+    if invalid.any():
+        st.error(f"잘못된 날짜 형식: {', '.join(timeline.loc[invalid, 'date'].astype(str))}")
+    for i, details in format_tracking_dates(normalized).groupby("order_index"):
+        demo_orders[i]["tracking_details"] = details.drop(columns="order_index").to_dict("records")
+
+    for order in demo_orders:
+        order["user_id"] = user_id
+    repository.add_orders(demo_orders)
+
+def get_order_cache():
+    """Returns this session's order query cache."""
+    if "order_cache" not in st.session_state:
+        st.session_state.order_cache = SessionOrderCache()
+    return st.session_state.order_cache
+
+def refresh_changed_orders(user_id):
+    """Drops the session's cached orders once a tracking event arrived for one of them.
+
+    Every consumer of status updates goes through here, so the cached
+    counts and status-filtered lists are reloaded with every change.
+    Returns the ids of the changed orders.
+    """
+    changed = {update.order_id for update in get_status_subscription().drain()}
+    if changed:
+        get_order_cache().invalidate(("user", user_id))
+        forget_departures(changed)
+    return changed
+
+def count_orders(repository, user_id, statuses):
+    """Returns the number of the user's orders in the filter, cached for the session."""
+    return get_order_cache().get(
+        ("count", user_id, None if statuses is None else tuple(statuses)),
+        lambda: repository.count_orders(user_id, statuses),
+        tags=[("user", user_id)],
+    )
+
+def get_order_list(repository, user_id, statuses, page_size):
+    """Returns the orders loaded so far in this session for the current filter.
+
+    The first page is fetched when the filter or view changes; later pages are
+    appended by load_more_orders, so reruns never re-query loaded orders. When
+    the cached list expires or is invalidated, it is reloaded with as many
+    orders as were shown before, in one query.
+    """
+    key = (user_id, tuple(statuses), page_size)
+    previous = st.session_state.get("order_list")
+    shown = len(previous["orders"]) if previous and previous["key"] == key else 0
+
+    def load():
+        order_list = {
+            "key": key,
+            "orders": [],
+            "cursor": None,
+            "has_more": True,
+        }
+        load_more_orders(repository, order_list, max(page_size, shown))
+        return order_list
+
+    order_list = get_order_cache().get(("orders",) + key, load, tags=[("user", user_id)])
+    st.session_state.order_list = order_list
+    return order_list
+
+def load_more_orders(repository, order_list, count=None):
+    """Appends the next count orders (a page by default) after the list's cursor."""
+    user_id, statuses, page_size = order_list["key"]
+    count = count or page_size
+    # Fetch one extra row to learn whether another page exists
+    orders = repository.list_orders(user_id, count + 1, after=order_list["cursor"], statuses=statuses)
+    order_list["has_more"] = len(orders) > count
+    orders = orders[:count]
+    if orders:
+        order_list["orders"].extend(orders)
+        order_list["cursor"] = orders[-1]["id"]
+
+def open_selected_order():
+    """Remembers the order picked in the table so its dialog opens once."""
+    rows = st.session_state.order_table.selection.rows
+    if rows:
+        st.session_state.selected_order = st.session_state.order_list["orders"][rows[0]]
+
+def estimate_delivery_times(repository, orders):
+    """Returns {order id: estimated arrival} for the in-flight orders, computed in one batch.
+
+    Each drone is timed from its take-off, the order's first "배송 중" tracking
+    event, so the estimate stays put across reruns; orders without one are
+    timed as if they left now.
+    """
+    active = [order for order in orders if order["status"] == "배송중" and order["dest_lat"] is not None]
+    if not active:
+        return {}
+    import numpy as np
+    from duckdal.eta import get_eta_engine
+
+    dest_lats = np.array([order["dest_lat"] for order in active])
+    dest_lons = np.array([order["dest_lon"] for order in active])
+    # Each order flies from the station closest to its destination.
+    registry = get_station_registry()
+    nearest, _ = registry.nearest_many(dest_lats, dest_lons)
+    station_lats = np.array([station.lat for station in registry.stations])[nearest]
+    station_lons = np.array([station.lon for station in registry.stations])[nearest]
+    now = get_current_kst().replace(tzinfo=None)
+    departures = [get_departure_time(repository, order) or now for order in active]
+    arrivals = get_eta_engine().estimate_arrivals(departures, station_lats, station_lons, dest_lats, dest_lons)
+    labels = np.char.replace(np.datetime_as_string(arrivals, unit="m"), "T", " ")
+    return {order["id"]: label for order, label in zip(active, labels.tolist())}
+
+def render_order_table(orders, etas):
+    """Renders orders as a single dataframe element."""
+    import pandas as pd
+
+    table = pd.DataFrame(
+        {
+            "주문 번호": [order["id"] for order in orders],
+            "업체": [order["company"] for order in orders],
+            "상품": [", ".join(order["items"]) for order in orders],
+            "물류 스테이션 번호": [order["tracking_number"] for order in orders],
+            "상태": [order["status"] for order in orders],
+            "예상 배송일": [etas.get(order["id"], order["estimated_delivery"]) for order in orders],
+        }
+    )
+    st.dataframe(
+        table,
+        key="order_table",
+        hide_index=True,
+        use_container_width=True,
+        on_select=open_selected_order,
+        selection_mode="single-row",
+    )
+    order = st.session_state.pop("selected_order", None)
+    if order and order["status"] != "취소됨":
+        show_tracking_details(order)
+
+def get_status_subscription():
+    """Returns this session's subscription to order status updates."""
+    if "status_subscription" not in st.session_state:
+        st.session_state.status_subscription = get_status_bus().subscribe()
+    return st.session_state.status_subscription
+
+def watch_orders(orders):
+    """Subscribes to the orders that can still change; returns True if there are any."""
+    live = [order["id"] for order in orders if order["status"] not in FINAL_STATUSES]
+    get_status_subscription().watch(live)
+    st.session_state.live_orders = set(live)
+    return bool(live)
+
+def rerun_fragments(fragment_ids):
+    """Reruns only the given fragments of this session, or the whole page where Streamlit cannot.
+
+    Streamlit has no public call for rerunning fragments other than the
+    current one; this queues the same request its own fragment timers make.
+    """
+    try:
+        from streamlit.runtime.scriptrunner import RerunData
+    except ImportError:
+        st.rerun()
+    ctx = get_script_run_ctx()
+    ctx.script_requests.request_rerun(
+        RerunData(
+            query_string=ctx.query_string,
+            page_script_hash=ctx.page_script_hash,
+            fragment_id_queue=list(fragment_ids),
+            is_fragment_scoped_rerun=True,
+        )
+    )
+    # A yield point, where the runner switches to the requested run
+    st.empty()
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def watch_status_updates(user_id):
+    """The page's only timer: re-renders the cards of the shown orders whose status changed.
+
+    Idle sessions pay for one empty fragment run per interval, however many
+    cards are loaded, and the page is left alone unless an order it shows
+    changed. Then only those cards rerun; the table view reruns the page.
+    """
+    if st.session_state.pop("skip_status_check", False):
+        # Part of a full run, which has just taken the updates itself
+        return
+    changed = refresh_changed_orders(user_id) & st.session_state.get("live_orders", set())
+    if not changed:
+        return
+    cards = st.session_state.get("order_card_fragments", {})
+    if not changed <= cards.keys():
+        st.rerun()
+    repository = get_order_repository()
+    orders = [order for order in map(repository.get_order, changed) if order]
+    etas = estimate_delivery_times(repository, orders)
+    for order in orders:
+        st.session_state.refreshed_orders[order["id"]] = (order, etas.get(order["id"]))
+    rerun_fragments(cards[order_id] for order_id in changed)
+
+@st.fragment
+@traced()
+def render_order_card(order, eta):
+    """Renders one order as a card with a tracking button; its button reruns only the card.
+
+    A status update reruns the card alone with the order as refreshed by
+    watch_status_updates.
+    """
+    st.session_state.order_card_fragments[order["id"]] = get_script_run_ctx().current_fragment_id
+    order, eta = st.session_state.refreshed_orders.get(order["id"], (order, eta))
+    if order["status"] != "배송중":
+        eta = None
+    st.markdown("---")
+    with st.container():
+        col1, col2 = st.columns([1, 4])
+        with col1:
+            logo = load_image_as_data_uri(order["logo"]) if order["logo"] else ""
+            if logo:
+                # Embed SVG image as HTML
+                st.markdown(f"<img src='{logo}' width='100' alt='{order['company']} 로고'>", unsafe_allow_html=True)
+        with col2:
+            st.markdown(f"### {order['company']} - {order['id']}")
+            st.write(f"**상품:** {', '.join(order['items'])}")
+            st.write(f"**물류 스테이션 번호:** {order['tracking_number']}")
+            st.markdown(status_badge(order['status']), unsafe_allow_html=True)
+            if order['status'] in ["배송중", "배달 완료"]:
+                st.write(f"**예상 배송일:** {eta or order['estimated_delivery']}")
+            if order['status'] != "취소됨":
+                if st.button("상세 추적", key=f"tracking_btn_{order['id']}"):
+                    show_tracking_details(order)
+
+def open_selected_pickup():
+    """Remembers the pickup picked in the schedule so its drone dialog opens once."""
+    rows = st.session_state.pickup_table.selection.rows
+    if rows:
+        st.session_state.selected_pickup = st.session_state.pickup_requests[rows[0]]
+
+def render_pickup_schedule(user_id):
+    """Shows the drone and time slot assigned to each of the user's delivery requests.
+
+    Selecting a row with an assigned drone opens its live position.
+    """
+    pickup_requests = get_scheduler_service().requests_for_user(user_id)
+    if not pickup_requests:
+        return
+    st.session_state.pickup_requests = pickup_requests
+    st.markdown("---")
+    st.markdown("#### 드론 픽업 일정")
+    st.dataframe(
+        [
+            {
+                "요청 번호": request["id"],
+                "수신인": request["recipient_name"],
+                "요청 픽업 시간": f"{request['pickup_date']} {request['pickup_time']}",
+                "상태": PICKUP_STATUS_LABELS.get(request["status"], request["status"]),
+                "드론": request["drone_id"] or "",
+                "스테이션": request["station_id"] or "",
+                "배정 시간": request["slot_start"].replace("T", " ") if request["slot_start"] else "",
+            }
+            for request in pickup_requests
+        ],
+        key="pickup_table",
+        hide_index=True,
+        use_container_width=True,
+        on_select=open_selected_pickup,
+        selection_mode="single-row",
+    )
+    request = st.session_state.pop("selected_pickup", None)
+    if request and request["drone_id"]:
+        show_drone_position(request)
+
+@traced()
+def user_page():
+    apply_theme()
+
+    # Welcome message header
+    st.markdown("""
+    <div class="page-header tracking">
+        <h1>안녕하세요, Induck님!</h1>
+        <p>현재 진행 중인 드론 배송 현황을 확인하세요.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    repository = get_order_repository()
+    user_id = st.session_state.get("username", DEMO_USER_ID)
+    if user_id == DEMO_USER_ID and count_orders(repository, user_id, None) == 0:
+        seed_demo_orders(repository, user_id)
+        get_order_cache().invalidate(("user", user_id))
+    refresh_changed_orders(user_id)
+    # Filled in again by this run's cards, which show the orders as loaded now
+    st.session_state.order_card_fragments = {}
+    st.session_state.refreshed_orders = {}
+
+    repository.warm_search_index()
+    query = st.text_input(
+        "주문 찾기", key="order_search", placeholder="운송장 번호 또는 주문 번호 (앞부분만 입력해도 됩니다)"
+    )
+    # Filters are applied in the query, before anything is rendered
+    filter_col, view_col = st.columns([3, 1])
+    with filter_col:
+        statuses = st.multiselect("배송 상태", ORDER_STATUSES, default=ORDER_STATUSES)
+    total_orders = count_orders(repository, user_id, statuses)
+    with view_col:
+        view_mode = st.radio(
+            "보기",
+            ["카드", "표"],
+            index=1 if total_orders > TABLE_VIEW_THRESHOLD else 0,
+            horizontal=True,
+        )
+
+    if query.strip():
+        orders = render_search_results(repository, user_id, query, statuses)
+    else:
+        orders = render_order_list(repository, user_id, statuses, view_mode, total_orders)
+    if watch_orders(orders):
+        st.session_state.skip_status_check = True
+        watch_status_updates(user_id)
+
+    render_pickup_schedule(user_id)
 
     # Footer
     st.markdown("""
-    <div style="text-align: center; margin-top: 20px; color: #6c757d;">
+    <div class="page-footer">
         © 2024 배송 추적 서비스 | 고객 지원: 1234-5678
     </div>
     """, unsafe_allow_html=True)
 
+@traced()
+def render_search_results(repository, user_id, query, statuses):
+    """Shows the user's orders in the status filter whose tracking number or order id starts with the query.
+
+    Returns the orders shown.
+    """
+    orders = repository.search_orders(user_id, query, limit=SEARCH_RESULT_LIMIT, statuses=statuses)
+    if not orders:
+        st.info("일치하는 주문이 없습니다.")
+        return orders
+    if len(orders) == SEARCH_RESULT_LIMIT:
+        st.caption(f"검색 결과 중 처음 {SEARCH_RESULT_LIMIT}건")
+    else:
+        st.caption(f"검색 결과 {len(orders)}건")
+    etas = estimate_delivery_times(repository, orders)
+    for order in orders:
+        render_order_card(order, etas.get(order["id"]))
+    return orders
+
+def render_order_list(repository, user_id, statuses, view_mode, total_orders):
+    """Shows the user's orders in the status filter, a page at a time; returns the orders shown."""
+    page_size = TABLE_PAGE_SIZE if view_mode == "표" else CARD_PAGE_SIZE
+    order_list = get_order_list(repository, user_id, statuses, page_size)
+    orders_data = order_list["orders"]
+    st.caption(f"총 {total_orders}건 중 {len(orders_data)}건 표시")
+    etas = estimate_delivery_times(repository, orders_data)
+
+    if view_mode == "표":
+        render_order_table(orders_data, etas)
+    else:
+        for order in orders_data:
+            render_order_card(order, etas.get(order["id"]))
+
+    if order_list["has_more"]:
+        st.button(
+            "더 보기",
+            key="load_more_orders",
+            on_click=load_more_orders,
+            args=(repository, order_list),
+        )
+    return orders_data
+
 # Sidebar and page rendering
 make_sidebar()
 user_page()
+profile_overlay()
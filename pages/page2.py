@@ -1,181 +1,52 @@
 import streamlit as st
-from datetime import datetime, timedelta
-import base64
-import os
-import pandas as pd
-import qrcode
-from io import BytesIO
+from datetime import datetime
 from navigation import make_sidebar
-import pytz  # For timezone handling
+from duckdal.delivery_requests import get_delivery_request_writer
+from duckdal.geocoder import get_geocoder
+from duckdal.instrumentation import profile_overlay, traced
+from duckdal.scheduler import get_scheduler_service
+from duckdal.stations import get_station_registry
+from duckdal.theme import apply_theme
 
 # 페이지 설정
 st.set_page_config(page_title="배송하고 싶어요", page_icon=":package:", layout="wide")
 
-# Define the KST timezone globally
-KST = pytz.timezone("Asia/Seoul")
+LOCATION_PRECISION_LABELS = {"address": "주소", "street": "도로/동", "district": "시군구"}
 
-def load_image_as_data_uri(image_path):
-    """Converts an SVG image to a Data URI."""
-    try:
-        if not os.path.exists(image_path):
-            st.error(f"이미지를 찾을 수 없습니다: {image_path}")
-            return ""
-        
-        with open(image_path, "rb") as img_file:
-            encoded = base64.b64encode(img_file.read()).decode()
-            return f"data:image/svg+xml;base64,{encoded}"
-    except Exception as e:
-        st.error(f"이미지 로딩 중 오류 발생: {image_path}, 오류: {e}")
-        return ""
-
-def get_status_color(status):
-    """Returns color based on order status."""
-    status_colors = {
-        "배달 완료": "#28a745",  # Green
-        "배송중": "#ffc107",     # Yellow
-        "취소됨": "#dc3545"      # Red
-    }
-    return status_colors.get(status, "#6c757d")  # Default Gray
-
-def generate_qr_code(data):
-    """Generates a QR code image from the given data and returns it as a Data URI."""
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-
-    buffered = BytesIO()
-    img.save(buffered, format="PNG")
-    img_str = base64.b64encode(buffered.getvalue()).decode()
-    return f"data:image/png;base64,{img_str}"
-
-@st.dialog("배송 상세 정보", width="large")
-def show_tracking_details(order):
-    """Displays the detailed delivery information in a modal dialog."""
-    st.markdown(f"### {order['company']} - {order['id']}")
-    st.write(f"**운송장 번호:** {order['tracking_number']}")
-    st.markdown("---")
-    st.markdown("#### 배송 추적")
-    tracking_df = pd.DataFrame(order['tracking_details'])
-    st.table(tracking_df)
-    
-    # If delivery is completed, add QR code and map
-    if order['status'] == "배달 완료":
-        st.markdown("---")
-        st.markdown("#### 배송 확인 QR 코드")
-        qr_data = f"물류 스테이션 번호: {order['tracking_number']}"
-        qr_data_uri = generate_qr_code(qr_data)
-        st.markdown(f"<img src='{qr_data_uri}' width='200' alt='QR Code'>", unsafe_allow_html=True)
-        
-        st.markdown("---")
-        st.markdown("#### 스테이션 위치 지도")
-        
-        # Station location coordinates (Latitude: 37.3840662, Longitude: 126.6574478)
-        station_lat = 37.3840662
-        station_lon = 126.6574478
-        
-        # Prepare data for the map
-        map_data = pd.DataFrame({
-            'lat': [station_lat],
-            'lon': [station_lon],
-            'label': ['스테이션 위치']
-        })
-        
-        st.map(map_data)
-        
-        # Optionally, display the data in a table
-        st.subheader("지도에 표시된 위치")
-        st.table(map_data)
-
-def get_current_kst():
-    """Returns the current Korean Standard Time (KST)."""
-    return datetime.now(KST)
-
-def update_tracking_dates(tracking_details, base_date):
-    """
-    Updates the 'date' field in tracking_details to be base_date + original_time, localized to KST.
-
-    :param tracking_details: List of dicts, each dict is a tracking detail
-    :param base_date: datetime.date object, the base date to add
-    :return: Updated tracking_details list
-    """
-    updated_details = []
-    for detail in tracking_details:
-        # Parse the original time
-        try:
-            original_datetime = datetime.strptime(detail['date'], "%Y-%m-%d %H:%M")
-            original_time = original_datetime.time()
-        except ValueError:
-            st.error(f"잘못된 날짜 형식: {detail['date']}")
-            original_time = datetime.now(KST).time()
-        
-        # Combine base_date + original_time
-        new_datetime = datetime.combine(base_date, original_time)
-        # Localize to KST
-        new_datetime = KST.localize(new_datetime)
-        # Format back to string
-        detail['date'] = new_datetime.strftime("%Y-%m-%d %H:%M")
-        updated_details.append(detail)
-    return updated_details
+def describe_location(location):
+    """Formats a geocoding result for the submitted request summary."""
+    if location is None:
+        return "위치를 찾을 수 없음"
+    return f"{location.lat:.5f}, {location.lon:.5f} ({LOCATION_PRECISION_LABELS[location.precision]} 단위)"
 
+@traced()
 def delivery_request_page():
     """Creates the '배송하고 싶어요' delivery request page."""
-    # Custom CSS styling
+    apply_theme()
+
+    # Header
     st.markdown("""
-    <style>
-    [data-testid="stAppViewContainer"] {
-        background-color: #f4f6f9;
-    }
-    .order-card {
-        background-color: white;
-        border-radius: 15px;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        padding: 20px;
-        margin-bottom: 20px;
-        transition: transform 0.3s ease;
-    }
-    .order-card:hover {
-        transform: scale(1.02);
-    }
-    .status-badge {
-        display: inline-block;
-        padding: 5px 10px;
-        border-radius: 20px;
-        font-weight: bold;
-        font-size: 14px;
-        color: white;
-    }
-    .tracking-btn {
-        display: inline-block;
-        background-color: #28a745 !important;
-        color: white !important;
-        padding: 8px 16px;
-        text-decoration: none;
-        border-radius: 20px !important;
-        transition: all 0.3s ease !important;
-        margin-top: 10px;
-        cursor: pointer;
-    }
-    .tracking-btn:hover {
-        background-color: #218838 !important;
-        transform: translateY(-2px);
-    }
-    </style>
+    <div class="page-header request">
+        <h1>배송하고 싶어요</h1>
+        <p>드론 배송을 요청하세요.</p>
+    </div>
     """, unsafe_allow_html=True)
 
-    # Header
+    single_tab, bulk_tab = st.tabs(["단건 요청", "대량 등록"])
+    with single_tab:
+        render_request_form()
+    with bulk_tab:
+        render_bulk_import()
+
+    # Footer
     st.markdown("""
-    <div style="background-color: #28a745; color: white; padding: 20px; border-radius: 10px; margin-bottom: 20px;">
-        <h1 style="margin-bottom: 10px;">배송하고 싶어요</h1>
-        <p style="opacity: 0.8;">드론 배송을 요청하세요.</p>
+    <div class="page-footer">
+        © 2024 드론 배송 서비스 | 고객 지원: 1234-5678
     </div>
     """, unsafe_allow_html=True)
 
+def render_request_form():
+    """Renders the single delivery request form and submits it."""
     # Delivery Request Form
     with st.form(key='delivery_request_form'):
         st.markdown("### 배송 요청 정보")
@@ -207,6 +78,8 @@ def delivery_request_page():
         st.markdown("#### 픽업 정보")
         pickup_date = st.date_input("픽업 날짜", min_value=datetime.now().date(), help="픽업 날짜를 선택하세요.")
         pickup_time = st.time_input("픽업 시간", help="픽업 시간을 선택하세요.")
+        station = st.selectbox("픽업 스테이션", get_station_registry().stations, format_func=lambda station: station.name,
+                               help="드론이 출발할 스테이션을 선택하세요.")
         
         # Submit Button
         submit_button = st.form_submit_button(label='배송 요청 제출', type='primary')
@@ -216,9 +89,33 @@ def delivery_request_page():
         if not all([sender_name, sender_address, sender_contact, recipient_name, recipient_address, recipient_contact, package_description, package_weight]):
             st.error("모든 필드를 올바르게 입력해주세요.")
         else:
-            # Here, you can implement logic to save the delivery request to a database or send an email.
-            # For demonstration, we'll just display a success message.
-            st.success("배송 요청이 성공적으로 제출되었습니다!")
+            # Addresses are resolved against the local gazetteer; no network call
+            sender_location, recipient_location = get_geocoder().geocode_many([sender_address, recipient_address])
+            request = {
+                "user_id": st.session_state.get("username"),
+                "sender_name": sender_name,
+                "sender_address": sender_address,
+                "sender_contact": sender_contact,
+                "recipient_name": recipient_name,
+                "recipient_address": recipient_address,
+                "recipient_contact": recipient_contact,
+                "package_description": package_description,
+                "package_weight": package_weight,
+                "pickup_date": pickup_date.strftime("%Y-%m-%d"),
+                "pickup_time": pickup_time.strftime("%H:%M"),
+                "station_id": station.id,
+            }
+            for prefix, location in (("sender", sender_location), ("recipient", recipient_location)):
+                if location:
+                    request[f"{prefix}_lat"], request[f"{prefix}_lon"] = location.lat, location.lon
+            # The request is queued and written to disk in the background,
+            # so the form never waits on the database.
+            request_id = get_delivery_request_writer().submit(request)
+            # Drone and pickup slot are assigned in the background and shown on the tracking page
+            get_scheduler_service()
+            st.success(f"배송 요청이 성공적으로 제출되었습니다! (요청 번호: {request_id})")
+            if recipient_location is None:
+                st.warning("수신인 주소의 위치를 찾지 못했습니다. 배송 전에 주소를 확인해 주세요.")
             
             # Optionally, display the submitted information
             st.markdown("---")
@@ -227,25 +124,78 @@ def delivery_request_page():
                 "송신인 이름": sender_name,
                 "송신인 주소": sender_address,
                 "송신인 연락처": sender_contact,
+                "송신지 위치": describe_location(sender_location),
                 "수신인 이름": recipient_name,
                 "수신인 주소": recipient_address,
                 "수신인 연락처": recipient_contact,
+                "수신지 위치": describe_location(recipient_location),
                 "내용물": package_description,
                 "무게 (kg)": package_weight,
                 "픽업 날짜": pickup_date.strftime("%Y-%m-%d"),
-                "픽업 시간": pickup_time.strftime("%H:%M")
+                "픽업 시간": pickup_time.strftime("%H:%M"),
+                "픽업 스테이션": station.name,
             }
+            import pandas as pd  # Imported lazily; only needed once a request is submitted
+
             st.table(pd.DataFrame.from_dict(submitted_data, orient='index', columns=['정보']))
-    
-    # Footer
-    st.markdown("""
-    <div style="text-align: center; margin-top: 20px; color: #6c757d;">
-        © 2024 드론 배송 서비스 | 고객 지원: 1234-5678
-    </div>
-    """, unsafe_allow_html=True)
+
+@traced()
+def render_bulk_import():
+    """Imports a CSV or Parquet manifest of delivery requests, reporting the rows that fail validation."""
+    st.markdown("### 대량 배송 요청")
+    st.caption(
+        "필수 열: sender_name, sender_address, sender_contact, recipient_name, recipient_address, recipient_contact, "
+        "package_description, package_weight, pickup_date (YYYY-MM-DD), pickup_time (HH:MM) · 선택 열: station_id"
+    )
+    stations = get_station_registry().stations
+    with st.form(key='bulk_import_form'):
+        manifest = st.file_uploader("배송 목록 파일", type=["csv", "parquet"], help="CSV(UTF-8) 또는 Parquet 파일을 올리세요.")
+        station = st.selectbox("기본 픽업 스테이션", stations, format_func=lambda station: station.name,
+                               help="station_id 열이 비어 있는 요청에 사용됩니다.")
+        validate_only = st.checkbox("검증만 하기", help="요청을 등록하지 않고 오류만 확인합니다.")
+        submit_button = st.form_submit_button(label='업로드', type='primary')
+
+    if not submit_button:
+        return
+    if manifest is None:
+        st.error("배송 목록 파일을 선택해주세요.")
+        return
+    # Imported lazily; pyarrow is only needed once a manifest is uploaded
+    from duckdal.bulk_import import import_requests
+
+    try:
+        result = import_requests(
+            manifest,
+            manifest.name,
+            st.session_state.get("username"),
+            station.id,
+            {station.id for station in stations},
+            writer=None if validate_only else get_delivery_request_writer(),
+            geocoder=None if validate_only else get_geocoder(),
+        )
+    except ValueError as e:
+        st.error(f"파일을 처리하지 못했습니다: {e}")
+        return
+    if validate_only:
+        st.info(f"{result.rows:,}건 중 {result.accepted:,}건을 등록할 수 있습니다. 오류가 있는 요청: {result.rejected:,}건")
+    else:
+        get_scheduler_service()
+        st.success(f"{result.rows:,}건 중 {result.accepted:,}건의 배송 요청이 등록되었습니다. 오류로 제외된 요청: {result.rejected:,}건")
+    if result.unlocated:
+        st.warning(f"수신인 주소의 위치를 찾지 못한 요청이 {result.unlocated:,}건 있습니다. 배송 전에 주소를 확인해 주세요.")
+    if result.errors:
+        st.markdown("#### 오류 목록")
+        if result.error_count > len(result.errors):
+            st.caption(f"오류 {result.error_count:,}개 중 처음 {len(result.errors):,}개만 표시합니다.")
+        st.dataframe(
+            [{"행": error.row, "열": error.column, "오류": error.message} for error in result.errors],
+            hide_index=True,
+            use_container_width=True,
+        )
 
 
 make_sidebar()
 
 delivery_request_page()
+profile_overlay()
 
@@ -0,0 +1,143 @@
+import streamlit as st
+from navigation import make_sidebar
+from duckdal.common import get_current_kst
+from duckdal.instrumentation import profile_overlay, traced
+from duckdal.live_map import MAP_HEIGHT_PX, PositionMirror, get_position_buffer, simulate_fleet, visible_clusters
+from duckdal.scheduler import default_drones, get_scheduler_service
+from duckdal.stations import get_station_registry
+from duckdal.telemetry import get_telemetry_service
+from duckdal.theme import apply_theme
+
+# 페이지 설정
+st.set_page_config(page_title="운항 현황", page_icon=":helicopter:", layout="wide")
+
+# Seconds between map refreshes; only the map fragment reruns
+LIVE_MAP_REFRESH_SECONDS = 2
+
+def feed_demo_positions(buffer, stations):
+    """Moves the demo fleet while no drone telemetry is configured (DUCKDAL_TELEMETRY_ADDR)."""
+    flying, lats, lons, parked = simulate_fleet(default_drones(stations), stations, get_current_kst())
+    buffer.update(flying, lats, lons)
+    buffer.remove(parked)
+
+def build_deck(stations, clusters, center, zoom):
+    """Returns a pydeck map with the stations and the clustered drones in view."""
+    import pandas as pd
+    import pydeck as pdk
+
+    station_data = pd.DataFrame(
+        [{"name": station.name, "lat": station.lat, "lon": station.lon} for station in stations]
+    )
+    drone_data = pd.DataFrame(clusters)
+    drone_data["label"] = drone_data["count"].astype(str).where(drone_data["count"] > 1, "")
+    layers = [
+        pdk.Layer(
+            "ScatterplotLayer", station_data, get_position=["lon", "lat"],
+            get_fill_color=[40, 167, 69], get_radius=250, radius_min_pixels=6, pickable=True,
+        ),
+        pdk.Layer(
+            "ScatterplotLayer", drone_data, get_position=["lon", "lat"],
+            get_fill_color=[0, 123, 255], get_radius="80 * Math.sqrt(count)", radius_min_pixels=4,
+        ),
+        pdk.Layer(
+            "TextLayer", drone_data, get_position=["lon", "lat"], get_text="label",
+            get_size=14, get_color=[255, 255, 255],
+        ),
+    ]
+    view_state = pdk.ViewState(latitude=center.lat, longitude=center.lon, zoom=zoom)
+    return pdk.Deck(layers=layers, initial_view_state=view_state, map_style=None, tooltip={"text": "{name}"})
+
+@st.fragment(run_every=LIVE_MAP_REFRESH_SECONDS)
+@traced()
+def live_map(stations):
+    """Refreshes the drone map on its own timer without rerunning the page."""
+    buffer = get_position_buffer()
+    # The telemetry service publishes to the buffer from its own thread
+    if get_telemetry_service() is None:
+        feed_demo_positions(buffer, stations)
+
+    # Each session mirrors the shared buffer and only applies what changed since its last refresh
+    if "position_mirror" not in st.session_state:
+        st.session_state.position_mirror = PositionMirror()
+    mirror = st.session_state.position_mirror
+    changed = mirror.sync(buffer)
+
+    center = st.session_state.get("map_center", stations[0])
+    zoom = st.session_state.get("map_zoom", 11)
+    lats, lons = mirror.positions()
+    clusters = visible_clusters(lats, lons, center.lat, center.lon, zoom)
+
+    st.pydeck_chart(build_deck(stations, clusters, center, zoom), use_container_width=True, height=MAP_HEIGHT_PX)
+    st.caption(
+        f"운항 중인 드론 {len(lats)}대 · 화면에 표시된 그룹 {len(clusters['count'])}개 · 이번 갱신 변경 {changed}건"
+    )
+
+@traced()
+def pickup_labels(stations):
+    """Builds printable QR label sheets for the parcels leaving a station on a day."""
+    st.markdown("### 출고 라벨")
+    station_col, date_col, format_col = st.columns([2, 1, 1])
+    with station_col:
+        station = st.selectbox("스테이션", stations, format_func=lambda station: station.name, key="label_station")
+    with date_col:
+        day = st.date_input("픽업 날짜", value=get_current_kst().date(), key="label_date")
+    with format_col:
+        fmt = st.selectbox("형식", ["pdf", "png"], format_func={"pdf": "PDF", "png": "PNG (ZIP)"}.get, key="label_format")
+
+    if st.button("라벨 만들기"):
+        pickups = get_scheduler_service().pickups_for_station(station.id, day)
+        if not pickups:
+            st.session_state.pop("label_sheet", None)
+            st.info("이 날짜에 배정된 출고 건이 없습니다.")
+        else:
+            # PIL and the rendering pool are only needed once labels are requested
+            from duckdal.labels import SHEET_FORMATS, Label, render_label_sheets
+
+            labels = [
+                Label(pickup["id"], [
+                    f"{pickup['slot_start'].replace('T', ' ')}  {pickup['drone_id']}",
+                    f"{pickup['station_id']}  {pickup['package_weight']:.1f} kg",
+                ])
+                for pickup in pickups
+            ]
+            # Kept in the session so the download button survives the rerun it triggers
+            st.session_state.label_sheet = {
+                "data": render_label_sheets(labels, fmt),
+                "file_name": f"labels-{station.id}-{day.isoformat()}.{'pdf' if fmt == 'pdf' else 'zip'}",
+                "mime": SHEET_FORMATS[fmt],
+                "count": len(labels),
+            }
+
+    sheet = st.session_state.get("label_sheet")
+    if sheet:
+        st.download_button(
+            f"라벨 {sheet['count']}장 내려받기", sheet["data"], file_name=sheet["file_name"], mime=sheet["mime"]
+        )
+
+@traced()
+def operations_page():
+    """Creates the '운항 현황' page with the live drone map."""
+    apply_theme()
+    st.markdown("""
+    <div class="page-header operations">
+        <h1>운항 현황</h1>
+        <p>모든 스테이션과 운항 중인 드론을 실시간으로 확인하세요.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    stations = get_station_registry().stations
+    center_col, zoom_col = st.columns([3, 1])
+    with center_col:
+        st.selectbox("지도 중심 스테이션", stations, format_func=lambda station: station.name, key="map_center")
+    with zoom_col:
+        st.slider("확대", min_value=8, max_value=16, value=11, key="map_zoom")
+
+    live_map(stations)
+
+    pickup_labels(stations)
+
+
+make_sidebar()
+
+operations_page()
+profile_overlay()
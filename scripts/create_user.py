@@ -0,0 +1,30 @@
+"""Adds a user to the user store, or resets the password of an existing one.
+
+Usage:
+    python scripts/create_user.py alice
+"""
+import argparse
+import getpass
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.users import DEFAULT_DB_PATH, UserStore  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("username")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite database path")
+    args = parser.parse_args()
+
+    password = getpass.getpass(f"Password for {args.username}: ")
+    if password != getpass.getpass("Repeat password: "):
+        sys.exit("Passwords do not match")
+    UserStore(args.db).create_user(args.username, password)
+    print(f"saved {args.username}")
+
+
+if __name__ == "__main__":
+    main()
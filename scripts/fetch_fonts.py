@@ -0,0 +1,36 @@
+"""Downloads the web fonts the theme uses into static/fonts, where Streamlit serves them.
+
+Usage:
+    python scripts/fetch_fonts.py
+"""
+import argparse
+import os
+import urllib.request
+
+STATIC_FONTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "fonts")
+
+FONTS = {
+    "STUNNING-Bd.woff2": "https://fastly.jsdelivr.net/gh/projectnoonnu/2410-2@1.0/STUNNING-Bd.woff2",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--force", action="store_true", help="download fonts that are already present")
+    args = parser.parse_args()
+
+    os.makedirs(STATIC_FONTS_DIR, exist_ok=True)
+    for filename, url in FONTS.items():
+        path = os.path.join(STATIC_FONTS_DIR, filename)
+        if os.path.exists(path) and not args.force:
+            print(f"{filename}: already present")
+            continue
+        with urllib.request.urlopen(url, timeout=30) as response:
+            data = response.read()
+        with open(path, "wb") as f:
+            f.write(data)
+        print(f"{filename}: {len(data)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Loads a gazetteer CSV into the geocoder's SQLite store.
+
+The CSV needs sido, sigungu, name, number, lat and lon columns. Rows
+without a name are district centroids and rows without a number are
+street or neighbourhood centroids. Convert a national address dataset
+(road-name or lot-number building coordinates) to this layout to geocode
+beyond the bundled sample.
+
+Usage:
+    python scripts/load_gazetteer.py addresses.csv
+    python scripts/load_gazetteer.py more_addresses.csv --append
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.geocoder import DEFAULT_DB_PATH, Geocoder  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv_path")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite database path")
+    parser.add_argument("--append", action="store_true", help="keep the rows already in the store")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    loaded = Geocoder(args.db, csv_path=None).load_csv(args.csv_path, replace=not args.append)
+    elapsed = time.perf_counter() - started
+    print(f"loaded {loaded:,} rows in {elapsed:.1f} s ({loaded / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
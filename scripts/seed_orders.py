@@ -0,0 +1,95 @@
+"""Fills the order store with synthetic orders for scaling measurements.
+
+Usage:
+    python scripts/seed_orders.py --orders 2000000 --users 50000 --user test --user-orders 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.order_store import DEFAULT_DB_PATH, SQLiteOrderRepository  # noqa: E402
+
+COMPANIES = [("Coupang", "assets/coupang.svg"), ("당근마켓", "assets/dang.svg")]
+STATUSES = ["배송중", "배달 완료", "취소됨"]
+ITEMS = ["나이키 양말", "F-35 피규어", "노트북 파우치", "무선 이어폰", "텀블러", "우산"]
+TIMELINE = [
+    ("서울 물류센터", "상품 접수"),
+    ("인천 드론 배송", "출고 준비"),
+    ("인천 송도 제1 스테이션", "배송 중"),
+]
+
+
+def synthetic_order(rng, index, user_id, start):
+    """Builds one synthetic order with a short tracking timeline."""
+    company, logo = rng.choice(COMPANIES)
+    status = rng.choice(STATUSES)
+    placed_at = start + timedelta(minutes=rng.randrange(60 * 24 * 30))
+    steps = 1 if status == "취소됨" else rng.randint(1, len(TIMELINE))
+    return {
+        "id": f"SYN-{index:09d}",
+        "user_id": user_id,
+        "company": company,
+        "logo": logo,
+        "status": status,
+        "estimated_delivery": (placed_at + timedelta(days=2)).strftime("%Y-%m-%d"),
+        "items": rng.sample(ITEMS, rng.randint(1, 2)),
+        "tracking_number": f"SY{index:016d}",
+        "qr_number": index % 10,
+        # Destinations spread over Incheon and Seoul
+        "dest_lat": round(rng.uniform(37.35, 37.65), 6),
+        "dest_lon": round(rng.uniform(126.60, 127.10), 6),
+        "tracking_details": [
+            {
+                "date": (placed_at + timedelta(hours=step * 3)).strftime("%Y-%m-%d %H:%M"),
+                "location": location,
+                "status": step_status,
+            }
+            for step, (location, step_status) in enumerate(TIMELINE[:steps])
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite database path")
+    parser.add_argument("--orders", type=int, default=1_000_000, help="number of synthetic orders")
+    parser.add_argument("--users", type=int, default=10_000, help="number of synthetic users")
+    parser.add_argument("--user", help="additionally give this user --user-orders orders, e.g. the demo account")
+    parser.add_argument("--user-orders", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-index", type=int, default=0, help="first synthetic order number, to append to an existing store")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    repository = SQLiteOrderRepository(args.db)
+    start = datetime(2024, 1, 1)
+
+    started = time.perf_counter()
+    index = args.start_index
+    done = 0
+    while done < args.orders:
+        batch_size = min(args.batch_size, args.orders - done)
+        orders = [
+            synthetic_order(rng, index + i, f"user{rng.randrange(args.users):06d}", start)
+            for i in range(batch_size)
+        ]
+        repository.add_orders(orders)
+        index += batch_size
+        done += batch_size
+        elapsed = time.perf_counter() - started
+        print(f"{done:>12,} orders  {done / elapsed:>10,.0f} orders/s", flush=True)
+
+    if args.user:
+        orders = [synthetic_order(rng, index + i, args.user, start) for i in range(args.user_orders)]
+        repository.add_orders(orders)
+        print(f"added {args.user_orders:,} orders for {args.user}")
+
+
+if __name__ == "__main__":
+    main()
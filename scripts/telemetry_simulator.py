@@ -0,0 +1,65 @@
+"""Sends simulated drone telemetry over UDP to the app's telemetry listener.
+
+The station fleets fly the same sorties as the live map's demo mode.
+
+Usage:
+    DUCKDAL_TELEMETRY_ADDR=127.0.0.1:47800 streamlit run streamlit_app.py
+    python scripts/telemetry_simulator.py --address 127.0.0.1:47800 --rate 1 --extra-drones 1000
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.common import get_current_kst  # noqa: E402
+from duckdal.live_map import simulate_fleet  # noqa: E402
+from duckdal.scheduler import Drone, default_drones  # noqa: E402
+from duckdal.stations import get_station_registry  # noqa: E402
+from duckdal.telemetry import pack_messages  # noqa: E402
+
+CRUISE_ALTITUDE_M = 60.0
+# Battery percent used per second in the air and recharged per second on the ground
+DRAIN_PER_SECOND = 0.1
+CHARGE_PER_SECOND = 0.5
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--address", default="127.0.0.1:47800", help="host:port of DUCKDAL_TELEMETRY_ADDR")
+    parser.add_argument("--rate", type=float, default=1.0, help="messages per drone per second")
+    parser.add_argument("--extra-drones", type=int, default=0, help="synthetic drones on top of the station fleets")
+    args = parser.parse_args()
+
+    host, _, port = args.address.rpartition(":")
+    target = (host or "127.0.0.1", int(port))
+    stations = get_station_registry().stations
+    drones = default_drones(stations) + [
+        Drone(f"SIM-{number:05d}", stations[number % len(stations)].id, 2.0) for number in range(args.extra_drones)
+    ]
+    batteries = {drone.id: 100.0 for drone in drones}
+    interval = 1.0 / args.rate
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    print(f"Sending telemetry of {len(drones)} drones to {target[0]}:{target[1]} every {interval:g} s")
+    while True:
+        started = time.monotonic()
+        now = get_current_kst()
+        flying, lats, lons, parked = simulate_fleet(drones, stations, now)
+        for drone_id in flying:
+            batteries[drone_id] = max(0.0, batteries[drone_id] - DRAIN_PER_SECOND * interval)
+        for drone_id in parked:
+            batteries[drone_id] = min(100.0, batteries[drone_id] + CHARGE_PER_SECOND * interval)
+        # Parked drones stay silent and drop off the map once they are stale
+        datagrams = pack_messages(
+            flying, [now.timestamp()] * len(flying), lats, lons,
+            [CRUISE_ALTITUDE_M] * len(flying), [batteries[drone_id] for drone_id in flying],
+        )
+        for datagram in datagrams:
+            sock.sendto(datagram, target)
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Summarizes a rerun trace file written with DUCKDAL_TRACE_FILE.
+
+Prints, per page, how long reruns took and how many elements they sent,
+then every span's call count and median / p95 duration.
+
+Usage:
+    DUCKDAL_TRACE_FILE=traces.jsonl streamlit run streamlit_app.py
+    python scripts/trace_report.py traces.jsonl
+"""
+import argparse
+import json
+from collections import defaultdict
+
+import numpy as np
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace_file")
+    parser.add_argument("--include-fragments", action="store_true", help="count fragment reruns with full reruns")
+    args = parser.parse_args()
+
+    reruns = defaultdict(list)
+    elements = defaultdict(list)
+    spans = defaultdict(list)
+    with open(args.trace_file, encoding="utf-8") as f:
+        for line in f:
+            trace = json.loads(line)
+            if trace["fragment"] and not args.include_fragments:
+                continue
+            reruns[trace["page"]].append(trace["duration_ms"])
+            elements[trace["page"]].append(sum(trace["elements"].values()))
+            for span in trace["spans"]:
+                spans[trace["page"], span["name"]].append(span["duration_ms"])
+
+    for page in sorted(reruns):
+        durations = np.array(reruns[page])
+        print(
+            f"{page}: {len(durations)} reruns, median {np.median(durations):.1f} ms, "
+            f"p95 {np.percentile(durations, 95):.1f} ms, median {np.median(elements[page]):.0f} elements"
+        )
+        for (span_page, name), span_durations in sorted(spans.items()):
+            if span_page != page:
+                continue
+            span_durations = np.array(span_durations)
+            print(
+                f"  {name:<32} {len(span_durations):>6} calls  median {np.median(span_durations):8.2f} ms"
+                f"  p95 {np.percentile(span_durations, 95):8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
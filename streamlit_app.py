@@ -1,62 +1,36 @@
 import streamlit as st
-from time import sleep
-from navigation import make_sidebar
+from time import time
+from duckdal.instrumentation import profile_overlay
+from duckdal.theme import apply_theme
+from navigation import login, make_sidebar
+
+# Seconds between checks of a pending password verification
+LOGIN_POLL_SECONDS = 0.1
+
+@st.fragment(run_every=LOGIN_POLL_SECONDS)
+def login_progress():
+    """Waits for the password check off the script thread, then redirects or reports the failure."""
+    attempt = st.session_state.login_attempt
+    if not attempt.done():
+        st.caption("Checking your password...")
+        return
+    del st.session_state.login_attempt
+    result = attempt.result()
+    if result.ok:
+        login(result.username, result.token)
+        st.switch_page("pages/page1.py")
+    if result.locked_until:
+        minutes = max(1, round((result.locked_until - time()) / 60))
+        st.session_state.login_error = f"🔒 Too many failed attempts. Please try again in {minutes} minutes."
+    else:
+        st.session_state.login_error = "❌ Incorrect username or password. Please try again."
+    st.rerun()
 
 # 사이드바 생성
 make_sidebar()
 
-# CSS 및 스타일 설정
-st.markdown(
-    """
-    <style>
-    @font-face {
-        font-family: 'STUNNING-Bd';
-        src: url('https://fastly.jsdelivr.net/gh/projectnoonnu/2410-2@1.0/STUNNING-Bd.woff2') format('woff2');
-        font-weight: normal;
-        font-style: normal;
-    }
-    
-    body {
-        background-color: #f0f8ff;
-    }
-    .login-container {
-        background-color: #ffffff;
-        padding: 2rem;
-        border-radius: 25px;
-        width: 100%;
-        max-width: 400px;
-        margin: auto;
-        box-shadow: 2px 2px 12px rgba(0, 0, 0, 0.1);
-        font-family: 'STUNNING-Bd', sans-serif;
-    }
-    .login-title {
-        font-size: 2.5rem;
-        color: #1e90ff;
-        text-align: center;
-        margin-bottom: 0.5rem;
-        font-family: 'STUNNING-Bd', sans-serif;
-    }
-    .login-subtitle {
-        font-size: 1.8rem;
-        color: #4682b4;
-        text-align: center;
-        margin-bottom: 1.5rem;
-        font-family: 'STUNNING-Bd', sans-serif;
-    }
-    .stButton > button {
-        width: 100%;
-        padding: 0.75rem;
-        background-color: #1e90ff;
-        color: #ffffff;
-        border: none;
-        border-radius: 10px;
-        font-size: 1rem;
-        font-family: 'STUNNING-Bd', sans-serif;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
+# 테마 스타일시트
+apply_theme()
 
 # 로그인 페이지 UI
 
@@ -66,13 +40,19 @@ st.markdown("<div class='login-subtitle'>Duck Dal</div>", unsafe_allow_html=True
 username = st.text_input("Username:")
 password = st.text_input("Password:", type="password")
 
+if st.session_state.get("logged_in", False):
+    # Returning visitor whose session cookie was accepted
+    st.switch_page("pages/page1.py")
+
 if st.button("Log in"):
-    if username == "test" and password == "test":
-        st.session_state.logged_in = True
-        st.success("Logged in successfully!")
-        sleep(0.5)
-        st.switch_page("pages/page1.py")
-    else:
-        st.error("❌ Incorrect username or password. Please try again.")
+    from duckdal.users import get_user_store
+
+    st.session_state.login_attempt = get_user_store().authenticate(username, password)
+
+if "login_attempt" in st.session_state:
+    login_progress()
+if "login_error" in st.session_state:
+    st.error(st.session_state.pop("login_error"))
 
 st.markdown("</div>", unsafe_allow_html=True)
+profile_overlay()
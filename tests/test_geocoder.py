@@ -0,0 +1,36 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal.geocoder import Geocoder  # noqa: E402
+
+GAZETTEER = """sido,sigungu,name,number,lat,lon
+인천광역시,연수구,,,37.4101,126.6783
+세종특별자치시,,,,36.4801,127.2890
+세종특별자치시,,한누리대로,2130,36.4801,127.2890
+,,한누리대로,,36.0000,127.0000
+"""
+
+
+def make_geocoder(tmp_path):
+    csv_path = tmp_path / "gazetteer.csv"
+    csv_path.write_text(GAZETTEER, encoding="utf-8")
+    return Geocoder(str(tmp_path / "gazetteer.db"), csv_path=str(csv_path))
+
+
+def test_sejong_rows_load_with_the_rest(tmp_path):
+    geocoder = make_geocoder(tmp_path)
+
+    assert geocoder.geocode("인천 연수구 송도동 1").precision == "district"
+    result = geocoder.geocode("세종시 한누리대로 2130")
+    assert (result.lat, result.lon, result.precision) == (36.4801, 127.2890, "address")
+    assert result.matched == "세종특별자치시 한누리대로 2130"
+    assert geocoder.geocode("세종특별자치시 조치원읍 1").precision == "district"
+
+
+def test_rows_without_province_or_district_are_skipped(tmp_path):
+    geocoder = make_geocoder(tmp_path)
+
+    loaded = geocoder.load_csv(str(tmp_path / "gazetteer.csv"), replace=True)
+    assert loaded == 3
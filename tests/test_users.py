@@ -0,0 +1,28 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdal import users  # noqa: E402
+from duckdal.users import MAX_FAILED_ATTEMPTS, UserStore  # noqa: E402
+
+
+def login(store, password):
+    return store.authenticate("duck", password).result()
+
+
+def test_an_expired_lockout_counts_failures_from_zero(tmp_path, monkeypatch):
+    monkeypatch.setattr(users, "BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(users, "LOCKOUT_SECONDS", 0.5)
+    store = UserStore(str(tmp_path / "users.db"), secret="test")
+    store.create_user("duck", "right")
+
+    for _ in range(MAX_FAILED_ATTEMPTS):
+        result = login(store, "wrong")
+    assert result.locked_until is not None
+    assert not login(store, "right").ok
+
+    time.sleep(0.6)
+    assert login(store, "wrong").locked_until is None
+    assert login(store, "right").ok